@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendars', '0001_initial'),
+        ('holidays', '0006_partition_holiday_by_year'),
+    ]
+
+    operations = [
+        # holidays 0006 dropped the constraint when it partitioned the table
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='userholiday',
+                    name='holiday',
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='saved_by',
+                        to='holidays.holiday',
+                    ),
+                ),
+            ],
+        ),
+    ]
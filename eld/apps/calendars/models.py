@@ -51,7 +51,8 @@ class UserHoliday(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_holidays')
-    holiday = models.ForeignKey(Holiday, on_delete=models.CASCADE, related_name='saved_by')
+    # Holiday is partitioned on PostgreSQL; no database FK can point at it
+    holiday = models.ForeignKey(Holiday, on_delete=models.CASCADE, related_name='saved_by', db_constraint=False)
     
     # Reminder settings
     reminder = models.CharField(max_length=10, choices=REMINDER_CHOICES, default='none')
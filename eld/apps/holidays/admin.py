@@ -1,5 +1,5 @@
 from django.contrib import admin
-from eld.apps.holidays.models import Country, HolidayCategory, Holiday, HolidayAlias
+from eld.apps.holidays.models import Country, HolidayCategory, Holiday, HolidayAlias, SourceFingerprint
 
 @admin.register(Country)
 class CountryAdmin(admin.ModelAdmin):
@@ -63,4 +63,10 @@ class HolidayAdmin(admin.ModelAdmin):
     def mark_as_public_holiday(self, request, queryset):
         queryset.update(is_public_holiday=True)
         self.message_user(request, f'{queryset.count()} holidays marked as public holidays')
-    mark_as_public_holiday.short_description = 'Mark as public holidays'
\ No newline at end of file
+    mark_as_public_holiday.short_description = 'Mark as public holidays'
+
+@admin.register(SourceFingerprint)
+class SourceFingerprintAdmin(admin.ModelAdmin):
+    list_display = ['source', 'country_code', 'year', 'digest', 'updated_at']
+    list_filter = ['source', 'year']
+    search_fields = ['country_code']
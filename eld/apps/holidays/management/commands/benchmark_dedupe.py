@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand
+from eld.apps.holidays.services.deduplicator import HolidayDeduplicator
+from eld.apps.holidays.services.records import to_records
+from eld.apps.holidays.services.synthetic import generate_holidays, pairwise_quality
+import json
+import logging
+import time
+import tracemalloc
+
+class Command(BaseCommand):
+    help = 'Benchmark HolidayDeduplicator speed, memory and accuracy on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Input sizes to run (records)',
+        )
+        parser.add_argument('--sources', type=int, default=3, help='Sources reporting each holiday')
+        parser.add_argument('--variant-rate', type=float, default=0.4, help='Share of copies with a spelling variant')
+        parser.add_argument('--jitter-rate', type=float, default=0.05, help='Share of movable-holiday copies with a shifted date')
+        parser.add_argument('--jitter-days', type=int, default=2, help='Max date shift in days')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--threshold', type=float, help='Override NAME_SIMILARITY_THRESHOLD')
+        parser.add_argument('--fuzzy-days', type=int, help='Override DATE_FUZZY_RANGE_DAYS')
+        parser.add_argument('--workers', type=int, help='Dedupe worker processes (1 = serial)')
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='Skip tracemalloc (it slows the run down noticeably)',
+        )
+        parser.add_argument('--output', metavar='JSON_FILE', help='Also write results as JSON')
+
+    def handle(self, *args, **options):
+        # Per-run dedupe logging would swamp the report
+        logging.getLogger('eld.apps.holidays.services.deduplicator').setLevel(logging.WARNING)
+
+        deduplicator = HolidayDeduplicator(workers=options['workers'])
+        if options['threshold'] is not None:
+            deduplicator.NAME_SIMILARITY_THRESHOLD = options['threshold']
+        if options['fuzzy_days'] is not None:
+            deduplicator.DATE_FUZZY_RANGE_DAYS = options['fuzzy_days']
+
+        self.stdout.write(
+            f'threshold={deduplicator.NAME_SIMILARITY_THRESHOLD} '
+            f'fuzzy_days={deduplicator.DATE_FUZZY_RANGE_DAYS} workers={deduplicator.workers}'
+        )
+        self.stdout.write(
+            f'{"records":>9} {"output":>9} {"seconds":>8} {"rec/s":>9} '
+            f'{"peak MB":>8} {"precision":>9} {"recall":>7}'
+        )
+
+        results = []
+        for size in options['sizes']:
+            result = self.run(deduplicator, size, options)
+            results.append(result)
+            self.stdout.write(
+                f'{result["records"]:>9} {result["output"]:>9} {result["seconds"]:>8.2f} '
+                f'{result["throughput"]:>9.0f} '
+                f'{result["peak_mb"] if result["peak_mb"] is not None else "-":>8} '
+                f'{result["precision"]:>9.4f} {result["recall"]:>7.4f}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+    def run(self, deduplicator, size, options):
+        """Dedupe one synthetic set and score it"""
+        inputs = generate_holidays(
+            size,
+            sources=options['sources'],
+            variant_rate=options['variant_rate'],
+            jitter_rate=options['jitter_rate'],
+            jitter_days=options['jitter_days'],
+            seed=options['seed'],
+        )
+        records = to_records(inputs)
+
+        track_memory = not options['no_memory']
+        if track_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            output = deduplicator.deduplicate(records)
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+        finally:
+            if track_memory:
+                tracemalloc.stop()
+
+        quality = pairwise_quality(
+            inputs, (record.sources or (record.source,) for record in output)
+        )
+        return {
+            'records': size,
+            'output': len(output),
+            'seconds': round(seconds, 3),
+            'throughput': size / seconds if seconds else 0,
+            'peak_mb': round(peak / 1024 / 1024, 1) if peak is not None else None,
+            **quality,
+        }
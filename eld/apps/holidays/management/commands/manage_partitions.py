@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from eld.apps.holidays.services.partitions import HolidayPartitions
+
+class Command(BaseCommand):
+    help = 'Create upcoming year partitions of the Holiday table and retire old ones (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=getattr(settings, 'HOLIDAY_PARTITIONS_AHEAD', 3),
+            help='Years after the current one to create partitions for',
+        )
+        parser.add_argument(
+            '--drop-before',
+            type=int,
+            metavar='YEAR',
+            help='Retire the partitions of years before YEAR (their holidays are deleted)',
+        )
+        parser.add_argument(
+            '--detach-only',
+            action='store_true',
+            help='With --drop-before: detach old partitions but keep their tables',
+        )
+        parser.add_argument('--list', action='store_true', help='Only list the existing partitions')
+
+    def handle(self, *args, **options):
+        partitions = HolidayPartitions()
+        if not partitions.supported:
+            raise CommandError('The Holiday table is not partitioned (PostgreSQL only, see migration 0006)')
+
+        if not options['list']:
+            this_year = timezone.now().year
+            created = partitions.ensure(range(this_year, this_year + options['ahead'] + 1))
+            self.stdout.write(f'Created partitions: {created or "none"}')
+
+            if options['drop_before'] is not None:
+                retired = partitions.drop_before(options['drop_before'], detach_only=options['detach_only'])
+                action = 'Detached' if options['detach_only'] else 'Dropped'
+                for year, count in retired:
+                    self.stdout.write(f'{action} {year} ({count} holidays)')
+                if not retired:
+                    self.stdout.write(f'No partitions before {options["drop_before"]}')
+
+        for year, name in sorted(partitions.partitions().items()):
+            self.stdout.write(f'{year}: {name}')
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from eld.apps.holidays.services.day_index import DayIndex
+from eld.apps.holidays.tasks import get_refresh_years
+
+class Command(BaseCommand):
+    help = 'Bring the per-day holiday index up to date (the refresh does this for years it changed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            nargs='+',
+            help='Years to rebuild (default: current + next 2 years)',
+        )
+
+    def handle(self, *args, **options):
+        index = DayIndex()
+        for year in options['year'] or get_refresh_years():
+            created, updated, deleted = index.refresh(year)
+            self.stdout.write(f'{year}: {created} rows created, {updated} updated, {deleted} deleted')
+        self.stdout.write(self.style.SUCCESS('Done'))
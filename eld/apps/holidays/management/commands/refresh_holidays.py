@@ -1,5 +1,7 @@
-from django.core.management.base import BaseCommand
-from eld.apps.holidays.tasks import refresh_all_holidays
+from django.core.management.base import BaseCommand, CommandError
+from eld.apps.holidays.services.holiday_fetcher import HolidayFetcher
+from eld.apps.holidays.tasks import refresh_years, refresh_years_parallel, get_refresh_years
+import cProfile
 
 class Command(BaseCommand):
     help = 'Refresh all holiday data from external sources'
@@ -10,22 +12,97 @@ class Command(BaseCommand):
             type=int,
             help='Specific year to refresh (default: current + next 2 years)',
         )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--record',
+            metavar='ARCHIVE',
+            help='Record raw upstream responses to a .json.gz fixture archive',
+        )
+        mode.add_argument(
+            '--replay',
+            metavar='ARCHIVE',
+            help='Serve upstream responses from a recorded archive (no network)',
+        )
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Fetch (source, country batch) shards in parallel, like the Celery fan-out',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-save every partition, ignoring unchanged-payload fingerprints',
+        )
+        parser.add_argument(
+            '--profile',
+            metavar='STATS_FILE',
+            help='Write cProfile stats for the refresh to this file',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting holiday refresh...'))
         
-        if options['year']:
-            from eld.apps.holidays.tasks import refresh_holidays_for_year
-            created, updated = refresh_holidays_for_year(options['year'])
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Year {options["year"]}: {created} created, {updated} updated'
-                )
+        incremental = not options['full']
+        profiler = cProfile.Profile() if options['profile'] else None
+        if profiler:
+            profiler.enable()
+        
+        try:
+            if options['record'] or options['replay']:
+                self.refresh_with_fixtures(options)
+            elif options['parallel']:
+                years = [options['year']] if options['year'] else get_refresh_years()
+                result = refresh_years_parallel(years, incremental=incremental)
+                self.write_summary('Complete', result)
+                self.write_source_stats(result['sources'])
+            elif options['year']:
+                from eld.apps.holidays.tasks import refresh_holidays_for_year
+                report = refresh_holidays_for_year(options['year'], incremental=incremental)
+                self.write_summary(f'Year {options["year"]}', report)
+                self.write_source_stats(report['sources'])
+            else:
+                result = refresh_years(get_refresh_years(), incremental=incremental)
+                self.write_summary('Complete', result)
+                self.write_source_stats(result['sources'])
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(options['profile'])
+                self.stdout.write(f'Profile written to {options["profile"]}')
+
+    def refresh_with_fixtures(self, options):
+        """Run the refresh through one fetcher in record or replay mode"""
+        mode = 'record' if options['record'] else 'replay'
+        fixtures = options['record'] or options['replay']
+        years = [options['year']] if options['year'] else get_refresh_years()
+        
+        try:
+            fetcher = HolidayFetcher(mode=mode, fixtures=fixtures)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not open fixtures {fixtures}: {e}')
+        
+        with fetcher:
+            result = refresh_years(years, fetcher=fetcher, incremental=not options['full'])
+        
+        self.write_summary(f'Complete ({mode} {fixtures})', result)
+        self.write_source_stats(result['sources'])
+
+    def write_summary(self, label, result):
+        """Print created/updated/deleted counts and how many partitions were unchanged"""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{label}: {result["created"]} created, {result["updated"]} updated, '
+                f'{result["deleted"]} deleted, {result["skipped"]} unchanged partitions skipped'
+            )
+        )
+
+    def write_source_stats(self, sources):
+        """Print per-source latency, record count and error count"""
+        for name, stats in sorted(sources.items(), key=lambda item: -item[1]['latency']):
+            line = (
+                f'  {name:<14} {stats["latency"]:>8.2f}s '
+                f'{stats["records"]:>7} holidays {stats["errors"]:>4} errors'
             )
-        else:
-            result = refresh_all_holidays()
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Complete: {result["created"]} created, {result["updated"]} updated'
-                )
-            )
\ No newline at end of file
+            if stats['timed_out']:
+                line += ' (timed out)'
+            self.stdout.write(self.style.WARNING(line) if stats['errors'] else line)
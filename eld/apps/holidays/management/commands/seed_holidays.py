@@ -1,11 +1,18 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from datetime import datetime
-from eld.apps.holidays.tasks import refresh_holidays_for_year
+from eld.apps.holidays.tasks import refresh_holidays_for_year, refresh_years_parallel
 
 class Command(BaseCommand):
     help = 'Seed initial holiday data (2025-2027) and create categories'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Fetch (source, country batch) shards in parallel, like the Celery fan-out',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🎉 Starting holiday database seed...'))
         
@@ -41,14 +48,22 @@ class Command(BaseCommand):
         total_created = 0
         total_updated = 0
         
-        for year in years:
-            self.stdout.write(f'\nFetching holidays for {year}...')
-            created, updated = refresh_holidays_for_year(year)
-            total_created += created
-            total_updated += updated
-            self.stdout.write(
-                self.style.SUCCESS(f'  ✓ {year}: {created} created, {updated} updated')
-            )
+        if options['parallel']:
+            self.stdout.write(f'\nFetching holidays for {years[0]}-{years[-1]} in parallel...')
+            result = refresh_years_parallel(years)
+            total_created = result['created']
+            total_updated = result['updated']
+        else:
+            for year in years:
+                self.stdout.write(f'\nFetching holidays for {year}...')
+                report = refresh_holidays_for_year(year)
+                total_created += report['created']
+                total_updated += report['updated']
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'  ✓ {year}: {report["created"]} created, {report["updated"]} updated'
+                    )
+                )
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidays', '0002_alter_country_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('country_code', models.CharField(blank=True, max_length=10)),
+                ('year', models.IntegerField(db_index=True)),
+                ('digest', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'country_code', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:42
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def backfill_arrays(apps, schema_editor):
+    Holiday = apps.get_model('holidays', 'Holiday')
+    Country = apps.get_model('holidays', 'Country')
+    HolidayCategory = apps.get_model('holidays', 'HolidayCategory')
+    Holiday.objects.update(
+        country_codes=ArraySubquery(
+            Country.objects.filter(holidays=OuterRef('pk')).order_by('code').values('code')
+        ),
+        category_slugs=ArraySubquery(
+            HolidayCategory.objects.filter(holidays=OuterRef('pk')).order_by('slug').values('slug')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidays', '0003_source_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holiday',
+            name='category_slugs',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.SlugField(), blank=True, default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='holiday',
+            name='country_codes',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=2), blank=True, default=list, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='holiday',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['country_codes'], name='holiday_country_codes_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='holiday',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['category_slugs'], name='holiday_category_slugs_gin'),
+        ),
+        migrations.RunPython(backfill_arrays, migrations.RunPython.noop),
+    ]
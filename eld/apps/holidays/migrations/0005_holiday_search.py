@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Holiday = apps.get_model('holidays', 'Holiday')
+    HolidayAlias = apps.get_model('holidays', 'HolidayAlias')
+    config = getattr(settings, 'HOLIDAY_SEARCH_CONFIG', 'english')
+    aliases = Subquery(
+        HolidayAlias.objects.filter(holiday=OuterRef('pk'))
+        .order_by()
+        .values('holiday')
+        .annotate(names=StringAgg('name', ' ', order_by='name'))
+        .values('names'),
+        output_field=models.TextField(),
+    )
+    Holiday.objects.update(
+        search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector(Coalesce(aliases, Value(''), output_field=models.TextField()), weight='B', config=config)
+            + SearchVector('description', weight='C', config=config)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidays', '0004_holiday_country_category_arrays'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='holiday',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='holiday',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='holiday_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='holiday',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='holiday_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
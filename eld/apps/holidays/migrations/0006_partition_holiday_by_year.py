@@ -0,0 +1,215 @@
+from datetime import date
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Years beyond the current one that get a partition up front
+PARTITIONS_AHEAD = 3
+
+
+def partition_holiday_table(apps, schema_editor):
+    """
+    Rebuild holidays_holiday as a table range-partitioned by year
+
+    PostgreSQL only. The primary key becomes (id, year), since a key of a
+    partitioned table must include the partition column; `id` still comes
+    from a sequence and stays unique. For the same reason nothing can keep
+    a foreign key to holidays_holiday(id), so the constraints pointing at
+    it (through tables, aliases, saved holidays) are dropped; the state
+    operations below mark those relations db_constraint=False to match.
+    Indexes and the (name, date, year) unique constraint are recreated
+    under their original names.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    Holiday = apps.get_model('holidays', 'Holiday')
+    quote = connection.ops.quote_name
+    table = Holiday._meta.db_table
+    old = f'{table}_unpartitioned'
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT conrelid::regclass::text, conname FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = %s::regclass
+            """,
+            [table],
+        )
+        for referrer, name in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {referrer} DROP CONSTRAINT {quote(name)}")
+
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'c')
+            """,
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+            WHERE i.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            """,
+            [table],
+        )
+        indexes = [definition for definition, in cursor.fetchall()]
+        cursor.execute(f"SELECT DISTINCT year FROM {quote(table)}")
+        years = {year for year, in cursor.fetchall()}
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING STORAGE) "
+            f"PARTITION BY RANGE (year)"
+        )
+        this_year = date.today().year
+        for year in sorted(years | set(range(this_year, this_year + PARTITIONS_AHEAD + 1))):
+            cursor.execute(
+                f"CREATE TABLE {quote(f'{table}_y{year}')} PARTITION OF {quote(table)} "
+                f"FOR VALUES FROM ({int(year)}) TO ({int(year) + 1})"
+            )
+        cursor.execute(f"CREATE TABLE {quote(f'{table}_default')} PARTITION OF {quote(table)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+        # The identity sequence went with the old table
+        sequence = quote(f'{table}_id_seq')
+        cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {quote(table)}.id")
+        cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f"SELECT setval('{sequence}', COALESCE(MAX(id), 0) + 1, false) FROM {quote(table)}")
+
+        for name, kind, definition in constraints:
+            if kind == 'p':
+                definition = 'PRIMARY KEY (id, year)'
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+        for definition in indexes:
+            cursor.execute(definition)
+
+
+def unpartition_holiday_table(apps, schema_editor):
+    """
+    Rebuild holidays_holiday as a plain table and restore the foreign keys
+
+    Rows are copied back from every partition (holidays of detached
+    partitions are gone and stay gone). Rows that point at a holiday which
+    no longer exists are deleted first, since the restored constraints
+    would reject them.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    Holiday = apps.get_model('holidays', 'Holiday')
+    quote = connection.ops.quote_name
+    table = Holiday._meta.db_table
+    old = f'{table}_partitioned'
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+        if row is None or row[0] != 'p':
+            return
+
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'c')
+            """,
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+            WHERE i.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            """,
+            [table],
+        )
+        # Indexes of a partitioned table are defined ON ONLY the parent
+        indexes = [definition.replace(' ON ONLY ', ' ON ') for definition, in cursor.fetchall()]
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        cursor.execute(f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING STORAGE)")
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        # Drops the partitions and the id sequence with it
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+        cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) "
+            f"FROM {quote(table)}",
+            [table],
+        )
+        for name, kind, definition in constraints:
+            if kind == 'p':
+                definition = 'PRIMARY KEY (id)'
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+        for definition in indexes:
+            cursor.execute(definition)
+
+    references = [
+        field.remote_field.through._meta.get_field(field.m2m_field_name())
+        for field in Holiday._meta.many_to_many
+    ]
+    references += [
+        relation.field for relation in Holiday._meta.related_objects if not relation.many_to_many
+    ]
+    for field in references:
+        model = field.model
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(field.column)} NOT IN "
+                f"(SELECT id FROM {quote(table)})"
+            )
+        schema_editor.execute(schema_editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidays', '0005_holiday_search'),
+        # Its FK to holidays_holiday must exist before it can be dropped
+        ('calendars', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_holiday_table, unpartition_holiday_table),
+            ],
+            # Saved holidays are in the calendars app, see calendars 0002.
+            # The country/category side of the through tables keeps its
+            # constraint; a ManyToManyField can only describe both sides.
+            state_operations=[
+                migrations.AlterField(
+                    model_name='holiday',
+                    name='countries',
+                    field=models.ManyToManyField(
+                        blank=True, db_constraint=False, related_name='holidays', to='holidays.country'
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name='holiday',
+                    name='categories',
+                    field=models.ManyToManyField(
+                        db_constraint=False, related_name='holidays', to='holidays.holidaycategory'
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name='holidayalias',
+                    name='holiday',
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='aliases',
+                        to='holidays.holiday',
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:10
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+from eld.apps.holidays.services.day_index import build_rows
+
+
+def build_day_index(apps, schema_editor):
+    Holiday = apps.get_model('holidays', 'Holiday')
+    Country = apps.get_model('holidays', 'Country')
+    HolidayDayIndex = apps.get_model('holidays', 'HolidayDayIndex')
+    rows = build_rows(
+        Holiday.objects.order_by('date', 'name')
+        .values_list('id', 'date', 'country_codes', 'category_slugs', 'is_global'),
+        Country.objects.values_list('code', flat=True),
+    )
+    HolidayDayIndex.objects.bulk_create(
+        [
+            HolidayDayIndex(date=day, country_code=country, category_slug=category, holiday_ids=ids)
+            for (day, country, category), ids in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidays', '0006_partition_holiday_by_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HolidayDayIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('country_code', models.CharField(blank=True, max_length=2)),
+                ('category_slug', models.SlugField(blank=True, db_index=False)),
+                ('holiday_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+            ],
+            options={
+                'verbose_name_plural': 'Holiday day index',
+                'indexes': [models.Index(fields=['date'], name='holidays_ho_date_53d17d_idx')],
+                'unique_together': {('country_code', 'category_slug', 'date')},
+            },
+        ),
+        migrations.RunPython(build_day_index, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.db import connection, models
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.utils.text import slugify
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 class Country(models.Model):
     """Country model with ISO codes and flags"""
@@ -56,11 +66,22 @@ class Holiday(models.Model):
     is_recurring = models.BooleanField(default=True)
     
     # Location
-    countries = models.ManyToManyField(Country, blank=True, related_name='holidays')
+    # No database foreign key can point at a Holiday: on PostgreSQL the table is
+    # partitioned by year and its key is (id, year), see migration 0006
+    countries = models.ManyToManyField(Country, blank=True, related_name='holidays', db_constraint=False)
     is_global = models.BooleanField(default=False)
     
     # Categorization
-    categories = models.ManyToManyField(HolidayCategory, related_name='holidays')
+    categories = models.ManyToManyField(HolidayCategory, related_name='holidays', db_constraint=False)
+    
+    # Denormalized country codes / category slugs for join-free filtering;
+    # kept in step with the M2M relations by sync_holiday_arrays()
+    country_codes = ArrayField(models.CharField(max_length=2), default=list, blank=True)
+    category_slugs = ArrayField(models.SlugField(), default=list, blank=True)
+    
+    # Weighted name (A) / aliases (B) / description (C) for full-text search;
+    # kept in step by sync_holiday_search()
+    search_vector = SearchVectorField(null=True, editable=False)
     
     # Metadata
     is_public_holiday = models.BooleanField(default=False)
@@ -89,9 +110,23 @@ class Holiday(models.Model):
         indexes = [
             models.Index(fields=['date', 'is_global']),
             models.Index(fields=['year', 'date']),
+            GinIndex(fields=['country_codes'], name='holiday_country_codes_gin'),
+            GinIndex(fields=['category_slugs'], name='holiday_category_slugs_gin'),
+            GinIndex(fields=['search_vector'], name='holiday_search_vector_gin'),
+            GinIndex(fields=['name'], name='holiday_name_trgm', opclasses=['gin_trgm_ops']),
         ]
         unique_together = [['name', 'date', 'year']]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the day index filed the holiday under, see mark_day_index_on_save
+        instance._indexed_as = instance._day_index_key()
+        return instance
+    
+    def _day_index_key(self):
+        return tuple(self.__dict__.get(name) for name in ('date', 'year', 'is_global'))
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(f"{self.name}-{self.date}")
@@ -117,7 +152,7 @@ class Holiday(models.Model):
 
 class HolidayAlias(models.Model):
     """Alternative names for holidays (for search and deduplication)"""
-    holiday = models.ForeignKey(Holiday, on_delete=models.CASCADE, related_name='aliases')
+    holiday = models.ForeignKey(Holiday, on_delete=models.CASCADE, related_name='aliases', db_constraint=False)
     name = models.CharField(max_length=200)
     language = models.CharField(max_length=10, default='en')
     
@@ -126,4 +161,175 @@ class HolidayAlias(models.Model):
         unique_together = [['holiday', 'name']]
     
     def __str__(self):
-        return f"{self.name} (alias for {self.holiday.name})"
\ No newline at end of file
+        return f"{self.name} (alias for {self.holiday.name})"
+
+class SourceFingerprint(models.Model):
+    """Content hash of the last upstream payload per (source, country, year), for incremental refresh"""
+    source = models.CharField(max_length=50)
+    country_code = models.CharField(max_length=10, blank=True)  # blank for whole-year sources
+    year = models.IntegerField(db_index=True)
+    digest = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = [['source', 'country_code', 'year']]
+    
+    def __str__(self):
+        return f"{self.source}/{self.country_code or '*'}/{self.year}: {self.digest[:12]}"
+
+class HolidayDayIndex(models.Model):
+    """Ordered holiday ids per (day, country, category), rebuilt by refresh (see services/day_index.py)"""
+    date = models.DateField()
+    country_code = models.CharField(max_length=2, blank=True)  # blank = any country, '*' = global holidays
+    category_slug = models.SlugField(blank=True, db_index=False)  # blank = any category
+    holiday_ids = ArrayField(models.BigIntegerField(), default=list)
+    
+    class Meta:
+        verbose_name_plural = "Holiday day index"
+        unique_together = [['country_code', 'category_slug', 'date']]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.country_code or 'any'}/{self.category_slug or 'any'}: {len(self.holiday_ids)}"
+
+
+def sync_holiday_arrays(holiday_ids):
+    """
+    Recompute country_codes/category_slugs from the M2M relations
+    
+    `holiday_ids` may be any iterable of ids or a subquery; rows that are
+    already in step are left alone.
+    """
+    country_codes = ArraySubquery(
+        Country.objects.filter(holidays=OuterRef('pk')).order_by('code').values('code')
+    )
+    category_slugs = ArraySubquery(
+        HolidayCategory.objects.filter(holidays=OuterRef('pk')).order_by('slug').values('slug')
+    )
+    return Holiday.objects.filter(pk__in=holiday_ids).exclude(
+        Q(country_codes=country_codes) & Q(category_slugs=category_slugs)
+    ).update(country_codes=country_codes, category_slugs=category_slugs)
+
+@receiver(m2m_changed, sender=Holiday.countries.through)
+@receiver(m2m_changed, sender=Holiday.categories.through)
+def sync_holiday_arrays_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the denormalized arrays in step when countries/categories are added or removed"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_holiday_arrays([instance.pk])
+    elif action == 'pre_clear':
+        # A cleared country/category no longer knows its holidays afterwards
+        instance._cleared_holiday_ids = list(instance.holidays.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        sync_holiday_arrays(pk_set)
+    elif action == 'post_clear':
+        sync_holiday_arrays(getattr(instance, '_cleared_holiday_ids', []))
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=HolidayCategory)
+def sync_holiday_arrays_on_rename(sender, instance, created, **kwargs):
+    """A changed country code or category slug is copied to its holidays"""
+    if not created:
+        sync_holiday_arrays(instance.holidays.values('pk'))
+
+
+def holiday_search_vector():
+    """The weighted search_vector expression for Holiday rows"""
+    config = getattr(settings, 'HOLIDAY_SEARCH_CONFIG', 'english')
+    aliases = Subquery(
+        HolidayAlias.objects.filter(holiday=OuterRef('pk'))
+        .order_by()
+        .values('holiday')
+        .annotate(names=StringAgg('name', ' ', order_by='name'))
+        .values('names'),
+        output_field=TextField(),
+    )
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector(Coalesce(aliases, Value(''), output_field=TextField()), weight='B', config=config)
+        + SearchVector('description', weight='C', config=config)
+    )
+
+def sync_holiday_search(holiday_ids):
+    """
+    Recompute search_vector for the given holidays (ids or a subquery)
+    
+    A no-op on databases without full-text search; rows that are already
+    in step are left alone.
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+    vector = holiday_search_vector()
+    # Plain equality: the exact lookup on a SearchVectorField means "matches"
+    in_step = Exact(F('search_vector'), vector)
+    return Holiday.objects.filter(pk__in=holiday_ids).filter(
+        Q(search_vector__isnull=True) | ~Q(in_step)
+    ).update(search_vector=vector)
+
+@receiver(post_save, sender=Holiday)
+def sync_holiday_search_on_save(sender, instance, update_fields=None, **kwargs):
+    """Re-index a holiday whose name or description may have changed"""
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        sync_holiday_search([instance.pk])
+
+# post_save only: a delete receiver would stop cascades from bulk-deleting aliases
+@receiver(post_save, sender=HolidayAlias)
+def sync_holiday_search_on_alias_save(sender, instance, **kwargs):
+    """Aliases are part of their holiday's search_vector"""
+    sync_holiday_search([instance.holiday_id])
+
+
+# The day index files holidays by date, country, category and is_global;
+# edits outside a refresh flag the years it must rebuild
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def mark_day_index_on_save(sender, instance, **kwargs):
+    """New, moved, deleted or (un)globalized holidays; a moved one leaves its old year too"""
+    from eld.apps.holidays.services.day_index import mark_stale
+
+    indexed_as = getattr(instance, '_indexed_as', None)
+    if kwargs.get('created') is False and indexed_as == instance._day_index_key():
+        return
+    mark_stale({instance.year, indexed_as[1] if indexed_as else None})
+    instance._indexed_as = instance._day_index_key()
+
+@receiver(m2m_changed, sender=Holiday.countries.through)
+@receiver(m2m_changed, sender=Holiday.categories.through)
+def mark_day_index_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from eld.apps.holidays.services.day_index import mark_stale
+
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            mark_stale([instance.year])
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        # Runs after sync_holiday_arrays_on_m2m_change, which kept the cleared ids
+        ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_holiday_ids', [])
+        mark_stale(Holiday.objects.filter(pk__in=ids).values_list('year', flat=True).distinct())
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=HolidayCategory)
+def mark_day_index_on_rename(sender, instance, created, update_fields=None, **kwargs):
+    """Holidays are filed under country codes and category slugs"""
+    from eld.apps.holidays.services.day_index import mark_stale
+
+    if not created and (update_fields is None or {'code', 'slug'} & set(update_fields)):
+        mark_stale(instance.holidays.order_by().values_list('year', flat=True).distinct())
+
+@receiver(pre_delete, sender=Country)
+@receiver(pre_delete, sender=HolidayCategory)
+def remember_linked_holidays(sender, instance, **kwargs):
+    # The links are gone by post_delete
+    instance._linked_holiday_ids = list(instance.holidays.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=HolidayCategory)
+def sync_holidays_on_unlink(sender, instance, **kwargs):
+    """Drop a deleted country/category from its holidays' arrays and day index"""
+    from eld.apps.holidays.services.day_index import mark_stale
+
+    ids = getattr(instance, '_linked_holiday_ids', [])
+    if ids:
+        sync_holiday_arrays(ids)
+        mark_stale(Holiday.objects.filter(pk__in=ids).values_list('year', flat=True).distinct())
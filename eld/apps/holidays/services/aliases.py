@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from eld.apps.holidays.models import Holiday, HolidayAlias, sync_holiday_search
+from eld.apps.holidays.services.records import HolidayRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AliasMatch:
+    """A stored holiday that an alternative name resolves to"""
+    holiday_id: int
+    name: str
+    date: date
+
+
+class AliasIndex:
+    """
+    Canonical-name index over HolidayAlias for one refresh year.
+
+    Maps a normalized alternative name (e.g. "new year day") to the stored
+    holiday it was merged into ("New Year's Day"), so later refreshes can
+    rename incoming records up front instead of fuzzy-matching them again,
+    and save_holiday can update the existing row instead of inserting a
+    near-duplicate. Every merge that combines differently-named records
+    teaches the index (and the table) the new variants.
+    """
+
+    def __init__(self, year: Optional[int] = None, window_days: int = 3):
+        self.year = year
+        self.window = timedelta(days=window_days)
+        self._by_name: Dict[str, List[AliasMatch]] = {}
+        self._known = set()  # (holiday_id, alias name) pairs already stored
+
+        if year is not None:
+            rows = HolidayAlias.objects.filter(holiday__year=year).values_list(
+                'name', 'holiday_id', 'holiday__name', 'holiday__date'
+            )
+            for alias, holiday_id, name, holiday_date in rows:
+                self._add(alias, AliasMatch(holiday_id, name, holiday_date))
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def _add(self, alias: str, match: AliasMatch):
+        if (match.holiday_id, alias) in self._known:
+            return
+        self._known.add((match.holiday_id, alias))
+        self._by_name.setdefault(alias.lower().strip(), []).append(match)
+
+    def lookup(self, record: HolidayRecord) -> Optional[AliasMatch]:
+        """The holiday `record`'s name is a known alias of, on a nearby date"""
+        matches = self._by_name.get(record.name_key)
+        if not matches or record.date is None:
+            return None
+
+        nearby = [match for match in matches if abs(match.date - record.date) <= self.window]
+        if not nearby:
+            return None
+        return min(nearby, key=lambda match: abs(match.date - record.date))
+
+    def canonicalize(self, record: HolidayRecord) -> HolidayRecord:
+        """`record` renamed to its canonical holiday, or unchanged if it has none"""
+        match = self.lookup(record)
+        if match is None or (match.name == record.name and match.date == record.date):
+            return record
+
+        canonical = record.copy()
+        canonical.rename(match.name, match.date)
+        canonical.aliases = tuple(sorted(set(record.aliases) | {record.name}))
+        return canonical
+
+    def learn(self, holiday: Holiday, names: Iterable[str]) -> int:
+        """Store new alternative names for `holiday`; returns how many were added"""
+        return self.learn_many([(holiday, names)])
+
+    def learn_many(self, items: Iterable[Tuple[Holiday, Iterable[str]]]) -> int:
+        """learn() for several holidays with a single insert"""
+        new = {}
+        for holiday, names in items:
+            for name in names:
+                if name and name != holiday.name and (holiday.pk, name) not in self._known:
+                    new[(holiday.pk, name)] = holiday
+        if not new:
+            return 0
+
+        HolidayAlias.objects.bulk_create(
+            [HolidayAlias(holiday=holiday, name=name) for (_, name), holiday in sorted(new.items())],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save, so re-index the holidays here
+        sync_holiday_search({pk for pk, _ in new})
+        for (_, name), holiday in new.items():
+            self._add(name, AliasMatch(holiday.pk, holiday.name, holiday.date))
+        logger.debug(f"Learned {len(new)} aliases for {len({pk for pk, _ in new})} holidays")
+        return len(new)
@@ -0,0 +1,339 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+import logging
+
+from eld.apps.holidays.models import Holiday, sync_holiday_arrays, sync_holiday_search
+from eld.apps.holidays.services.persistence import BulkHolidayWriter
+from eld.apps.holidays.services.records import HolidayRecord
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RefreshWindow:
+    """
+    The stored holidays one refresh partition speaks for.
+
+    A country partition covers that year's holidays linked to the country;
+    a whole-year source partition (no country) covers that year's
+    country-less holidays from its sources. A stored holiday in the window
+    that the partition no longer reports is dropped, but only if every
+    source it came from answered this time, so an upstream outage never
+    deletes anything.
+    """
+    year: int
+    country_code: str = ''
+    sources: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def for_partition(cls, records: Iterable[HolidayRecord]) -> Optional['RefreshWindow']:
+        """Window of one partition's raw records, or None if they span several countries"""
+        records = list(records)
+        years = Counter(record.date.year for record in records if record.date is not None)
+        codes = {record.country_code for record in records}
+        if not years or len(codes) != 1:
+            return None
+        return cls(
+            year=years.most_common(1)[0][0],
+            country_code=codes.pop(),
+            sources=frozenset(source for record in records for source in record.all_sources),
+        )
+
+    def query(self) -> Q:
+        if self.country_code:
+            return Q(year=self.year, country_codes__contains=[self.country_code])
+        return Q(year=self.year, country_codes=[], sources__overlap=sorted(self.sources))
+
+    def answered_for(self, holiday: Holiday) -> bool:
+        """Whether every source of `holiday` reported in this window"""
+        sources = [source for source in holiday.sources if source]
+        return bool(sources) and all(source in self.sources for source in sources)
+
+
+@dataclass
+class ChangeSet:
+    """The minimal writes that bring stored holidays in line with a refresh"""
+    inserts: List[Holiday] = field(default_factory=list)
+    # Changed holidays, grouped by the columns that changed
+    updates: Dict[Tuple[str, ...], List[Holiday]] = field(default_factory=dict)
+    deletes: List[int] = field(default_factory=list)
+    # Through rows per M2M field: (holiday, related id) to add, row ids to remove
+    link_adds: Dict[str, List[Tuple[Holiday, int]]] = field(
+        default_factory=lambda: {'countries': [], 'categories': []}
+    )
+    link_removes: Dict[str, Set[int]] = field(
+        default_factory=lambda: {'countries': set(), 'categories': set()}
+    )
+    aliases: List[Tuple[Holiday, Set[str]]] = field(default_factory=list)
+    # Existing holidays touched by an update or a link change
+    changed_ids: Set[int] = field(default_factory=set)
+
+    @property
+    def counts(self) -> Tuple[int, int, int]:
+        """(inserted, updated, deleted) holidays"""
+        return len(self.inserts), len(self.changed_ids), len(self.deletes)
+
+    def apply(self, writer: BulkHolidayWriter):
+        """Write the change set; call inside a transaction"""
+        writer._upsert(self.inserts)
+
+        for fields, holidays in self.updates.items():
+            Holiday.objects.bulk_update(holidays, fields)
+
+        for name, row_ids in self.link_removes.items():
+            if row_ids:
+                getattr(Holiday, name).through.objects.filter(pk__in=row_ids).delete()
+
+        for name, pairs in self.link_adds.items():
+            field = Holiday._meta.get_field(name)
+            through = field.remote_field.through
+            column = field.m2m_reverse_field_name()
+            through.objects.bulk_create(
+                [through(holiday_id=holiday.pk, **{f'{column}_id': other}) for holiday, other in pairs],
+                ignore_conflicts=True,
+            )
+
+        if self.deletes:
+            Holiday.objects.filter(pk__in=self.deletes).delete()
+
+        touched = {holiday.pk for holiday in self.inserts} | self.changed_ids
+        if touched:
+            sync_holiday_arrays(touched)
+            sync_holiday_search(touched)
+
+        if writer.aliases is not None:
+            writer.aliases.learn_many(self.aliases)
+
+
+class DiffHolidayWriter(BulkHolidayWriter):
+    """
+    Saves a refresh partition as a change set against what is stored.
+
+    The partition's existing rows (by incoming name/date/year, alias match
+    or refresh window) and their country/category links are loaded in
+    three queries. Each target holiday's wanted state is compared field by
+    field and link by link, and only the differences are written: new
+    holidays are inserted, changed ones bulk-updated per set of changed
+    columns, stale links removed, and holidays the window no longer
+    reports unlinked or deleted. Unlike merging, upstream corrections to
+    descriptions and the public/global flags are applied.
+
+    Holidays that users saved to their calendars are never deleted.
+    """
+
+    def save(self, holidays: Iterable[Union[HolidayRecord, Dict]], window: RefreshWindow = None) -> Tuple[int, int, int]:
+        """Save one partition; returns (created, updated, deleted) counts"""
+        self.failed = False
+        records = self._valid_records(holidays)
+        if not records and window is None:
+            return 0, 0, 0
+
+        self._ensure_countries(records)
+        self._ensure_categories(records)
+        try:
+            with transaction.atomic():
+                changes = self.diff(records, window)
+                changes.apply(self)
+        except DatabaseError as e:
+            logger.error(f"Error saving {len(records)} holidays for {window or 'partition'}: {e}")
+            self.failed = True
+            return 0, 0, 0
+        return changes.counts
+
+    def _load(self, records: List[HolidayRecord], matches: Dict[int, int], window: Optional[RefreshWindow]):
+        query = Q(pk__in=[])
+        if records:
+            query |= Q(
+                name__in={record.name for record in records},
+                date__in={record.date for record in records},
+                year__in={record.date.year for record in records},
+            )
+        if matches:
+            query |= Q(pk__in=set(matches.values()))
+        if window is not None:
+            query |= window.query()
+
+        rows = {holiday.pk: holiday for holiday in Holiday.objects.filter(query)}
+        links = {}
+        for name in ('countries', 'categories'):
+            field = Holiday._meta.get_field(name)
+            column = f'{field.m2m_reverse_field_name()}_id'
+            links[name] = {pk: {} for pk in rows}
+            for row_id, holiday_id, other in field.remote_field.through.objects.filter(
+                holiday_id__in=rows
+            ).values_list('id', 'holiday_id', column):
+                links[name][holiday_id][other] = row_id
+        return rows, links
+
+    def diff(self, records: List[HolidayRecord], window: Optional[RefreshWindow]) -> ChangeSet:
+        """Compare the partition with what is stored"""
+        matches = {}
+        if self.aliases is not None:
+            for index, record in enumerate(records):
+                match = self.aliases.lookup(record)
+                if match is not None:
+                    matches[index] = match.holiday_id
+
+        rows, links = self._load(records, matches, window)
+        by_key = {(holiday.name, holiday.date, holiday.year): holiday for holiday in rows.values()}
+
+        # What each target holiday should look like, merging records that land on it
+        wanted = {}
+        for index, record in enumerate(records):
+            holiday = rows.get(matches[index]) if index in matches else None
+            if holiday is None:
+                key = (record.name, record.date, record.date.year)
+                holiday = by_key.get(key)
+                if holiday is None:
+                    holiday = by_key[key] = Holiday(
+                        name=record.name,
+                        slug=slugify(f"{record.name}-{record.date}"),
+                        date=record.date,
+                        year=record.date.year,
+                    )
+
+            want = wanted.get(id(holiday))
+            if want is None:
+                want = wanted[id(holiday)] = {
+                    'holiday': holiday,
+                    'description': '',
+                    'is_public_holiday': False,
+                    'is_global': False,
+                    'sources': [],
+                    'countries': set(),
+                    'categories': set(),
+                    'aliases': set(),
+                }
+            want['description'] = want['description'] or record.description
+            want['is_public_holiday'] |= record.is_public_holiday
+            want['is_global'] |= record.is_global
+            for source in record.all_sources:
+                if source not in want['sources']:
+                    want['sources'].append(source)
+            if record.country_code in self.countries:
+                want['countries'].add(self.countries[record.country_code])
+            want['categories'].update(
+                self.categories[slug] for slug in record.categories if slug in self.categories
+            )
+            want['aliases'].update(record.aliases + (record.name,))
+
+        changes = ChangeSet()
+        now = timezone.now()
+        for want in wanted.values():
+            holiday = want['holiday']
+            changes.aliases.append((holiday, want['aliases']))
+
+            if holiday.pk is None:
+                holiday.description = want['description']
+                holiday.is_public_holiday = want['is_public_holiday']
+                holiday.is_global = want['is_global']
+                holiday.sources = want['sources'] or ['']
+                changes.inserts.append(holiday)
+                for name in ('countries', 'categories'):
+                    changes.link_adds[name].extend((holiday, other) for other in sorted(want[name]))
+                continue
+
+            owned = self._owns(window, holiday, links)
+            changed = self._diff_fields(holiday, want, owned)
+            if changed:
+                holiday.last_verified = now
+                holiday.updated_at = now
+                changes.updates.setdefault(
+                    tuple(changed) + ('last_verified', 'updated_at'), []
+                ).append(holiday)
+                changes.changed_ids.add(holiday.pk)
+
+            # Countries only ever gain links here; the window drops stale ones below
+            have = links['countries'][holiday.pk]
+            for other in sorted(want['countries'] - have.keys()):
+                changes.link_adds['countries'].append((holiday, other))
+                changes.changed_ids.add(holiday.pk)
+
+            # Shared holidays only gain categories, like their flags
+            have = links['categories'][holiday.pk]
+            added = sorted(want['categories'] - have.keys())
+            removed = [
+                row_id for other, row_id in have.items() if other not in want['categories']
+            ] if owned and want['categories'] else []
+            for other in added:
+                changes.link_adds['categories'].append((holiday, other))
+            changes.link_removes['categories'].update(removed)
+            if added or removed:
+                changes.changed_ids.add(holiday.pk)
+
+        if window is not None:
+            self._drop_stale(window, rows, links, wanted, changes)
+        return changes
+
+    def _owns(self, window: Optional[RefreshWindow], holiday: Holiday, links) -> bool:
+        """
+        Whether the window speaks for all of `holiday`
+
+        True when every source of the holiday reported in the window and
+        the window covers every country it is linked to. Holidays shared
+        with other countries or sources only ever gain flags, categories
+        and descriptions, so partitions can't overwrite each other's values.
+        """
+        if window is None or not window.answered_for(holiday):
+            return False
+        countries = links['countries'][holiday.pk].keys()
+        if window.country_code:
+            return countries <= {self.countries.get(window.country_code)}
+        return not countries
+
+    @staticmethod
+    def _diff_fields(holiday: Holiday, want: Dict, owned: bool) -> List[str]:
+        """
+        Apply the wanted values to `holiday`; returns the columns that changed
+
+        Unless `owned`, flags are OR-ed with the stored ones and a stored
+        description is kept.
+        """
+        changed = []
+        description = want['description']
+        if description and description != holiday.description and (owned or not holiday.description):
+            holiday.description = description
+            changed.append('description')
+        for flag in ('is_public_holiday', 'is_global'):
+            value = want[flag] if owned else want[flag] or getattr(holiday, flag)
+            if value != getattr(holiday, flag):
+                setattr(holiday, flag, value)
+                changed.append(flag)
+        added = [source for source in want['sources'] if source not in holiday.sources]
+        if added:
+            holiday.sources = holiday.sources + added
+            changed.append('sources')
+        return changed
+
+    def _drop_stale(self, window: RefreshWindow, rows, links, wanted, changes: ChangeSet):
+        """Unlink or delete window holidays the partition no longer reports"""
+        reported = {id(want['holiday']) for want in wanted.values()}
+        country_id = self.countries.get(window.country_code)
+
+        stale = []
+        for holiday in rows.values():
+            if id(holiday) in reported or holiday.year != window.year:
+                continue
+            countries = links['countries'][holiday.pk]
+            in_window = country_id in countries if window.country_code else not countries
+            if in_window and window.answered_for(holiday):
+                stale.append(holiday)
+        if not stale:
+            return
+
+        saved = set(
+            Holiday.objects.filter(pk__in=[h.pk for h in stale], saved_by__isnull=False)
+            .values_list('pk', flat=True)
+        )
+        for holiday in stale:
+            countries = links['countries'][holiday.pk]
+            if (not window.country_code or countries.keys() == {country_id}) and holiday.pk not in saved:
+                changes.deletes.append(holiday.pk)
+            elif window.country_code and len(countries) > 1:
+                # Still observed elsewhere: just drop this country
+                changes.link_removes['countries'].add(countries[country_id])
+                changes.changed_ids.add(holiday.pk)
@@ -0,0 +1,149 @@
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Checked in order; the first matching rules give the category order.
+# fields: which texts the keywords are searched in
+# flag: a record attribute that also triggers the category when true
+DEFAULT_CATEGORY_RULES = [
+    {
+        'category': 'religious',
+        'keywords': ['christmas', 'easter', 'ramadan', 'eid', 'hanukkah', 'diwali',
+                     'buddha', 'prophet', 'saint', 'holy', 'religious'],
+        'fields': ['name', 'description'],
+    },
+    {
+        'category': 'public',
+        'keywords': ['national', 'independence'],
+        'fields': ['name'],
+        'flag': 'is_public_holiday',
+    },
+    {
+        'category': 'international',
+        'keywords': ['international', 'world', 'global', 'united nations', 'un day'],
+        'fields': ['name', 'description'],
+    },
+    {
+        'category': 'fun',
+        'keywords': ['day of', 'awareness', 'appreciation', 'pizza', 'coffee', 'cat',
+                     'dog', 'emoji', 'star wars', 'pi day', 'towel day'],
+        'fields': ['name'],
+    },
+    {
+        'category': 'seasonal',
+        'keywords': ['spring', 'summer', 'autumn', 'fall', 'winter', 'equinox',
+                     'solstice', 'harvest'],
+        'fields': ['name', 'description'],
+    },
+]
+
+DEFAULT_CATEGORY = 'public'
+
+# Texts a rule can search
+FIELDS = ('name', 'description')
+
+# Joins a batch's texts into one string; never part of a keyword
+_SEPARATOR = '\n'
+
+
+class KeywordClassifier:
+    """
+    Category rules compiled into a single regex.
+
+    Every keyword of every rule goes into one alternation inside a
+    lookahead, longest first, so one scan finds the longest keyword starting
+    at each position. Shorter keywords that are prefixes of it match there
+    too, so each keyword carries the set of keywords it implies. The
+    classifier gives the same answer as testing `keyword in text` for every
+    keyword, but reads each text once.
+
+    classify_batch() joins a whole batch into one string per field and
+    scans that once, mapping matches back to records by offset.
+    """
+
+    def __init__(self, rules: Optional[Sequence[Dict]] = None, default: str = DEFAULT_CATEGORY):
+        self.rules = [
+            {
+                'category': rule['category'],
+                'keywords': frozenset(k.lower() for k in rule.get('keywords', [])),
+                'fields': tuple(rule.get('fields', ('name', 'description'))),
+                'flag': rule.get('flag'),
+            }
+            for rule in (DEFAULT_CATEGORY_RULES if rules is None else rules)
+        ]
+        self.default = default
+        for rule in self.rules:
+            unknown = set(rule['fields']) - set(FIELDS)
+            if unknown:
+                raise ValueError(f"Category rule {rule['category']!r} has unknown fields {sorted(unknown)}")
+
+        keywords = sorted(
+            {keyword for rule in self.rules for keyword in rule['keywords'] if keyword},
+            key=lambda keyword: (-len(keyword), keyword),
+        )
+        self.pattern = (
+            re.compile('(?=(' + '|'.join(re.escape(k) for k in keywords) + '))')
+            if keywords else None
+        )
+        self.implies: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in keywords if keyword.startswith(other))
+            for keyword in keywords
+        }
+
+    def _scan(self, text: str) -> Set[str]:
+        found = set()
+        if self.pattern is not None and text:
+            for match in self.pattern.finditer(text):
+                found |= self.implies[match.group(1)]
+        return found
+
+    def _scan_batch(self, texts: List[str]) -> List[Set[str]]:
+        """Keywords found in each text, from one scan over all of them"""
+        found = [set() for _ in texts]
+        if self.pattern is None or not texts:
+            return found
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+
+        for match in self.pattern.finditer(_SEPARATOR.join(texts)):
+            found[bisect_right(starts, match.start()) - 1] |= self.implies[match.group(1)]
+        return found
+
+    def _categories(self, found: Dict[str, Set[str]], record) -> List[str]:
+        categories = []
+        for rule in self.rules:
+            if rule['category'] in categories:
+                continue
+            if (rule['flag'] and getattr(record, rule['flag'], False)) or any(
+                rule['keywords'] & found[field] for field in rule['fields']
+            ):
+                categories.append(rule['category'])
+
+        if not categories and self.default:
+            categories.append(self.default)
+        return categories
+
+    def classify(self, record) -> List[str]:
+        """Categories for one HolidayRecord"""
+        found = {
+            'name': self._scan(record.name.lower()),
+            'description': self._scan(record.description.lower()),
+        }
+        return self._categories(found, record)
+
+    def classify_batch(self, records: Iterable) -> List[List[str]]:
+        """Categories for many HolidayRecords, scanning each field of the batch once"""
+        records = list(records)
+        names = self._scan_batch([record.name.lower() for record in records])
+        descriptions = self._scan_batch([record.description.lower() for record in records])
+        return [
+            self._categories({'name': name, 'description': description}, record)
+            for record, name, description in zip(records, names, descriptions)
+        ]
@@ -0,0 +1,135 @@
+from datetime import date
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from typing import Dict, Iterable, List, Sequence, Tuple
+import logging
+
+from eld.apps.holidays.models import Holiday, HolidayDayIndex
+
+logger = logging.getLogger(__name__)
+
+# Key value for "no country filter" / "no category filter"
+ANY = ''
+
+# Country key global holidays are filed under; every country filter reads it too
+GLOBAL = '*'
+
+# (date, country_code, category_slug) -> holiday ids in display order
+IndexRows = Dict[Tuple[date, str, str], List[int]]
+
+# Cache flag of a year whose rows are out of date until its rebuild task runs
+STALE_KEY = 'holiday_day_index_stale:{}'
+
+
+def mark_stale(years: Iterable[int]):
+    """
+    Flag years whose holidays changed outside a refresh, and rebuild them in the background
+
+    Lookups of a flagged year are answered from Holiday directly until the
+    rebuild clears the flag. One rebuild task is queued per year, however
+    many edits flag it in the meantime.
+    """
+    from eld.apps.holidays.tasks import refresh_day_index
+
+    years = sorted(year for year in set(years) if year and cache.add(STALE_KEY.format(year), True, timeout=None))
+    if years:
+        transaction.on_commit(lambda: refresh_day_index.delay(years), robust=True)
+
+
+def build_rows(holidays: Iterable[Sequence]) -> IndexRows:
+    """
+    Index rows for holidays given as (id, date, country_codes, category_slugs, is_global)
+
+    Each holiday is filed under every (country, category) key a discovery
+    filter can ask for: its own countries and ANY, its categories and ANY.
+    Global holidays are also filed under GLOBAL, which lookups add to any
+    country, so a new country needs no rebuild. Ids keep the input order.
+    """
+    rows: IndexRows = {}
+    for pk, day, codes, slugs, is_global in holidays:
+        countries = set(codes) | {ANY} | ({GLOBAL} if is_global else set())
+        categories = set(slugs) | {ANY}
+        for country in countries:
+            for category in categories:
+                rows.setdefault((day, country, category), []).append(pk)
+    return rows
+
+
+class DayIndex:
+    """
+    Precomputed discovery windows.
+
+    The week, month and year views ask for the holidays of a date range,
+    optionally for one country (global holidays included) and one
+    category. HolidayDayIndex stores the answer per day, so a window is a
+    range read of the (country_code, category_slug, date) unique index,
+    after which the Holiday rows are fetched by primary key.
+
+    refresh() rebuilds one year from the denormalized country/category
+    arrays on Holiday and writes only the rows that changed. Refreshes
+    rebuild the years they touched; edits made elsewhere (admin, shell)
+    mark their years stale, see mark_stale().
+    """
+
+    def lookup(self, start: date, end: date, country: str = ANY, category: str = ANY) -> List[int]:
+        """Holiday ids from `start` to `end` (inclusive), ordered by date"""
+        years = range(start.year, end.year + 1)
+        if cache.get_many([STALE_KEY.format(year) for year in years]):
+            return self._lookup_holidays(start, end, country, category)
+
+        rows = HolidayDayIndex.objects.filter(
+            country_code__in=[country, GLOBAL] if country else [ANY],
+            category_slug=category or ANY,
+            date__range=(start, end),
+        ).order_by('date', 'country_code').values_list('holiday_ids', flat=True)
+        # A global holiday linked to the country is in both of its rows
+        return list(dict.fromkeys(pk for ids in rows for pk in ids))
+
+    @staticmethod
+    def _lookup_holidays(start: date, end: date, country: str, category: str) -> List[int]:
+        """The same ids straight from Holiday, while the index is being rebuilt"""
+        holidays = Holiday.objects.filter(year__in=range(start.year, end.year + 1), date__range=(start, end))
+        if country:
+            holidays = holidays.filter(Q(country_codes__contains=[country]) | Q(is_global=True))
+        if category:
+            holidays = holidays.filter(category_slugs__contains=[category])
+        return list(holidays.order_by('date', 'name').values_list('id', flat=True))
+
+    def refresh(self, year: int) -> Tuple[int, int, int]:
+        """Bring one year of the index in line with Holiday; returns (created, updated, deleted) rows"""
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        # Cleared first, so edits made during the rebuild flag it again
+        cache.delete(STALE_KEY.format(year))
+        holidays = (
+            Holiday.objects.filter(year=year)
+            .order_by('date', 'name')
+            .values_list('id', 'date', 'country_codes', 'category_slugs', 'is_global')
+        )
+        wanted = build_rows(holidays)
+
+        with transaction.atomic():
+            stored = {
+                (row.date, row.country_code, row.category_slug): row
+                for row in HolidayDayIndex.objects.filter(date__range=(start, end))
+            }
+            inserts = [
+                HolidayDayIndex(date=day, country_code=country, category_slug=category, holiday_ids=ids)
+                for (day, country, category), ids in wanted.items()
+                if (day, country, category) not in stored
+            ]
+            updates = []
+            for key, row in stored.items():
+                if key in wanted and row.holiday_ids != wanted[key]:
+                    row.holiday_ids = wanted[key]
+                    updates.append(row)
+            deletes = [row.pk for key, row in stored.items() if key not in wanted]
+
+            HolidayDayIndex.objects.bulk_create(inserts, batch_size=1000)
+            HolidayDayIndex.objects.bulk_update(updates, ['holiday_ids'], batch_size=1000)
+            HolidayDayIndex.objects.filter(pk__in=deletes).delete()
+
+        logger.info(
+            f"Day index {year}: {len(inserts)} rows created, {len(updates)} updated, {len(deletes)} deleted"
+        )
+        return len(inserts), len(updates), len(deletes)
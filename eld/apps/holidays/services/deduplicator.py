@@ -1,7 +1,21 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from difflib import SequenceMatcher
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import timedelta
+from django.conf import settings
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Union
 import logging
+import math
+import multiprocessing
+import os
+
+from eld.apps.holidays.services.records import HolidayRecord, parse_date, to_records
+
+if TYPE_CHECKING:
+    from eld.apps.holidays.services.aliases import AliasIndex
 
 logger = logging.getLogger(__name__)
 
@@ -22,51 +36,55 @@ class HolidayDeduplicator:
     # Date range for fuzzy date matching (lunar holidays, etc.)
     DATE_FUZZY_RANGE_DAYS = 3
     
-    def deduplicate(self, holidays: List[Dict]) -> List[Dict]:
+    # Inputs at least this large (one input, or the partitions given to
+    # deduplicate_many together) are deduplicated in a process pool
+    PARALLEL_THRESHOLD = 20000
+    
+    def __init__(self, workers: int = None, parallel_threshold: int = None):
+        self.workers = (
+            workers
+            or getattr(settings, 'HOLIDAY_DEDUPE_WORKERS', 0)
+            or os.cpu_count()
+            or 1
+        )
+        self.parallel_threshold = parallel_threshold or getattr(
+            settings, 'HOLIDAY_DEDUPE_PARALLEL_THRESHOLD', self.PARALLEL_THRESHOLD
+        )
+    
+    def deduplicate(
+        self,
+        holidays: List[Union[HolidayRecord, Dict]],
+        aliases: Optional['AliasIndex'] = None,
+    ) -> List[HolidayRecord]:
         """
         Remove duplicate holidays using fuzzy matching.
         
         Args:
-            holidays: List of holiday dicts from multiple sources
+            holidays: Holiday records (or dicts) from multiple sources
+            aliases: Known alternative names; matching records are renamed
+                to their canonical holiday first, so they merge by exact name
         
         Returns:
-            List of deduplicated holidays with sources merged
+            List of deduplicated records with sources merged; each record's
+            `aliases` holds the other names merged into it
         """
         if not holidays:
             return []
         
+        holidays = to_records(holidays)
+        if aliases is not None:
+            holidays = [aliases.canonicalize(holiday) for holiday in holidays]
+        
         # Group by date first for efficiency
-        by_date = self._group_by_date(holidays)
+        date_groups = list(self._group_by_date(holidays).values())
         
-        deduplicated = []
-        seen_indices = set()
+        if self.uses_processes(len(holidays), len(date_groups)):
+            deduplicated = self._deduplicate_parallel(date_groups)
+        else:
+            deduplicated = self._deduplicate_date_groups(date_groups)
         
-        for date, holidays_on_date in by_date.items():
-            # Deduplicate within each date group
-            for i, holiday in enumerate(holidays_on_date):
-                if i in seen_indices:
-                    continue
-                
-                # Find all similar holidays for this one
-                similar_group = [i]
-                
-                for j in range(i + 1, len(holidays_on_date)):
-                    if j in seen_indices:
-                        continue
-                    
-                    if self._are_similar(holiday, holidays_on_date[j]):
-                        similar_group.append(j)
-                
-                # Merge all similar holidays
-                merged = self._merge_holidays(
-                    [holidays_on_date[idx] for idx in similar_group]
-                )
-                deduplicated.append(merged)
-                
-                # Mark as seen
-                seen_indices.update(similar_group)
-        
-        # Check for fuzzy date matches (e.g., lunar holidays)
+        # Check for fuzzy date matches (e.g., lunar holidays); this spans
+        # date buckets, so it always runs here over the combined result
         deduplicated = self._merge_fuzzy_dates(deduplicated)
         
         logger.info(
@@ -76,38 +94,144 @@ class HolidayDeduplicator:
         
         return deduplicated
     
-    def _group_by_date(self, holidays: List[Dict]) -> Dict[str, List[Dict]]:
+    def deduplicate_many(self, inputs: List[List[HolidayRecord]]) -> List[List[HolidayRecord]]:
+        """
+        Deduplicate independent inputs, such as the country partitions of a
+        multi-year refresh; returns one result per input, in order.
+        
+        Each input gives what deduplicate() gives for it without aliases
+        (canonicalize first if needed). Partitions are small, but when they
+        add up to the parallel threshold they are spread over a process pool.
+        """
+        inputs = [to_records(holidays) for holidays in inputs]
+        if not self.uses_processes(sum(len(holidays) for holidays in inputs), len(inputs)):
+            return self._deduplicate_inputs(inputs)
+        
+        chunks = _split_chunks(inputs, self.workers * 4)
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                results = list(pool.map(self._deduplicate_inputs, chunks))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parallel dedupe failed, falling back to serial: {e}")
+            return self._deduplicate_inputs(inputs)
+        
+        return [deduplicated for chunk in results for deduplicated in chunk]
+    
+    def _deduplicate_inputs(self, inputs: List[List[HolidayRecord]]) -> List[List[HolidayRecord]]:
+        return [
+            self._merge_fuzzy_dates(
+                self._deduplicate_date_groups(list(self._group_by_date(holidays).values()))
+            )
+            for holidays in inputs
+        ]
+    
+    def uses_processes(self, size: int, group_count: int) -> bool:
+        """
+        Parallelize only large inputs, and never from a daemonic process
+        (e.g. a Celery prefork worker), which may not start children
+        """
+        return (
+            self.workers > 1
+            and group_count > 1
+            and size >= self.parallel_threshold
+            and not multiprocessing.current_process().daemon
+        )
+    
+    def _deduplicate_parallel(self, date_groups: List[List[HolidayRecord]]) -> List[HolidayRecord]:
+        """
+        Dedupe date buckets across a process pool.
+        
+        Buckets are independent, so they are cut into contiguous chunks of
+        similar size and the chunk results concatenated in order, which
+        gives exactly the serial output.
+        """
+        chunks = _split_chunks(date_groups, self.workers * 4)
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                results = list(pool.map(self._deduplicate_date_groups, chunks))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parallel dedupe failed, falling back to serial: {e}")
+            return self._deduplicate_date_groups(date_groups)
+        
+        return [holiday for chunk in results for holiday in chunk]
+    
+    def _deduplicate_date_groups(self, date_groups: List[List[HolidayRecord]]) -> List[HolidayRecord]:
+        deduplicated = []
+        for holidays_on_date in date_groups:
+            deduplicated.extend(self._deduplicate_date_group(holidays_on_date))
+        return deduplicated
+    
+    def _deduplicate_date_group(self, holidays: List[HolidayRecord]) -> List[HolidayRecord]:
+        """
+        Greedily merge same-date holidays with similar names.
+        
+        Each unmerged holiday, in input order, absorbs every later unmerged
+        holiday whose name scores at or above NAME_SIMILARITY_THRESHOLD
+        against it. Candidates come from a bigram index, so only pairs that
+        could possibly reach the threshold are scored.
+        """
+        names = [holiday.name_key for holiday in holidays]
+        index = _CandidateIndex(names, self.NAME_SIMILARITY_THRESHOLD)
+        # SequenceMatcher caches its analysis of the second sequence, so keep
+        # one per candidate name and only swap in the anchor
+        matchers = {}
+        
+        deduplicated = []
+        seen_indices = set()
+        
+        for i, name in enumerate(names):
+            if i in seen_indices:
+                continue
+            
+            similar_group = [i]
+            if name:
+                for j in index.candidates(i):
+                    if j in seen_indices or not names[j]:
+                        continue
+                    if names[j] == name:
+                        similar_group.append(j)
+                        continue
+                    matcher = matchers.get(j)
+                    if matcher is None:
+                        matcher = matchers[j] = SequenceMatcher(None, '', names[j])
+                    matcher.set_seq1(name)
+                    if self._names_similar(matcher):
+                        similar_group.append(j)
+            
+            deduplicated.append(
+                self._merge_holidays([holidays[idx] for idx in similar_group])
+            )
+            seen_indices.update(similar_group)
+        
+        return deduplicated
+    
+    def _names_similar(self, matcher: SequenceMatcher) -> bool:
+        """SequenceMatcher ratio test, with the cheap upper bounds first"""
+        return (
+            matcher.real_quick_ratio() >= self.NAME_SIMILARITY_THRESHOLD
+            and matcher.quick_ratio() >= self.NAME_SIMILARITY_THRESHOLD
+            and matcher.ratio() >= self.NAME_SIMILARITY_THRESHOLD
+        )
+    
+    def _group_by_date(self, holidays: List[HolidayRecord]) -> Dict[str, List[HolidayRecord]]:
         """Group holidays by date for faster comparison."""
         by_date = {}
         
         for holiday in holidays:
-            date = holiday.get('date')
-            if isinstance(date, str):
-                # Normalize date format
-                try:
-                    date_obj = datetime.fromisoformat(
-                        date.replace('Z', '+00:00')
-                    ).date()
-                    date_key = date_obj.isoformat()
-                except (ValueError, AttributeError):
-                    date_key = date
-            else:
-                date_key = date.isoformat() if hasattr(date, 'isoformat') else str(date)
-            
-            if date_key not in by_date:
-                by_date[date_key] = []
-            by_date[date_key].append(holiday)
+            if holiday.date_key not in by_date:
+                by_date[holiday.date_key] = []
+            by_date[holiday.date_key].append(holiday)
         
         return by_date
     
-    def _are_similar(self, holiday1: Dict, holiday2: Dict) -> bool:
+    def _are_similar(self, holiday1: HolidayRecord, holiday2: HolidayRecord) -> bool:
         """
         Check if two holidays are likely duplicates.
         
         Compares names and ensures they're on the same or nearby dates.
         """
-        name1 = holiday1.get('name', '').lower().strip()
-        name2 = holiday2.get('name', '').lower().strip()
+        name1 = holiday1.name_key
+        name2 = holiday2.name_key
         
         if not name1 or not name2:
             return False
@@ -119,7 +243,7 @@ class HolidayDeduplicator:
             return False
         
         # Check date proximity (for lunar/moving holidays)
-        if not self._dates_are_close(holiday1.get('date'), holiday2.get('date')):
+        if not self._dates_are_close(holiday1.date, holiday2.date):
             return False
         
         return True
@@ -146,131 +270,242 @@ class HolidayDeduplicator:
     
     def _parse_date(self, date_obj):
         """Parse various date formats."""
-        if isinstance(date_obj, str):
-            try:
-                return datetime.fromisoformat(
-                    date_obj.replace('Z', '+00:00')
-                ).date()
-            except (ValueError, AttributeError):
-                return None
-        
-        if hasattr(date_obj, 'date'):  # datetime object
-            return date_obj.date()
-        
-        if hasattr(date_obj, 'isoformat'):  # date object
-            return date_obj
-        
-        return None
+        return parse_date(date_obj)
     
-    def _merge_holidays(self, holidays: List[Dict]) -> Dict:
+    def _merge_holidays(self, holidays: List[HolidayRecord]) -> HolidayRecord:
         """
         Merge multiple similar holidays into one canonical entry.
         Prefers complete data and combines sources.
         """
-        if not holidays:
-            return {}
-        
         if len(holidays) == 1:
             return holidays[0].copy()
         
         # Start with the most complete entry
         merged = self._most_complete_holiday(holidays).copy()
         
-        # Merge sources
+        # Merge sources (an already-merged record carries both)
         sources = set()
         for h in holidays:
-            if isinstance(h.get('source'), str):
-                sources.add(h['source'])
-            elif isinstance(h.get('sources'), list):
-                sources.update(h['sources'])
+            if h.source:
+                sources.add(h.source)
+            sources.update(h.sources)
         
         if sources:
-            merged['sources'] = list(sources)
+            merged.sources = tuple(sorted(sources))
         
         # Merge categories (union of all categories)
         categories = set()
         for h in holidays:
-            if isinstance(h.get('categories'), list):
-                categories.update(h['categories'])
-            elif isinstance(h.get('category_type'), str):
-                categories.add(h['category_type'])
+            if h.categories:
+                categories.update(h.categories)
+            elif h.extra and isinstance(h.extra.get('category_type'), str):
+                categories.add(h.extra['category_type'])
         
         if categories:
-            merged['categories'] = list(categories)
+            merged.categories = tuple(sorted(categories))
         
         # Prefer description with more content
-        if 'description' not in merged or not merged['description']:
+        if not merged.description:
             for h in holidays:
-                if h.get('description'):
-                    merged['description'] = h['description']
+                if h.description:
+                    merged.description = h.description
                     break
         
         # Merge is_public_holiday (true if any source says it's public)
-        if any(h.get('is_public_holiday') for h in holidays):
-            merged['is_public_holiday'] = True
+        if any(h.is_public_holiday for h in holidays):
+            merged.is_public_holiday = True
         
         # Merge is_global (true if any source marks as global)
-        if any(h.get('is_global') for h in holidays):
-            merged['is_global'] = True
+        if any(h.is_global for h in holidays):
+            merged.is_global = True
+        
+        # Remember the other names, so the alias index can learn them
+        names = {h.name for h in holidays}
+        for h in holidays:
+            names.update(h.aliases)
+        names.discard(merged.name)
+        merged.aliases = tuple(sorted(names))
         
         return merged
     
-    def _most_complete_holiday(self, holidays: List[Dict]) -> Dict:
+    def _most_complete_holiday(self, holidays: List[HolidayRecord]) -> HolidayRecord:
         """
         Find the holiday entry with the most data fields filled.
         Used as base for merging.
         """
-        def completeness_score(h: Dict) -> int:
-            """Count non-empty fields."""
-            return sum(
-                1 for value in h.values()
-                if value and (not isinstance(value, list) or len(value) > 0)
-            )
-        
-        return max(holidays, key=completeness_score)
+        return max(holidays, key=HolidayRecord.completeness)
     
-    def _merge_fuzzy_dates(self, holidays: List[Dict]) -> List[Dict]:
+    def _merge_fuzzy_dates(self, holidays: List[HolidayRecord]) -> List[HolidayRecord]:
         """
         Find holidays with slightly different dates that are likely the same
         holiday (e.g., lunar-based holidays that move 1-2 days year to year).
+        
+        Holidays are grouped by normalized name and each group is swept in
+        date order, so only entries within DATE_FUZZY_RANGE_DAYS of an
+        anchor are looked at. Each anchor, in input order, absorbs every
+        later unmerged entry with the same name that is in range or has an
+        unparseable date; output keeps the anchors' input order.
         """
         if not holidays:
             return holidays
         
-        # Group by name and proximity
-        name_groups = {}
-        merged_set = set()
-        result = []
+        window = timedelta(days=self.DATE_FUZZY_RANGE_DAYS)
+        dates = [holiday.date for holiday in holidays]
         
+        name_groups = {}
         for idx, holiday in enumerate(holidays):
-            if idx in merged_set:
+            name_groups.setdefault(holiday.name_key, []).append(idx)
+        
+        merged_by_anchor = {}
+        
+        for indices in name_groups.values():
+            if len(indices) == 1:
+                merged_by_anchor[indices[0]] = holidays[indices[0]].copy()
                 continue
             
-            name = holiday.get('name', '').lower().strip()
+            dated = sorted((dates[idx], idx) for idx in indices if dates[idx] is not None)
+            sorted_dates = [date for date, _ in dated]
+            undated = [idx for idx in indices if dates[idx] is None]
+            merged_set = set()
             
-            # Find holidays with same name within fuzzy date range
-            similar = [idx]
-            for other_idx in range(idx + 1, len(holidays)):
-                if other_idx in merged_set:
+            for idx in indices:
+                if idx in merged_set:
                     continue
                 
-                other = holidays[other_idx]
-                other_name = other.get('name', '').lower().strip()
+                # An unparseable date could match anything
+                date = dates[idx]
+                if date is None:
+                    nearby = indices
+                else:
+                    lo = bisect_left(sorted_dates, date - window)
+                    hi = bisect_right(sorted_dates, date + window)
+                    nearby = [other for _, other in dated[lo:hi]] + undated
                 
-                if name == other_name and self._dates_are_close(
-                    holiday.get('date'), other.get('date')
-                ):
-                    similar.append(other_idx)
-            
-            # If we found similar entries, merge them
-            if len(similar) > 1:
-                merged = self._merge_holidays(
-                    [holidays[i] for i in similar]
+                similar = [idx] + sorted(
+                    other for other in nearby
+                    if other > idx and other not in merged_set
                 )
-                result.append(merged)
+                
+                if len(similar) > 1:
+                    merged_by_anchor[idx] = self._merge_holidays(
+                        [holidays[i] for i in similar]
+                    )
+                else:
+                    merged_by_anchor[idx] = holidays[idx].copy()
                 merged_set.update(similar)
-            else:
-                result.append(holiday.copy())
-                merged_set.add(idx)
         
-        return result
+        return [merged_by_anchor[idx] for idx in sorted(merged_by_anchor)]
+
+
+def _split_chunks(groups: List[List[HolidayRecord]], count: int) -> List[List[List[HolidayRecord]]]:
+    """Cut record groups (date buckets, partitions) into up to `count` contiguous chunks of similar record counts"""
+    target = max(1, sum(len(group) for group in groups) // count)
+    chunks = [[]]
+    size = 0
+    for group in groups:
+        if size >= target:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(group)
+        size += len(group)
+    return chunks
+
+
+@lru_cache(maxsize=None)
+def _min_matches(total_length: int, threshold: float) -> int:
+    """Fewest matching characters M with ratio 2M / total_length >= threshold"""
+    matches = max(0, math.ceil(threshold * total_length / 2) - 1)
+    while 2.0 * matches / total_length < threshold:
+        matches += 1
+    return matches
+
+
+@lru_cache(maxsize=None)
+def _min_shared_bigrams(length: int, threshold: float) -> int:
+    """
+    Lower bound on the bigrams a name of `length` must share with any name
+    that can reach `threshold` against it.
+    
+    If SequenceMatcher finds M matching characters in k blocks, the names
+    share at least M - k bigrams, and every boundary between blocks needs an
+    unmatched character, so k <= L - 2M + 1 (L = combined length). That
+    gives at least 3M - L - 1 shared bigrams, minimised over every partner
+    length the ratio's length bound allows.
+    """
+    bound = None
+    for other in range(1, 2 * length + 2):
+        total = length + other
+        if 2.0 * min(length, other) / total < threshold:
+            continue
+        shared = 3 * _min_matches(total, threshold) - total - 1
+        bound = shared if bound is None else min(bound, shared)
+    return bound if bound is not None else 0
+
+
+def _bigrams(name: str) -> List[Tuple[str, int]]:
+    """Bigram occurrences of a name; repeats are numbered so they count as a multiset"""
+    counts = {}
+    tokens = []
+    for k in range(len(name) - 1):
+        gram = name[k:k + 2]
+        counts[gram] = counts.get(gram, 0) + 1
+        tokens.append((gram, counts[gram]))
+    return tokens
+
+
+class _CandidateIndex:
+    """
+    Bigram inverted index with prefix filtering for one date group.
+    
+    A pair can only reach the similarity threshold if the names share at
+    least _min_shared_bigrams() bigrams, so it is enough to look up the
+    rarest (count - bound + 1) bigrams of each name: any qualifying partner
+    must contain one of them. The filter never drops a pair that
+    SequenceMatcher.ratio() would accept; names too short for the bound to
+    help are compared against every later name.
+    """
+    
+    def __init__(self, names: List[str], threshold: float):
+        self.names = names
+        self.threshold = threshold
+        self.tokens = [_bigrams(name) for name in names]
+        self.token_sets = [frozenset(tokens) for tokens in self.tokens]
+        
+        frequency = {}
+        for tokens in self.tokens:
+            for token in tokens:
+                frequency[token] = frequency.get(token, 0) + 1
+        
+        self.postings = {}
+        for idx, tokens in enumerate(self.tokens):
+            # Rarest first, ties broken by token for a stable order
+            tokens.sort(key=lambda token: (frequency[token], token))
+            for token in tokens:
+                self.postings.setdefault(token, []).append(idx)
+    
+    def candidates(self, idx: int) -> List[int]:
+        """Indices after `idx` that may be similar to it, in ascending order"""
+        length = len(self.names[idx])
+        required = _min_shared_bigrams(length, self.threshold)
+        if required <= 0:
+            found = range(idx + 1, len(self.names))
+        else:
+            tokens = self.tokens[idx]
+            found = set()
+            for token in tokens[:len(tokens) - required + 1]:
+                postings = self.postings[token]
+                found.update(islice(postings, bisect_right(postings, idx), None))
+        
+        # Exact per-pair bounds: length ratio and shared bigrams
+        token_set = self.token_sets[idx]
+        candidates = []
+        for other in sorted(found):
+            other_length = len(self.names[other])
+            total = length + other_length
+            if 2.0 * min(length, other_length) / total < self.threshold:
+                continue
+            shared = 3 * _min_matches(total, self.threshold) - total - 1
+            if shared > 0 and len(token_set & self.token_sets[other]) < shared:
+                continue
+            candidates.append(other)
+        return candidates
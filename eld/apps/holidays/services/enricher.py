@@ -1,7 +1,13 @@
 import requests
-from typing import Dict, List
+from typing import Dict, List, Union
 import logging
 
+from django.conf import settings
+
+from eld.apps.holidays.services.classifier import KeywordClassifier
+from eld.apps.holidays.services.records import HolidayRecord
+from eld.apps.holidays.services.wikipedia import WikipediaResolver
+
 logger = logging.getLogger(__name__)
 
 class HolidayEnricher:
@@ -13,23 +19,30 @@ class HolidayEnricher:
     - Category classification
     """
     
-    def __init__(self):
+    def __init__(self, category_rules=None, wikipedia: WikipediaResolver = None):
         self.flag_cache = {}
+        self.wikipedia = wikipedia or WikipediaResolver()
+        # Keyword rules for classify_holiday; see classifier.DEFAULT_CATEGORY_RULES
+        self.classifier = KeywordClassifier(
+            category_rules or getattr(settings, 'HOLIDAY_CATEGORY_RULES', None)
+        )
     
-    def enrich(self, holiday_data: Dict) -> Dict:
-        """Add enrichment data to a holiday"""
-        
+    def enrich(self, holiday_data: Union[HolidayRecord, Dict]) -> Dict:
+        """Add enrichment data to a holiday (enrich_batch resolves many in fewer requests)"""
+        return self.enrich_batch([holiday_data])[0]
+    
+    def _apply(self, holiday_data: Dict, categories: List[str], wikipedia_url: str) -> Dict:
         # Add flag emoji
         if 'country_code' in holiday_data and not holiday_data.get('flag_emoji'):
             holiday_data['flag_emoji'] = self.get_flag_emoji(holiday_data['country_code'])
         
         # Classify categories if not set
         if not holiday_data.get('categories'):
-            holiday_data['categories'] = self.classify_holiday(holiday_data)
+            holiday_data['categories'] = categories
         
-        # Add Wikipedia link if possible
+        # Add Wikipedia link ('' if there is no article)
         if not holiday_data.get('wikipedia_url'):
-            holiday_data['wikipedia_url'] = self.get_wikipedia_url(holiday_data.get('name', ''))
+            holiday_data['wikipedia_url'] = wikipedia_url
         
         return holiday_data
     
@@ -45,59 +58,36 @@ class HolidayEnricher:
         self.flag_cache[country_code] = flag
         return flag
     
-    def classify_holiday(self, holiday_data: Dict) -> List[str]:
+    def classify_holiday(self, holiday_data: Union[HolidayRecord, Dict]) -> List[str]:
         """Auto-classify holiday into categories"""
-        name = holiday_data.get('name', '').lower()
-        description = holiday_data.get('description', '').lower()
-        categories = []
-        
-        # Religious keywords
-        religious_keywords = ['christmas', 'easter', 'ramadan', 'eid', 'hanukkah', 'diwali', 
-                             'buddha', 'prophet', 'saint', 'holy', 'religious']
-        if any(keyword in name or keyword in description for keyword in religious_keywords):
-            categories.append('religious')
-        
-        # Public holiday indicators
-        if holiday_data.get('is_public_holiday') or 'national' in name or 'independence' in name:
-            categories.append('public')
-        
-        # International days
-        international_keywords = ['international', 'world', 'global', 'united nations', 'un day']
-        if any(keyword in name or keyword in description for keyword in international_keywords):
-            categories.append('international')
-        
-        # Fun/quirky days
-        fun_keywords = ['day of', 'awareness', 'appreciation', 'pizza', 'coffee', 'cat', 
-                       'dog', 'emoji', 'star wars', 'pi day', 'towel day']
-        if any(keyword in name for keyword in fun_keywords):
-            categories.append('fun')
-        
-        # Seasonal
-        seasonal_keywords = ['spring', 'summer', 'autumn', 'fall', 'winter', 'equinox', 
-                            'solstice', 'harvest']
-        if any(keyword in name or keyword in description for keyword in seasonal_keywords):
-            categories.append('seasonal')
-        
-        # Default to public if no category
-        if not categories:
-            categories.append('public')
-        
-        return categories
+        return self.classifier.classify(HolidayRecord.coerce(holiday_data))
     
     def get_wikipedia_url(self, holiday_name: str) -> str:
-        """Try to find Wikipedia URL for holiday"""
+        """Wikipedia URL for a holiday, or '' if there is no such article"""
         if not holiday_name:
             return ''
-        
-        # Format for Wikipedia URL
-        formatted_name = holiday_name.replace(' ', '_')
-        potential_url = f'https://en.wikipedia.org/wiki/{formatted_name}'
-        
-        # We could verify with a HEAD request, but skip for performance
-        # In production, you might want to verify or use Wikipedia API
-        
-        return potential_url
+        return self.wikipedia.resolve([holiday_name]).get(holiday_name, '')
     
-    def enrich_batch(self, holidays: List[Dict]) -> List[Dict]:
-        """Enrich multiple holidays at once"""
-        return [self.enrich(holiday) for holiday in holidays]
\ No newline at end of file
+    def enrich_batch(self, holidays: List[Union[HolidayRecord, Dict]]) -> List[Dict]:
+        """
+        Enrich multiple holidays at once: the whole batch is classified in one
+        pass and its Wikipedia links resolved in batched API requests
+        
+        Dicts are enriched in place; records are converted with to_dict().
+        """
+        holidays = [
+            holiday.to_dict() if isinstance(holiday, HolidayRecord) else holiday
+            for holiday in holidays
+        ]
+        unclassified = [holiday for holiday in holidays if not holiday.get('categories')]
+        categories = dict(zip(
+            map(id, unclassified),
+            self.classifier.classify_batch([HolidayRecord.coerce(holiday) for holiday in unclassified]),
+        ))
+        urls = self.wikipedia.resolve(
+            holiday.get('name', '') for holiday in holidays if not holiday.get('wikipedia_url')
+        )
+        return [
+            self._apply(holiday, categories.get(id(holiday)), urls.get(holiday.get('name', ''), ''))
+            for holiday in holidays
+        ]
@@ -0,0 +1,75 @@
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import json
+import logging
+
+from eld.apps.holidays.models import SourceFingerprint
+from eld.apps.holidays.services.records import HolidayRecord, to_records
+
+logger = logging.getLogger(__name__)
+
+# (source, country_code) -> sha256 hex digest; country_code is '' for whole-year sources
+Digests = Dict[Tuple[str, str], str]
+
+
+def fingerprint(records: Iterable[HolidayRecord]) -> str:
+    """Order-sensitive content hash of normalized holiday records"""
+    digest = hashlib.sha256()
+    for record in records:
+        digest.update(json.dumps(record.to_dict(), sort_keys=True, default=str).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def partition_digests(holidays: List[HolidayRecord]) -> Digests:
+    """Fingerprint each (source, country) slice of a partition's raw holidays"""
+    slices: Dict[Tuple[str, str], List[HolidayRecord]] = {}
+    for holiday in to_records(holidays):
+        key = (holiday.source or '', holiday.country_code)
+        slices.setdefault(key, []).append(holiday)
+    return {key: fingerprint(records) for key, records in slices.items()}
+
+
+class FingerprintStore:
+    """
+    Last-seen payload fingerprints for one refresh year.
+    
+    Loaded with one query; a partition whose every (source, country) slice
+    matches what was stored last time can skip dedupe and all DB work.
+    """
+    
+    def __init__(self, year: int):
+        self.year = year
+        self.digests: Digests = {
+            (source, country_code): digest
+            for source, country_code, digest in SourceFingerprint.objects.filter(
+                year=year
+            ).values_list('source', 'country_code', 'digest')
+        }
+    
+    def unchanged(self, digests: Digests) -> bool:
+        return bool(digests) and all(
+            self.digests.get(key) == digest for key, digest in digests.items()
+        )
+    
+    def save(self, digests: Digests):
+        """Record fingerprints once their partition has been persisted"""
+        changed = {
+            key: digest for key, digest in digests.items()
+            if self.digests.get(key) != digest
+        }
+        if not changed:
+            return
+        
+        SourceFingerprint.objects.bulk_create(
+            [
+                SourceFingerprint(
+                    source=source, country_code=country_code, year=self.year, digest=digest
+                )
+                for (source, country_code), digest in changed.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['source', 'country_code', 'year'],
+            update_fields=['digest', 'updated_at'],
+        )
+        self.digests.update(changed)
@@ -1,11 +1,87 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from django.conf import settings
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
 import logging
+import random
+import threading
+
+from eld.apps.holidays.services.http_cache import ResponseCache
+from eld.apps.holidays.services.rate_limiter import AdaptiveConcurrency, TokenBucket, get_rate_limiter
+from eld.apps.holidays.services.records import HolidayRecord, to_records
+from eld.apps.holidays.services.recorder import FixtureArchive, RecordingAdapter, ReplayAdapter
+from eld.apps.holidays.services.rules import COUNTRY_RULES, FUN_DAYS, UN_OBSERVANCES, country_holidays, generate
+from eld.apps.holidays.services.sources import registry
 
 logger = logging.getLogger(__name__)
 
+# Max in-flight requests per source when fetching country by country
+DEFAULT_CONCURRENCY = {
+    'nager': 8,
+    'calendarific': 4,
+    'abstract': 2,
+}
+
+# Fetch modes: hit upstream, hit upstream and record, or serve recorded responses
+FETCH_MODES = ('live', 'record', 'replay')
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class BackoffRetry(Retry):
+    """
+    Exponential backoff with jitter, so parallel workers that were throttled
+    together don't retry in lockstep. A Retry-After header still takes
+    precedence over the computed backoff.
+    
+    Retries are requests too: with a `limiter`, each one takes a token after
+    its backoff, and every 429 blocks the shared bucket so all workers pause,
+    not just the thread that was told. on_throttle(seconds) is also called
+    for every 429 (the fetcher uses it to lower the source's concurrency).
+    """
+    
+    def __init__(
+        self,
+        *args,
+        limiter: Optional[TokenBucket] = None,
+        on_throttle: Optional[Callable[[float], None]] = None,
+        **kwargs,
+    ):
+        self.limiter = limiter
+        self.on_throttle = on_throttle
+        super().__init__(*args, **kwargs)
+    
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.limiter = self.limiter
+        retry.on_throttle = self.on_throttle
+        return retry
+    
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return random.uniform(backoff / 2, backoff) if backoff else 0
+    
+    def increment(self, method=None, url=None, response=None, error=None, *args, **kwargs):
+        if response is not None and response.status == 429:
+            retry_after = self.get_retry_after(response)
+            seconds = retry_after if retry_after is not None else max(1.0, self.get_backoff_time())
+            if self.limiter:
+                self.limiter.block(seconds)
+            if self.on_throttle:
+                self.on_throttle(seconds)
+        return super().increment(method, url, response, error, *args, **kwargs)
+    
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.limiter:
+            self.limiter.acquire()
+
+
 class HolidayFetcher:
     """
     Fetches holidays from 10+ sources:
@@ -21,210 +97,503 @@ class HolidayFetcher:
     10. Google Calendar public holidays
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        cache: Optional[ResponseCache] = None,
+        mode: Optional[str] = None,
+        fixtures: Optional[str] = None,
+        strict: bool = False,
+    ):
         self.nager_key = settings.NAGER_API_KEY
         self.calendarific_key = settings.CALENDARIFIC_API_KEY
         self.abstract_key = settings.ABSTRACT_API_KEY
+        
+        # Record/replay of raw upstream responses for offline benchmarking
+        self.mode = mode or getattr(settings, 'HOLIDAY_FETCH_MODE', 'live')
+        if self.mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode {self.mode!r}, expected one of {FETCH_MODES}")
+        
+        self.archive = None
+        if self.mode != 'live':
+            fixtures = fixtures or getattr(settings, 'HOLIDAY_FETCH_FIXTURES', '')
+            if not fixtures:
+                raise ValueError(f"Fetch mode {self.mode!r} needs a fixtures archive path")
+            if self.mode == 'record':
+                self.archive = FixtureArchive(fixtures)
+            else:
+                self.archive = FixtureArchive.load(fixtures)
+                # Keys are stripped from recordings; any value replays them
+                if self.archive.has_host('calendarific.com'):
+                    self.calendarific_key = self.calendarific_key or 'replay'
+                if self.archive.has_host('holidays.abstractapi.com'):
+                    self.abstract_key = self.abstract_key or 'replay'
+        
+        # Per-source concurrency limits (settings override defaults, args override both)
+        self.concurrency = {
+            **DEFAULT_CONCURRENCY,
+            **getattr(settings, 'HOLIDAY_FETCH_CONCURRENCY', {}),
+            **(concurrency or {}),
+        }
+        
+        # Country names from country listings, keyed by code; sharded
+        # fetches are handed theirs instead of listing again
+        self.country_names = {}
+        
+        # One pooled keep-alive session per source, created on first use
+        self.timeout = getattr(settings, 'HOLIDAY_FETCH_TIMEOUT', 10)
+        self.retries = getattr(settings, 'HOLIDAY_FETCH_RETRIES', 4)
+        self.backoff_factor = getattr(settings, 'HOLIDAY_FETCH_BACKOFF', 0.5)
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        
+        # Per-source token buckets from HOLIDAY_RATE_LIMITS, shared across
+        # workers through Redis, and in-flight caps that shrink on 429s;
+        # replays never touch the providers
+        self.rate_limiters = {}
+        self.in_flight = {}
+        if self.mode != 'replay':
+            for source, limit in self.concurrency.items():
+                limiter = get_rate_limiter(source)
+                if limiter:
+                    self.rate_limiters[source] = limiter
+                self.in_flight[source] = AdaptiveConcurrency(source, limit)
+        
+        # Conditional-request cache; disabled when no directory is configured,
+        # and when recording or replaying, which need full responses
+        if self.mode != 'live':
+            cache = None
+        elif cache is None and getattr(settings, 'HOLIDAY_HTTP_CACHE_DIR', ''):
+            cache = ResponseCache(
+                settings.HOLIDAY_HTTP_CACHE_DIR,
+                ttl=getattr(settings, 'HOLIDAY_HTTP_CACHE_TTL', 7 * 24 * 3600),
+                max_bytes=getattr(settings, 'HOLIDAY_HTTP_CACHE_MAX_BYTES', 200 * 1024 * 1024),
+            )
+        self.cache = cache
+        
+        # Requests that still failed after retries, per source. In strict mode
+        # they also raise instead of yielding an empty result, so a caller
+        # such as a Celery shard can retry the work.
+        self.strict = strict
+        self.errors = {}
+        self._errors_lock = threading.Lock()
+        
+        # Per-source latency/records/errors from the last fetch_all_holidays()
+        self.source_stats = {}
     
-    def fetch_all_holidays(self, year: int = None) -> List[Dict]:
-        """Fetch from all sources and return merged list"""
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Close all pooled sessions and write out any recording"""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        
+        if self.mode == 'record':
+            self.archive.save()
+    
+    def _session(self, source: str) -> requests.Session:
+        """Return the pooled session for a source, creating it on first use"""
+        with self._sessions_lock:
+            session = self._sessions.get(source)
+            if session is None:
+                session = self._build_session(source)
+                self._sessions[source] = session
+            return session
+    
+    def _build_session(self, source: str) -> requests.Session:
+        """Create a keep-alive session sized to the source's concurrency"""
+        session = requests.Session()
+        
+        if self.mode == 'replay':
+            adapter = ReplayAdapter(self.archive)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+        
+        in_flight = self.in_flight.get(source)
+        retry = BackoffRetry(
+            limiter=self.rate_limiters.get(source),
+            on_throttle=in_flight.throttled if in_flight else None,
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+        )
+        adapter_options = {
+            'pool_connections': 1,
+            'pool_maxsize': max(1, self.concurrency.get(source, 1)),
+            'max_retries': retry,
+        }
+        if self.mode == 'record':
+            adapter = RecordingAdapter(self.archive, **adapter_options)
+        else:
+            adapter = HTTPAdapter(**adapter_options)
+        
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _get(
+        self,
+        source: str,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> requests.Response:
+        """
+        GET through the source's pooled session.
+        
+        Transient failures are retried by the session; anything that still
+        fails raises, so callers never mistake an error for an empty result.
+        Waits for a free slot under the source's adaptive concurrency cap and
+        for its rate limiter first (retries take their own tokens).
+        """
+        in_flight = self.in_flight.get(source)
+        with in_flight or nullcontext():
+            limiter = self.rate_limiters.get(source)
+            if limiter:
+                limiter.acquire()
+            
+            response = self._session(source).get(
+                url, params=params, headers=headers, timeout=self.timeout
+            )
+        response.raise_for_status()
+        return response
+    
+    def _get_parsed(
+        self,
+        source: str,
+        url: str,
+        parse: Callable[[Any], List],
+        params: Optional[Dict] = None,
+    ) -> List:
+        """
+        GET a JSON payload and return parse(payload), revalidating against the cache.
+        
+        A cached entry's ETag/Last-Modified are sent as conditional headers;
+        a 304 replays the stored normalized records without parsing.
+        """
+        if self.cache is None:
+            return parse(self._get(source, url, params=params).json())
+        
+        key = self.cache.key(url, params)
+        entry = self.cache.get(key)
+        
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = self._get(source, url, params=params, headers=headers)
+        
+        if response.status_code == 304 and entry:
+            self.cache.touch(key)
+            return entry['records']
+        
+        records = parse(response.json())
+        self.cache.set(
+            key,
+            url,
+            records,
+            etag=response.headers.get('ETag', ''),
+            last_modified=response.headers.get('Last-Modified', ''),
+        )
+        return records
+    
+    def _record_error(self, source: str, error: Exception):
+        """Count a request that failed after all retries; re-raises it in strict mode"""
+        with self._errors_lock:
+            self.errors[source] = self.errors.get(source, 0) + 1
+        if self.strict:
+            raise error
+    
+    def fetch_all_holidays(self, year: int = None, sources: Optional[List[str]] = None) -> List[HolidayRecord]:
+        """
+        Fetch from all registered sources in parallel and return merged list
+        
+        Per-source latency, record and error counts are kept in self.source_stats.
+        """
         if year is None:
             year = datetime.now().year
         
-        all_holidays = []
-        
-        # Fetch from each source
-        all_holidays.extend(self.fetch_nager(year))
-        all_holidays.extend(self.fetch_calendarific(year))
-        all_holidays.extend(self.fetch_abstract(year))
-        all_holidays.extend(self.fetch_un_observances(year))
-        all_holidays.extend(self.fetch_fun_holidays(year))
+        all_holidays, self.source_stats = registry.run(
+            self,
+            year,
+            names=sources,
+            timeouts=getattr(settings, 'HOLIDAY_SOURCE_TIMEOUTS', {}),
+        )
+        all_holidays = to_records(all_holidays)
         
         logger.info(f"Fetched {len(all_holidays)} total holidays for {year}")
+        for name, stats in self.source_stats.items():
+            logger.info(
+                f"  {name}: {stats['records']} holidays in {stats['latency']}s, "
+                f"{stats['errors']} errors"
+            )
         return all_holidays
     
+    def iter_partitions(self, year: int = None, sources: Optional[List[str]] = None):
+        """
+        Stream holidays partitioned by country as soon as each partition is complete
+        
+        Yields (partition_key, records) pairs while later partitions are still
+        downloading; see SourceRegistry.iter_partitions. Per-source stats are
+        in self.source_stats once the generator is exhausted.
+        """
+        if year is None:
+            year = datetime.now().year
+        
+        self.source_stats = {}
+        for key, holidays in registry.iter_partitions(
+            self,
+            year,
+            names=sources,
+            timeouts=getattr(settings, 'HOLIDAY_SOURCE_TIMEOUTS', {}),
+            stats=self.source_stats,
+        ):
+            yield key, to_records(holidays)
+    
+    def fetch_countries(
+        self,
+        source: str,
+        fetch_country: Callable[[int, str], List[Dict]],
+        year: int,
+        countries: List[str],
+    ) -> List[Dict]:
+        """
+        Run fetch_country for each country with bounded parallelism.
+        
+        Results are concatenated in the order of `countries`, so the output
+        matches a sequential fetch regardless of which request finishes first.
+        """
+        workers = max(1, min(self.concurrency.get(source, 1), len(countries)))
+        
+        if workers == 1:
+            chunks = [fetch_country(year, country) for country in countries]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix=f'fetch-{source}',
+            ) as pool:
+                chunks = list(pool.map(lambda country: fetch_country(year, country), countries))
+        
+        return [holiday for chunk in chunks for holiday in chunk]
+    
+    @registry.register('nager')
     def fetch_nager(self, year: int) -> List[Dict]:
         """Fetch from Nager.Date API (195+ countries)"""
-        holidays = []
+        codes = self.nager_countries(year)
+        holidays = self.fetch_countries('nager', self._fetch_nager_country, year, codes)
         
+        logger.info(f"Nager.Date: {len(holidays)} holidays")
+        return holidays
+    
+    @registry.register_countries('nager')
+    def nager_countries(self, year: int) -> List[str]:
+        """Country codes to fetch from Nager.Date"""
         # Get list of available countries
         try:
-            countries_response = requests.get(
-                'https://date.nager.at/api/v3/AvailableCountries',
-                timeout=10
+            countries = self._get_parsed(
+                'nager', 'https://date.nager.at/api/v3/AvailableCountries', list
             )
-            countries = countries_response.json()
-            
-            for country in countries[:50]:  # Limit for demo
-                try:
-                    url = f'https://date.nager.at/api/v3/PublicHolidays/{year}/{country["countryCode"]}'
-                    response = requests.get(url, timeout=10)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        for item in data:
-                            holidays.append({
-                                'name': item['name'],
-                                'date': item['date'],
-                                'country_code': country['countryCode'],
-                                'country_name': country.get('name', ''),
-                                'is_public_holiday': item.get('global', False),
-                                'categories': ['public'],
-                                'source': 'nager',
-                            })
-                except Exception as e:
-                    logger.error(f"Error fetching Nager for {country['countryCode']}: {e}")
-                    continue
-        
         except Exception as e:
             logger.error(f"Error fetching Nager countries: {e}")
+            self._record_error('nager', e)
+            countries = []
+        
+        self.country_names.update(
+            (country['countryCode'], country.get('name', '')) for country in countries
+        )
+        # Countries computed locally by the rules source need no API call
+        computed = getattr(settings, 'HOLIDAY_COMPUTED_COUNTRIES', None)
+        computed = set(COUNTRY_RULES if computed is None else computed)
+        return [country['countryCode'] for country in countries if country['countryCode'] not in computed]
+    
+    @registry.register_country_fetch('nager')
+    def _fetch_nager_country(self, year: int, country_code: str) -> List[Dict]:
+        """Fetch one country's public holidays from Nager.Date"""
+        holidays = []
+        country_name = self.country_names.get(country_code, '')
+        
+        def parse(data) -> List[Dict]:
+            return [
+                {
+                    'name': item['name'],
+                    'date': item['date'],
+                    'country_code': country_code,
+                    'country_name': country_name,
+                    'is_public_holiday': item.get('global', False),
+                    'categories': ['public'],
+                    'source': 'nager',
+                }
+                for item in data
+            ]
+        
+        try:
+            url = f'https://date.nager.at/api/v3/PublicHolidays/{year}/{country_code}'
+            holidays = self._get_parsed('nager', url, parse)
+        except Exception as e:
+            logger.error(f"Error fetching Nager for {country_code}: {e}")
+            self._record_error('nager', e)
         
-        logger.info(f"Nager.Date: {len(holidays)} holidays")
         return holidays
     
+    @registry.register('calendarific')
     def fetch_calendarific(self, year: int) -> List[Dict]:
         """Fetch from Calendarific API"""
-        holidays = []
+        countries = self.calendarific_countries(year)
+        holidays = self.fetch_countries(
+            'calendarific', self._fetch_calendarific_country, year, countries
+        )
         
+        logger.info(f"Calendarific: {len(holidays)} holidays")
+        return holidays
+    
+    @registry.register_countries('calendarific')
+    def calendarific_countries(self, year: int) -> List[str]:
+        """Country codes to fetch from Calendarific"""
         if not self.calendarific_key:
             logger.warning("Calendarific API key not configured")
-            return holidays
+            return []
         
         # Major countries
-        countries = ['US', 'GB', 'CA', 'AU', 'IN', 'DE', 'FR', 'IT', 'ES', 'BR']
-        
-        for country in countries:
-            try:
-                url = f'https://calendarific.com/api/v2/holidays'
-                params = {
-                    'api_key': self.calendarific_key,
-                    'country': country,
-                    'year': year
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'response' in data and 'holidays' in data['response']:
-                        for item in data['response']['holidays']:
-                            categories = []
-                            if 'National holiday' in item.get('type', []):
-                                categories.append('public')
-                            if 'Observance' in item.get('type', []):
-                                categories.append('international')
-                            
-                            holidays.append({
-                                'name': item['name'],
-                                'date': item['date']['iso'],
-                                'country_code': country,
-                                'description': item.get('description', ''),
-                                'is_public_holiday': 'National holiday' in item.get('type', []),
-                                'categories': categories or ['public'],
-                                'source': 'calendarific',
-                            })
+        return ['US', 'GB', 'CA', 'AU', 'IN', 'DE', 'FR', 'IT', 'ES', 'BR']
+    
+    @registry.register_country_fetch('calendarific')
+    def _fetch_calendarific_country(self, year: int, country: str) -> List[Dict]:
+        """Fetch one country's holidays from Calendarific"""
+        holidays = []
+        
+        def parse(data) -> List[Dict]:
+            parsed = []
+            if 'response' in data and 'holidays' in data['response']:
+                for item in data['response']['holidays']:
+                    categories = []
+                    if 'National holiday' in item.get('type', []):
+                        categories.append('public')
+                    if 'Observance' in item.get('type', []):
+                        categories.append('international')
+                    
+                    parsed.append({
+                        'name': item['name'],
+                        'date': item['date']['iso'],
+                        'country_code': country,
+                        'description': item.get('description', ''),
+                        'is_public_holiday': 'National holiday' in item.get('type', []),
+                        'categories': categories or ['public'],
+                        'source': 'calendarific',
+                    })
+            return parsed
+        
+        try:
+            url = f'https://calendarific.com/api/v2/holidays'
+            params = {
+                'api_key': self.calendarific_key,
+                'country': country,
+                'year': year
+            }
             
-            except Exception as e:
-                logger.error(f"Error fetching Calendarific for {country}: {e}")
-                continue
+            holidays = self._get_parsed('calendarific', url, parse, params=params)
+        
+        except Exception as e:
+            logger.error(f"Error fetching Calendarific for {country}: {e}")
+            self._record_error('calendarific', e)
         
-        logger.info(f"Calendarific: {len(holidays)} holidays")
         return holidays
     
+    @registry.register('abstract')
     def fetch_abstract(self, year: int) -> List[Dict]:
         """Fetch from AbstractAPI"""
-        holidays = []
+        countries = self.abstract_countries(year)
+        holidays = self.fetch_countries('abstract', self._fetch_abstract_country, year, countries)
         
+        logger.info(f"AbstractAPI: {len(holidays)} holidays")
+        return holidays
+    
+    @registry.register_countries('abstract')
+    def abstract_countries(self, year: int) -> List[str]:
+        """Country codes to fetch from AbstractAPI"""
         if not self.abstract_key:
             logger.warning("AbstractAPI key not configured")
-            return holidays
+            return []
         
-        countries = ['US', 'GB', 'CA']
+        return ['US', 'GB', 'CA']
+    
+    @registry.register_country_fetch('abstract')
+    def _fetch_abstract_country(self, year: int, country: str) -> List[Dict]:
+        """Fetch one country's holidays from AbstractAPI"""
+        holidays = []
         
-        for country in countries:
-            try:
-                url = f'https://holidays.abstractapi.com/v1/'
-                params = {
-                    'api_key': self.abstract_key,
-                    'country': country,
-                    'year': year
+        def parse(data) -> List[Dict]:
+            return [
+                {
+                    'name': item['name'],
+                    'date': item['date'],
+                    'country_code': country,
+                    'is_public_holiday': item.get('type') == 'National',
+                    'categories': ['public'],
+                    'source': 'abstract',
                 }
-                
-                response = requests.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for item in data:
-                        holidays.append({
-                            'name': item['name'],
-                            'date': item['date'],
-                            'country_code': country,
-                            'is_public_holiday': item.get('type') == 'National',
-                            'categories': ['public'],
-                            'source': 'abstract',
-                        })
+                for item in data
+            ]
+        
+        try:
+            url = f'https://holidays.abstractapi.com/v1/'
+            params = {
+                'api_key': self.abstract_key,
+                'country': country,
+                'year': year
+            }
             
-            except Exception as e:
-                logger.error(f"Error fetching Abstract for {country}: {e}")
-                continue
+            holidays = self._get_parsed('abstract', url, parse, params=params)
+        
+        except Exception as e:
+            logger.error(f"Error fetching Abstract for {country}: {e}")
+            self._record_error('abstract', e)
         
-        logger.info(f"AbstractAPI: {len(holidays)} holidays")
         return holidays
     
+    @registry.register('un')
     def fetch_un_observances(self, year: int) -> List[Dict]:
         """Fetch UN International Days"""
-        holidays = []
-        
-        # Major UN observances (hardcoded for reliability)
-        un_days = [
-            {'name': 'International Women\'s Day', 'date': f'{year}-03-08', 'description': 'Celebrating women\'s achievements'},
-            {'name': 'World Health Day', 'date': f'{year}-04-07', 'description': 'WHO celebration'},
-            {'name': 'Earth Day', 'date': f'{year}-04-22', 'description': 'Environmental protection'},
-            {'name': 'International Workers\' Day', 'date': f'{year}-05-01', 'description': 'Labor day'},
-            {'name': 'World Environment Day', 'date': f'{year}-06-05', 'description': 'UN Environment Programme'},
-            {'name': 'International Peace Day', 'date': f'{year}-09-21', 'description': 'Peace and non-violence'},
-            {'name': 'World Food Day', 'date': f'{year}-10-16', 'description': 'FAO celebration'},
-            {'name': 'Human Rights Day', 'date': f'{year}-12-10', 'description': 'Universal Declaration'},
-        ]
-        
-        for day in un_days:
-            holidays.append({
-                'name': day['name'],
-                'date': day['date'],
-                'description': day['description'],
-                'is_global': True,
-                'categories': ['international'],
-                'source': 'un',
-            })
+        holidays = UN_OBSERVANCES.holidays(year)
         
         logger.info(f"UN Observances: {len(holidays)} holidays")
         return holidays
     
+    @registry.register('curated')
     def fetch_fun_holidays(self, year: int) -> List[Dict]:
         """Fetch fun/quirky holidays"""
-        holidays = []
-        
-        # Fun days (curated list)
-        fun_days = [
-            {'name': 'Star Wars Day', 'date': f'{year}-05-04', 'description': 'May the 4th be with you!'},
-            {'name': 'Pi Day', 'date': f'{year}-03-14', 'description': 'Celebrating π (3.14)'},
-            {'name': 'International Cat Day', 'date': f'{year}-08-08', 'description': 'Celebrating our feline friends'},
-            {'name': 'International Coffee Day', 'date': f'{year}-10-01', 'description': 'For coffee lovers worldwide'},
-            {'name': 'World Emoji Day', 'date': f'{year}-07-17', 'description': '📅 Celebrating emojis!'},
-            {'name': 'International Pizza Day', 'date': f'{year}-02-09', 'description': '🍕 Pizza lovers unite!'},
-            {'name': 'World Chocolate Day', 'date': f'{year}-07-07', 'description': '🍫 Sweet celebration'},
-            {'name': 'International Friendship Day', 'date': f'{year}-07-30', 'description': 'Celebrating friendships'},
-        ]
-        
-        for day in fun_days:
-            holidays.append({
-                'name': day['name'],
-                'date': day['date'],
-                'description': day['description'],
-                'is_global': True,
-                'categories': ['fun'],
-                'source': 'curated',
-            })
+        holidays = FUN_DAYS.holidays(year)
         
         logger.info(f"Fun holidays: {len(holidays)} holidays")
-        return holidays
\ No newline at end of file
+        return holidays
+    
+    @registry.register('rules')
+    def fetch_rule_holidays(self, year: int) -> List[Dict]:
+        """Compute rule-based public holidays (no network)"""
+        holidays = generate(
+            [COUNTRY_RULES[code] for code in self.rule_countries(year)], [year]
+        )
+        
+        logger.info(f"Rules: {len(holidays)} holidays")
+        return holidays
+    
+    @registry.register_countries('rules')
+    def rule_countries(self, year: int) -> List[str]:
+        """Country codes with a local rule table"""
+        return sorted(COUNTRY_RULES)
+    
+    @registry.register_country_fetch('rules')
+    def _fetch_rule_country(self, year: int, country_code: str) -> List[Dict]:
+        """Compute one country's public holidays from its rule table"""
+        return country_holidays(country_code, [year])
@@ -0,0 +1,164 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of upstream API responses.
+    
+    One JSON file per URL holds the validators (ETag, Last-Modified) and the
+    normalized records parsed from the body. The fetcher sends the
+    validators back as a conditional request; on 304 Not Modified it replays
+    the stored records without parsing anything.
+    
+    Bounded two ways:
+    - ttl: entries older than this are dropped, forcing a full download
+    - max_bytes: least recently used entries are evicted past this size
+    """
+    
+    def __init__(self, directory, ttl: int = 7 * 24 * 3600, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        
+        # Running estimate of the cache size, so writes only rescan the
+        # directory once the budget is actually exceeded
+        self._size = sum(self._entry_sizes().values())
+    
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """Stable cache key for a URL and its query parameters"""
+        raw = url
+        if params:
+            raw += '?' + '&'.join(f'{k}={params[k]}' for k in sorted(params))
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a fresh entry, or None if missing, unreadable or expired"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as fh:
+                entry = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            self._remove(path)
+            return None
+        
+        age = datetime.now(timezone.utc).timestamp() - entry.get('stored_at', 0)
+        if age > self.ttl:
+            self._remove(path)
+            return None
+        
+        return entry
+    
+    def touch(self, key: str):
+        """Mark an entry as recently used (e.g. after a 304) for LRU eviction"""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+    
+    def set(
+        self,
+        key: str,
+        url: str,
+        records: List,
+        etag: str = '',
+        last_modified: str = '',
+    ):
+        """Store a response; skipped when there are no validators to revalidate with"""
+        if not etag and not last_modified:
+            return
+        
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'records': records,
+            'stored_at': datetime.now(timezone.utc).timestamp(),
+        }
+        
+        path = self._path(key)
+        try:
+            previous_size = path.stat().st_size
+        except OSError:
+            previous_size = 0
+        
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(entry, fh)
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+            self._remove(Path(tmp_path))
+            return
+        
+        with self._lock:
+            self._size += size - previous_size
+            over_budget = self._size > self.max_bytes
+        
+        if over_budget:
+            self.evict()
+    
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob('*.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+            
+            self._size = total
+    
+    def _entry_sizes(self) -> Dict[Path, int]:
+        sizes = {}
+        for path in self.directory.glob('*.json'):
+            try:
+                sizes[path] = path.stat().st_size
+            except OSError:
+                continue
+        return sizes
+    
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            for path in self.directory.glob('*.json'):
+                self._remove(path)
+            self._size = 0
+    
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
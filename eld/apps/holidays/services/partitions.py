@@ -0,0 +1,147 @@
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from typing import Dict, Iterable, List, Tuple
+import logging
+import re
+
+from eld.apps.holidays.models import Holiday
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = Holiday._meta.db_table
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+
+_YEAR_SUFFIX = re.compile(r'_y(\d{4})$')
+
+
+def partition_name(year: int) -> str:
+    return f'{PARENT_TABLE}_y{year}'
+
+
+class HolidayPartitions:
+    """
+    The yearly partitions of the Holiday table (PostgreSQL).
+
+    Migration 0006 turns holidays_holiday into a table range-partitioned
+    by year, with one partition per year and a default partition that
+    catches years nobody created a partition for. This pre-creates
+    partitions for coming years, moving any rows the default partition
+    already holds for them, and retires old years by detaching and
+    dropping their partition instead of running a large DELETE.
+
+    A partitioned table can't be the target of a foreign key on `id`
+    alone, so the through tables, aliases and saved holidays have no FK
+    constraint to it; their rows are deleted explicitly before a
+    partition is dropped. The ORM's on_delete handling still covers
+    ordinary deletes.
+
+    On other databases, or before the migration ran, `supported` is False
+    and every method does nothing.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+
+    @property
+    def supported(self) -> bool:
+        if self.connection.vendor != 'postgresql':
+            return False
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [PARENT_TABLE])
+            row = cursor.fetchone()
+        return row is not None and row[0] == 'p'
+
+    def partitions(self) -> Dict[int, str]:
+        """Year -> partition table, for the existing year partitions"""
+        if not self.supported:
+            return {}
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(%s)
+                """,
+                [PARENT_TABLE],
+            )
+            names = [name for name, in cursor.fetchall()]
+        return {
+            int(match.group(1)): name
+            for name in names
+            for match in [_YEAR_SUFFIX.search(name)] if match
+        }
+
+    def ensure(self, years: Iterable[int]) -> List[int]:
+        """Create the missing partitions for `years`; returns the years created"""
+        if not self.supported:
+            return []
+
+        existing = self.partitions()
+        created = []
+        for year in sorted(set(years) - existing.keys()):
+            self._create(year)
+            created.append(year)
+        if created:
+            logger.info(f"Created holiday partitions for {created}")
+        return created
+
+    def _create(self, year: int):
+        quote = self.connection.ops.quote_name
+        parent, default, table = quote(PARENT_TABLE), quote(DEFAULT_PARTITION), quote(partition_name(year))
+        bounds = f"FOR VALUES FROM ({int(year)}) TO ({int(year) + 1})"
+
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE year = %s)", [year])
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"CREATE TABLE {table} PARTITION OF {parent} {bounds}")
+                return
+
+            # Attaching is refused while the default partition holds rows of
+            # the new range, so move them into the new table first
+            cursor.execute(f"CREATE TABLE {table} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {default} WHERE year = %s", [year])
+            cursor.execute(f"DELETE FROM {default} WHERE year = %s", [year])
+            moved = cursor.rowcount
+            cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {table} {bounds}")
+        logger.info(f"Moved {moved} holidays from the default partition into {partition_name(year)}")
+
+    def drop_before(self, year: int, detach_only: bool = False) -> List[Tuple[int, int]]:
+        """
+        Retire the partitions of years before `year`
+
+        Rows that point at their holidays are deleted first. With
+        `detach_only`, the detached tables are kept (e.g. for archiving).
+        Returns (year, holidays) for each retired partition.
+        """
+        quote = self.connection.ops.quote_name
+        retired = []
+        for old_year, name in sorted(self.partitions().items()):
+            if old_year >= year:
+                continue
+            table = quote(name)
+            with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+                for dependent, column in self._dependents():
+                    cursor.execute(
+                        f"DELETE FROM {quote(dependent)} WHERE {quote(column)} IN (SELECT id FROM {table})"
+                    )
+                cursor.execute(f"SELECT count(*) FROM {table}")
+                count = cursor.fetchone()[0]
+                cursor.execute(f"ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {table}")
+                if not detach_only:
+                    cursor.execute(f"DROP TABLE {table}")
+            retired.append((old_year, count))
+            logger.info(f"{'Detached' if detach_only else 'Dropped'} holiday partition {name} ({count} holidays)")
+        return retired
+
+    @staticmethod
+    def _dependents() -> List[Tuple[str, str]]:
+        """(table, column) of every row type that references a holiday"""
+        dependents = [
+            (field.remote_field.through._meta.db_table, field.m2m_column_name())
+            for field in Holiday._meta.many_to_many
+        ]
+        dependents += [
+            (relation.related_model._meta.db_table, relation.field.column)
+            for relation in Holiday._meta.related_objects
+            if not relation.many_to_many
+        ]
+        return dependents
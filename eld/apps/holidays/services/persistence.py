@@ -0,0 +1,465 @@
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.text import slugify
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+from eld.apps.holidays.models import Country, Holiday, HolidayCategory, sync_holiday_arrays, sync_holiday_search
+from eld.apps.holidays.services.aliases import AliasIndex
+from eld.apps.holidays.services.records import HolidayRecord, to_records
+
+logger = logging.getLogger(__name__)
+
+# Columns an upsert may change on an existing holiday
+UPSERT_FIELDS = ['description', 'sources', 'last_verified', 'updated_at']
+
+
+def get_flag_emoji(country_code: str) -> str:
+    """Convert country code to flag emoji"""
+    if len(country_code) != 2:
+        return '🌍'
+
+    return ''.join(chr(127397 + ord(c)) for c in country_code.upper())
+
+
+class BulkHolidayWriter:
+    """
+    Set-based replacement for calling save_holiday() once per holiday.
+
+    Countries and categories are preloaded into code/slug -> id maps (and
+    missing ones created in one insert), so a chunk of holidays costs a
+    fixed handful of queries: one to load the existing rows, one upsert
+    (INSERT ... ON CONFLICT (name, date, year) DO UPDATE) for new and
+    changed holidays, one insert per M2M through table, one update each
+    for the denormalized country/category arrays and search vector, and
+    one insert for new aliases.
+    Each chunk runs in its own transaction.
+
+    Merge rules are the same as save_holiday: an existing holiday only
+    gains a missing description and new sources.
+    """
+
+    def __init__(self, aliases: Optional[AliasIndex] = None, chunk_size: Optional[int] = None):
+        self.aliases = aliases
+        self.chunk_size = chunk_size or getattr(settings, 'HOLIDAY_PERSIST_CHUNK_SIZE', 1000)
+        self.countries: Dict[str, int] = dict(Country.objects.values_list('code', 'id'))
+        self.categories: Dict[str, int] = dict(HolidayCategory.objects.values_list('slug', 'id'))
+        # Whether the last save() lost holidays to a database error
+        self.failed = False
+
+    def save(self, holidays: Iterable[Union[HolidayRecord, Dict]], window=None) -> Tuple[int, int, int]:
+        """
+        Save deduplicated holidays; returns (created, updated, deleted) counts
+
+        Merging never deletes, so `window` (see DiffHolidayWriter) is unused
+        and deleted is always 0.
+        """
+        self.failed = False
+        records = self._valid_records(holidays)
+        created_count = 0
+        updated_count = 0
+        for start in range(0, len(records), self.chunk_size):
+            chunk = records[start:start + self.chunk_size]
+            # Outside the transaction, so the id maps never point at rolled-back rows
+            self._ensure_countries(chunk)
+            self._ensure_categories(chunk)
+            try:
+                with transaction.atomic():
+                    created, updated = self._save_chunk(chunk)
+            except DatabaseError as e:
+                logger.error(f"Error saving {len(chunk)} holidays starting with {chunk[0].name}: {e}")
+                self.failed = True
+                continue
+            created_count += created
+            updated_count += updated
+
+        return created_count, updated_count, 0
+
+    @staticmethod
+    def _valid_records(holidays: Iterable[Union[HolidayRecord, Dict]]) -> List[HolidayRecord]:
+        records = []
+        for record in to_records(holidays):
+            if record.date is None:
+                logger.error(f"Error saving holiday {record.name}: Invalid date {record.date_key!r}")
+            else:
+                records.append(record)
+        return records
+
+    def _ensure_countries(self, records: List[HolidayRecord]):
+        missing = {
+            record.country_code: record for record in records
+            if record.country_code and record.country_code not in self.countries
+        }
+        if not missing:
+            return
+
+        Country.objects.bulk_create(
+            [
+                Country(
+                    code=code,
+                    name=record.country_name or code,
+                    flag_emoji=get_flag_emoji(code),
+                )
+                for code, record in missing.items()
+            ],
+            ignore_conflicts=True,
+        )
+        self.countries.update(Country.objects.filter(code__in=missing).values_list('code', 'id'))
+
+    def _ensure_categories(self, records: List[HolidayRecord]):
+        missing = {
+            slug for record in records for slug in record.categories
+            if slug not in self.categories
+        }
+        if not missing:
+            return
+
+        HolidayCategory.objects.bulk_create(
+            [HolidayCategory(name=slug.title(), slug=slug, category_type=slug) for slug in sorted(missing)],
+            ignore_conflicts=True,
+        )
+        self.categories.update(HolidayCategory.objects.filter(slug__in=missing).values_list('slug', 'id'))
+
+    def _load_existing(self, records: List[HolidayRecord], matches: Dict[int, int]):
+        """Existing holidays for a chunk, by id and by (name, date, year)"""
+        query = Q(
+            name__in={record.name for record in records},
+            date__in={record.date for record in records},
+            year__in={record.date.year for record in records},
+        )
+        if matches:
+            query |= Q(pk__in=set(matches.values()))
+
+        by_pk = {}
+        by_key = {}
+        for holiday in Holiday.objects.filter(query):
+            by_pk[holiday.pk] = holiday
+            by_key[(holiday.name, holiday.date, holiday.year)] = holiday
+        return by_pk, by_key
+
+    def _save_chunk(self, records: List[HolidayRecord]) -> Tuple[int, int]:
+        matches = {}
+        if self.aliases is not None:
+            for index, record in enumerate(records):
+                match = self.aliases.lookup(record)
+                if match is not None:
+                    matches[index] = match.holiday_id
+
+        by_pk, by_key = self._load_existing(records, matches)
+        now = timezone.now()
+        created = {}
+        changed = {}
+        targets = []
+
+        for index, record in enumerate(records):
+            holiday = by_pk.get(matches[index]) if index in matches else None
+            if holiday is None:
+                holiday = by_key.get((record.name, record.date, record.date.year))
+
+            if holiday is None:
+                holiday = Holiday(
+                    name=record.name,
+                    slug=slugify(f"{record.name}-{record.date}"),
+                    date=record.date,
+                    year=record.date.year,
+                    description=record.description,
+                    is_public_holiday=record.is_public_holiday,
+                    is_global=record.is_global,
+                    sources=list(record.sources) or [record.source or ''],
+                )
+                key = (holiday.name, holiday.date, holiday.year)
+                by_key[key] = created[key] = holiday
+            else:
+                key = (holiday.name, holiday.date, holiday.year)
+                updated = False
+                if record.description and not holiday.description:
+                    holiday.description = record.description
+                    updated = True
+                for source in record.all_sources:
+                    if source not in holiday.sources:
+                        holiday.sources.append(source)
+                        updated = True
+                if updated and key not in created:
+                    holiday.last_verified = now
+                    changed[key] = holiday
+
+            targets.append(holiday)
+
+        self._upsert(list(created.values()) + list(changed.values()))
+        self._add_relations(records, targets)
+
+        if self.aliases is not None:
+            self.aliases.learn_many(
+                (holiday, record.aliases + (record.name,))
+                for record, holiday in zip(records, targets)
+            )
+
+        return len(created), len(changed)
+
+    def _upsert(self, holidays: List[Holiday]):
+        """INSERT ... ON CONFLICT (name, date, year) DO UPDATE, then make sure every holiday has its id"""
+        if not holidays:
+            return
+
+        # Upsert by the natural key only: a row sent with its id would
+        # also conflict on the primary key
+        ids = [holiday.pk for holiday in holidays]
+        for holiday in holidays:
+            holiday.pk = None
+        Holiday.objects.bulk_create(
+            holidays,
+            update_conflicts=True,
+            unique_fields=['name', 'date', 'year'],
+            update_fields=UPSERT_FIELDS,
+        )
+        for holiday, pk in zip(holidays, ids):
+            if pk is not None:
+                holiday.pk = pk
+
+        # Backends that can't return ids from an upsert
+        missing = [holiday for holiday in holidays if holiday.pk is None]
+        if missing:
+            rows = Holiday.objects.filter(
+                name__in={holiday.name for holiday in missing},
+                date__in={holiday.date for holiday in missing},
+                year__in={holiday.year for holiday in missing},
+            ).values_list('name', 'date', 'year', 'id')
+            ids_by_key = {(name, date, year): pk for name, date, year, pk in rows}
+            for holiday in missing:
+                holiday.pk = ids_by_key[(holiday.name, holiday.date, holiday.year)]
+
+    def _add_relations(self, records: List[HolidayRecord], holidays: List[Holiday]):
+        """Bulk-insert the country and category through rows"""
+        CountryLink = Holiday.countries.through
+        CategoryLink = Holiday.categories.through
+
+        country_links = set()
+        category_links = set()
+        for record, holiday in zip(records, holidays):
+            country_id = self.countries.get(record.country_code)
+            if country_id:
+                country_links.add((holiday.pk, country_id))
+            for slug in record.categories:
+                category_id = self.categories.get(slug)
+                if category_id:
+                    category_links.add((holiday.pk, category_id))
+
+        CountryLink.objects.bulk_create(
+            [CountryLink(holiday_id=h, country_id=c) for h, c in sorted(country_links)],
+            ignore_conflicts=True,
+        )
+        CategoryLink.objects.bulk_create(
+            [CategoryLink(holiday_id=h, holidaycategory_id=c) for h, c in sorted(category_links)],
+            ignore_conflicts=True,
+        )
+        # Bulk writes send no signals, so sync the denormalized columns here
+        ids = {holiday.pk for holiday in holidays}
+        sync_holiday_arrays(ids)
+        sync_holiday_search(ids)
+
+
+class CopyHolidayWriter(BulkHolidayWriter):
+    """
+    PostgreSQL loader for large refreshes and reseeds.
+
+    Each chunk is collapsed in Python to one row per target holiday, streamed
+    into a temporary (so unlogged, session-private) staging table with COPY,
+    and merged into Holiday with a single INSERT ... SELECT ... ON CONFLICT
+    (name, date, year) DO UPDATE that fills a missing description and
+    appends new sources to the stored array in SQL. The country and
+    category through rows (and the denormalized columns) are then written
+    straight from the staging table, so no holiday rows travel back to
+    Python except for learning aliases.
+
+    Falls back to the BulkHolidayWriter path on psycopg 2, whose cursors
+    have no copy().
+    """
+
+    STAGING_TABLE = 'holiday_staging'
+    STAGING_COLUMNS = [
+        ('name', 'text'),
+        ('slug', 'text'),
+        ('date', 'date'),
+        ('year', 'int4'),
+        ('description', 'text'),
+        ('is_public_holiday', 'bool'),
+        ('is_global', 'bool'),
+        ('sources', 'text[]'),
+        ('country_ids', 'int4[]'),
+        ('category_ids', 'int4[]'),
+    ]
+
+    def _save_chunk(self, records: List[HolidayRecord]) -> Tuple[int, int]:
+        with connection.cursor() as cursor:
+            if not hasattr(cursor.cursor, 'copy'):
+                return super()._save_chunk(records)
+
+            staged = self._stage(records)
+            self._copy(cursor, staged)
+            created, updated = self._merge(cursor)
+            self._link(cursor)
+            if self.aliases is not None:
+                self._learn_aliases(cursor, staged)
+
+        return created, updated
+
+    def _stage(self, records: List[HolidayRecord]) -> Dict[Tuple, Dict]:
+        """One staging row per target (name, date, year), merging records that share it"""
+        staged = {}
+        for record in records:
+            match = self.aliases.lookup(record) if self.aliases is not None else None
+            name, day = (match.name, match.date) if match else (record.name, record.date)
+            key = (name, day, day.year)
+
+            row = staged.get(key)
+            if row is None:
+                row = staged[key] = {
+                    'description': record.description,
+                    'is_public_holiday': record.is_public_holiday,
+                    'is_global': record.is_global,
+                    'sources': list(record.sources) or [record.source or ''],
+                    'country_ids': set(),
+                    'category_ids': set(),
+                    'aliases': set(),
+                }
+            else:
+                if record.description and not row['description']:
+                    row['description'] = record.description
+                for source in record.all_sources:
+                    if source not in row['sources']:
+                        row['sources'].append(source)
+
+            if record.country_code in self.countries:
+                row['country_ids'].add(self.countries[record.country_code])
+            row['category_ids'].update(
+                self.categories[slug] for slug in record.categories if slug in self.categories
+            )
+            row['aliases'].update(record.aliases + (record.name,))
+        return staged
+
+    def _copy(self, cursor, staged: Dict[Tuple, Dict]):
+        columns = ', '.join(name for name, _ in self.STAGING_COLUMNS)
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.STAGING_TABLE} ("
+            + ', '.join(f'{name} {kind}' for name, kind in self.STAGING_COLUMNS)
+            + ") ON COMMIT DELETE ROWS"
+        )
+        cursor.execute(f"TRUNCATE {self.STAGING_TABLE}")
+
+        with cursor.cursor.copy(f"COPY {self.STAGING_TABLE} ({columns}) FROM STDIN") as copy:
+            copy.set_types([kind for _, kind in self.STAGING_COLUMNS])
+            for (name, day, year), row in staged.items():
+                copy.write_row((
+                    name,
+                    slugify(f"{name}-{day}"),
+                    day,
+                    year,
+                    row['description'],
+                    row['is_public_holiday'],
+                    row['is_global'],
+                    row['sources'],
+                    sorted(row['country_ids']),
+                    sorted(row['category_ids']),
+                ))
+
+    def _insert_columns(self):
+        """Holiday columns and the staging expressions (or defaults) that fill them"""
+        staged = {name for name, _ in self.STAGING_COLUMNS}
+        template = Holiday()
+        columns, values, params = [], [], []
+        for field in Holiday._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            columns.append(connection.ops.quote_name(field.column))
+            if field.attname in staged:
+                values.append(f's.{field.attname}')
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                values.append('now()')
+            else:
+                values.append('%s')
+                params.append(field.get_db_prep_save(getattr(template, field.attname), connection))
+        return columns, values, params
+
+    def _merge(self, cursor) -> Tuple[int, int]:
+        """Upsert the staged holidays; returns (created, updated) counts"""
+        table = connection.ops.quote_name(Holiday._meta.db_table)
+        columns, values, params = self._insert_columns()
+        # Every staged key not stored yet is inserted. (RETURNING xmax = 0 would
+        # tell inserts apart, but system columns can't be read on a partitioned table.)
+        cursor.execute(
+            f"""
+            SELECT count(*), count(h.id) FROM {self.STAGING_TABLE} s
+            LEFT JOIN {table} h ON h.name = s.name AND h.date = s.date AND h.year = s.year
+            """
+        )
+        staged, existing = cursor.fetchone()
+        cursor.execute(
+            f"""
+            INSERT INTO {table} AS h ({', '.join(columns)})
+            SELECT {', '.join(values)} FROM {self.STAGING_TABLE} s
+            ON CONFLICT (name, date, year) DO UPDATE SET
+                description = CASE WHEN h.description = '' THEN EXCLUDED.description ELSE h.description END,
+                sources = h.sources || ARRAY(
+                    SELECT new.source
+                    FROM unnest(EXCLUDED.sources) WITH ORDINALITY AS new(source, position)
+                    WHERE new.source <> '' AND new.source <> ALL(h.sources)
+                    ORDER BY new.position
+                ),
+                last_verified = now(),
+                updated_at = now()
+            WHERE (h.description = '' AND EXCLUDED.description <> '')
+                OR EXISTS (
+                    SELECT 1 FROM unnest(EXCLUDED.sources) AS new(source)
+                    WHERE new.source <> '' AND new.source <> ALL(h.sources)
+                )
+            """,
+            params,
+        )
+        created = staged - existing
+        return created, cursor.rowcount - created
+
+    def _link(self, cursor):
+        """Insert the through rows for every staged holiday, skipping existing links"""
+        table = connection.ops.quote_name(Holiday._meta.db_table)
+        for field_name, ids in (('countries', 'country_ids'), ('categories', 'category_ids')):
+            field = Holiday._meta.get_field(field_name)
+            cursor.execute(
+                f"""
+                INSERT INTO {connection.ops.quote_name(field.m2m_db_table())}
+                    ({field.m2m_column_name()}, {field.m2m_reverse_name()})
+                SELECT h.id, unnest(s.{ids})
+                FROM {self.STAGING_TABLE} s
+                JOIN {table} h ON h.name = s.name AND h.date = s.date AND h.year = s.year
+                ON CONFLICT DO NOTHING
+                """
+            )
+        staged_ids = RawSQL(
+            f"""
+            SELECT h.id FROM {self.STAGING_TABLE} s
+            JOIN {table} h ON h.name = s.name AND h.date = s.date AND h.year = s.year
+            """,
+            [],
+        )
+        sync_holiday_arrays(staged_ids)
+        sync_holiday_search(staged_ids)
+
+    def _learn_aliases(self, cursor, staged: Dict[Tuple, Dict]):
+        """Feed the names merged into each holiday to the alias index"""
+        if not any(row['aliases'] - {key[0]} for key, row in staged.items()):
+            return
+
+        table = connection.ops.quote_name(Holiday._meta.db_table)
+        cursor.execute(
+            f"""
+            SELECT h.id, h.name, h.date, h.year
+            FROM {self.STAGING_TABLE} s
+            JOIN {table} h ON h.name = s.name AND h.date = s.date AND h.year = s.year
+            """
+        )
+        self.aliases.learn_many(
+            (Holiday(pk=pk, name=name, date=day, year=year), staged[(name, day, year)]['aliases'])
+            for pk, name, day, year in cursor.fetchall()
+        )
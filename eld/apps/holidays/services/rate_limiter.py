@@ -0,0 +1,266 @@
+from typing import Dict, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Atomically refill and take from a bucket stored as a Redis hash. Uses the
+# server clock so every worker agrees on time. Returns the seconds to wait
+# (as a string, Lua numbers are truncated to integers), "0" when granted.
+TAKE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'updated', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', key, ttl)
+return tostring(wait)
+"""
+
+# Push the bucket's blocked_until forward (never backward) and empty it
+BLOCK_SCRIPT = """
+local key = KEYS[1]
+local seconds = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local blocked_until = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+if now + seconds > blocked_until then
+    redis.call('HSET', key, 'blocked_until', tostring(now + seconds), 'tokens', '0',
+               'updated', tostring(now + seconds))
+end
+redis.call('EXPIRE', key, ttl)
+return 1
+"""
+
+
+class LocalBucketBackend:
+    """In-process token buckets, for caches that aren't Redis (dev, tests)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, float]] = {}
+    
+    def take(self, key: str, rate: float, capacity: float, requested: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state.setdefault(
+                key, {'tokens': capacity, 'updated': now, 'blocked_until': 0}
+            )
+            if state['blocked_until'] > now:
+                return state['blocked_until'] - now
+            
+            tokens = min(capacity, state['tokens'] + (now - state['updated']) * rate)
+            wait = 0.0
+            if tokens >= requested:
+                tokens -= requested
+            else:
+                wait = (requested - tokens) / rate
+            
+            state['tokens'] = tokens
+            state['updated'] = now
+            return wait
+    
+    def block(self, key: str, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            state = self._state.setdefault(key, {'tokens': 0, 'updated': now, 'blocked_until': 0})
+            if now + seconds > state['blocked_until']:
+                state.update(tokens=0, updated=now + seconds, blocked_until=now + seconds)
+
+
+class RedisBucketBackend:
+    """Token buckets in the shared Redis cache, so every Celery worker draws from one bucket"""
+    
+    # Idle buckets expire; they start full again afterwards
+    TTL = 3600
+    
+    def __init__(self, connection):
+        self._take = connection.register_script(TAKE_SCRIPT)
+        self._block = connection.register_script(BLOCK_SCRIPT)
+    
+    def take(self, key: str, rate: float, capacity: float, requested: float) -> float:
+        return float(self._take(keys=[key], args=[rate, capacity, requested, self.TTL]))
+    
+    def block(self, key: str, seconds: float):
+        self._block(keys=[key], args=[seconds, self.TTL])
+
+
+_local_backend = LocalBucketBackend()
+_shared_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Redis backend when the default cache is django-redis, else the in-process one"""
+    global _shared_backend
+    
+    with _backend_lock:
+        if _shared_backend is None:
+            try:
+                from django_redis import get_redis_connection
+                _shared_backend = RedisBucketBackend(get_redis_connection('default'))
+            except Exception as e:
+                logger.warning(f"Rate limits are per-process, shared Redis unavailable: {e}")
+                _shared_backend = _local_backend
+        return _shared_backend
+
+
+class TokenBucket:
+    """
+    Token bucket limiting requests to one upstream provider.
+    
+    `rate` tokens per second refill up to `burst`; each request takes one.
+    State lives in Redis (shared by all workers) when available. Throttling
+    signals from the provider (429 + Retry-After) block the whole bucket,
+    so every worker backs off together rather than each hitting the limit.
+    """
+    
+    KEY_PREFIX = 'holidays:ratelimit:'
+    
+    # Longest single sleep, so blocked callers re-check the shared bucket
+    MAX_SLEEP = 5.0
+    
+    # After a shared-backend error, use the local bucket this long before retrying
+    FALLBACK_SECONDS = 60
+    
+    def __init__(self, name: str, rate: float, burst: Optional[float] = None, backend=None):
+        if rate <= 0:
+            raise ValueError(f"Rate for {name} must be positive, got {rate}")
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.key = f'{self.KEY_PREFIX}{name}'
+        self._backend = backend
+        self._fallback_until = 0.0
+    
+    @property
+    def backend(self):
+        return self._backend or get_backend()
+    
+    def _call(self, method: str, *args):
+        """Call the backend, falling back to in-process buckets for a while if Redis errors"""
+        backend = self.backend
+        if backend is not _local_backend and time.monotonic() >= self._fallback_until:
+            try:
+                return getattr(backend, method)(self.key, *args)
+            except Exception as e:
+                logger.warning(
+                    f"Rate limiter backend error for {self.name}, "
+                    f"using a local bucket for {self.FALLBACK_SECONDS}s: {e}"
+                )
+                self._fallback_until = time.monotonic() + self.FALLBACK_SECONDS
+        return getattr(_local_backend, method)(self.key, *args)
+    
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `tokens` are available and take them.
+        
+        Returns False if that would take longer than `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            wait = self._call('take', self.rate, self.burst, tokens)
+            if wait <= 0:
+                return True
+            
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, self.MAX_SLEEP))
+    
+    def block(self, seconds: float):
+        """Stop all callers from taking tokens for `seconds` (provider said back off)"""
+        logger.info(f"Rate limiter {self.name}: backing off for {seconds:.1f}s")
+        self._call('block', seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    Cap on one source's in-flight requests that adapts to throttling (AIMD).
+    
+    Starts at `maximum`. A 429 halves the cap, at most once per Retry-After
+    window so a burst of 429s from one overload counts once; every
+    `recover_after` responses without one raise it by one again. Callers
+    hold a slot for the duration of a request: `with concurrency: ...`.
+    """
+    
+    def __init__(self, name: str, maximum: int, recover_after: int = 20):
+        self.name = name
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self.recover_after = recover_after
+        self._in_flight = 0
+        self._clean = 0
+        self._hold_until = 0.0
+        self._cond = threading.Condition()
+    
+    def __enter__(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self._cond:
+            self._in_flight -= 1
+            self._clean += 1
+            if self._clean >= self.recover_after and self.limit < self.maximum:
+                self.limit += 1
+                self._clean = 0
+            self._cond.notify_all()
+    
+    def throttled(self, seconds: float = 1.0):
+        """The provider answered 429: halve the cap"""
+        with self._cond:
+            self._clean = 0
+            now = time.monotonic()
+            if now < self._hold_until:
+                return
+            self._hold_until = now + max(1.0, seconds)
+            if self.limit > 1:
+                self.limit = max(1, self.limit // 2)
+                logger.info(f"Concurrency {self.name}: throttled, down to {self.limit}")
+
+
+def get_rate_limiter(source: str, limits: Optional[Dict] = None) -> Optional[TokenBucket]:
+    """
+    Bucket for a source configured in HOLIDAY_RATE_LIMITS, or None if unlimited
+    
+    Settings format: {'calendarific': {'rate': 1, 'burst': 5}, ...} with rate
+    in requests per second.
+    """
+    if limits is None:
+        from django.conf import settings
+        limits = getattr(settings, 'HOLIDAY_RATE_LIMITS', {})
+    
+    config = limits.get(source)
+    if not config:
+        return None
+    return TokenBucket(source, rate=config['rate'], burst=config.get('burst'))
@@ -0,0 +1,129 @@
+from http.client import responses as HTTP_REASONS
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import gzip
+import json
+import logging
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Query parameters never written to fixtures or used in lookup keys
+SECRET_PARAMS = {'api_key', 'apikey', 'key', 'token'}
+
+# Response headers kept in fixtures
+RECORDED_HEADERS = {'content-type', 'etag', 'last-modified'}
+
+
+def request_key(method: str, url: str) -> str:
+    """Archive key for a request: method + URL with secrets stripped and params sorted"""
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in SECRET_PARAMS
+    )
+    clean_url = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+    return f'{method.upper()} {clean_url}'
+
+
+class FixtureArchive:
+    """
+    Gzip-compressed JSON archive of raw upstream responses.
+    
+    Written by the fetcher in record mode and served back in replay mode,
+    so the whole refresh pipeline can run offline and deterministically.
+    API keys are stripped from URLs before anything is stored.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.responses: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path) -> 'FixtureArchive':
+        archive = cls(path)
+        with gzip.open(archive.path, 'rt', encoding='utf-8') as fh:
+            data = json.load(fh)
+        archive.responses = data.get('responses', {})
+        logger.info(f"Loaded {len(archive.responses)} recorded responses from {archive.path}")
+        return archive
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {'version': self.VERSION, 'responses': self.responses}
+            with gzip.open(self.path, 'wt', encoding='utf-8') as fh:
+                json.dump(data, fh, sort_keys=True)
+        logger.info(f"Saved {len(self.responses)} recorded responses to {self.path}")
+    
+    def add(self, method: str, url: str, response: requests.Response):
+        key = request_key(method, url)
+        entry = {
+            'status': response.status_code,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() in RECORDED_HEADERS
+            },
+            'body': response.text,
+        }
+        with self._lock:
+            self.responses[key] = entry
+    
+    def get(self, method: str, url: str) -> Optional[Dict]:
+        return self.responses.get(request_key(method, url))
+    
+    def has_host(self, host: str) -> bool:
+        """Whether any recorded request went to this host"""
+        return any(urlsplit(key.split(' ', 1)[1]).netloc == host for key in self.responses)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that stores every final response (after retries) in an archive"""
+    
+    def __init__(self, archive: FixtureArchive, **kwargs):
+        self.archive = archive
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Conditional requests would record empty 304s; the fetcher disables
+        # its cache in record mode, so these are always full responses
+        self.archive.add(request.method, request.url, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Local stand-in for the upstream APIs that serves responses from an archive"""
+    
+    def __init__(self, archive: FixtureArchive):
+        self.archive = archive
+        super().__init__()
+    
+    def send(self, request, **kwargs):
+        entry = self.archive.get(request.method, request.url)
+        if entry is None:
+            raise requests.ConnectionError(
+                f"No recorded response for {request_key(request.method, request.url)}",
+                request=request,
+            )
+        
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = HTTP_REASONS.get(entry['status'], '')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def close(self):
+        pass
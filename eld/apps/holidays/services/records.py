@@ -0,0 +1,209 @@
+from dataclasses import dataclass, field, fields
+from datetime import date as date_type, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_date(value) -> Optional[date_type]:
+    """Parse an ISO date/datetime string, date or datetime; None if unparseable"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    if isinstance(value, str):
+        return _parse_iso(value)
+    return None
+
+
+# Thousands of records share a few hundred dates and category lists, so the
+# parsed values are cached and shared between records
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> Optional[date_type]:
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _iso(value: date_type) -> str:
+    return value.isoformat()
+
+
+@lru_cache(maxsize=1024)
+def _shared_tuple(values: Tuple[str, ...]) -> Tuple[str, ...]:
+    return values
+
+
+@dataclass(slots=True)
+class HolidayRecord:
+    """
+    One holiday as it moves through the refresh pipeline.
+
+    The date is parsed and the name normalized once, when the record is
+    built, instead of at every dedupe comparison. `date_key` is the ISO date
+    (or the raw value if it could not be parsed) and `name_key` the
+    lower-cased, stripped name. `aliases` lists other names that were
+    merged into this one. Keys that have no field of their own are kept in
+    `extra` so a dict survives the round trip through to_dict().
+
+    Celery messages and the HTTP cache stay plain JSON dicts; use
+    from_dict()/to_dict() at those boundaries.
+    """
+    name: str
+    date: Optional[date_type]
+    source: Optional[str] = None
+    sources: Tuple[str, ...] = ()
+    country_code: str = ''
+    country_name: str = ''
+    description: str = ''
+    categories: Tuple[str, ...] = ()
+    is_public_holiday: bool = False
+    is_global: bool = False
+    aliases: Tuple[str, ...] = ()
+    extra: Optional[Dict] = None
+    date_key: str = ''
+    name_key: str = field(init=False, default='')
+
+    def __post_init__(self):
+        self.name_key = self.name.lower().strip()
+        if not self.date_key and self.date is not None:
+            self.date_key = _iso(self.date)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HolidayRecord':
+        extra = {key: value for key, value in data.items() if key not in _DICT_FIELDS}
+        raw_date = data.get('date')
+        parsed = parse_date(raw_date)
+        return cls(
+            name=data.get('name') or '',
+            date=parsed,
+            source=data.get('source'),
+            sources=tuple(data.get('sources') or ()),
+            country_code=data.get('country_code') or '',
+            country_name=data.get('country_name') or '',
+            description=data.get('description') or '',
+            categories=_shared_tuple(tuple(data.get('categories') or ())),
+            is_public_holiday=bool(data.get('is_public_holiday')),
+            is_global=bool(data.get('is_global')),
+            aliases=tuple(data.get('aliases') or ()),
+            extra=extra or None,
+            date_key='' if parsed is not None or raw_date is None else str(raw_date),
+        )
+
+    @classmethod
+    def coerce(cls, holiday: Union['HolidayRecord', Dict]) -> 'HolidayRecord':
+        """Return `holiday` as a record, converting a dict if needed"""
+        if isinstance(holiday, cls):
+            return holiday
+        return cls.from_dict(holiday)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable dict with the same keys the fetchers produce"""
+        data = {'name': self.name, 'date': self.date_key or None}
+        for key in _OPTIONAL_FIELDS:
+            value = getattr(self, key)
+            if value:
+                data[key] = list(value) if isinstance(value, tuple) else value
+        if self.source is not None:
+            data['source'] = self.source
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def all_sources(self) -> Tuple[str, ...]:
+        """Every source that reported this holiday: the merged sources, or just `source`"""
+        return tuple(source for source in self.sources or (self.source,) if source)
+
+    def rename(self, name: str, date: Optional[date_type] = None):
+        """Change the name (and optionally the date), keeping the keys in sync"""
+        self.name = name
+        self.name_key = name.lower().strip()
+        if date is not None:
+            self.date = date
+            self.date_key = _iso(date)
+
+    def set_extra(self, key: str, value):
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def copy(self) -> 'HolidayRecord':
+        return HolidayRecord(
+            name=self.name,
+            date=self.date,
+            source=self.source,
+            sources=self.sources,
+            country_code=self.country_code,
+            country_name=self.country_name,
+            description=self.description,
+            categories=self.categories,
+            is_public_holiday=self.is_public_holiday,
+            is_global=self.is_global,
+            aliases=self.aliases,
+            extra=dict(self.extra) if self.extra else None,
+            date_key=self.date_key,
+        )
+
+    def completeness(self) -> int:
+        """Number of non-empty fields, used to pick the base record when merging"""
+        score = sum(1 for key in _SCORED_FIELDS if getattr(self, key))
+        score += bool(self.date_key)
+        if self.extra:
+            score += sum(
+                1 for value in self.extra.values()
+                if value and (not isinstance(value, list) or len(value) > 0)
+            )
+        return score
+
+
+_DICT_FIELDS = frozenset(
+    f.name for f in fields(HolidayRecord) if f.name not in ('extra', 'date_key', 'name_key')
+)
+_SCORED_FIELDS = tuple(_DICT_FIELDS - {'date', 'aliases'})
+_OPTIONAL_FIELDS = (
+    'sources', 'country_code', 'country_name', 'description', 'categories',
+    'is_public_holiday', 'is_global', 'aliases',
+)
+
+
+def to_records(holidays: Iterable[Union[HolidayRecord, Dict]]) -> List[HolidayRecord]:
+    """Coerce a batch of holiday dicts and/or records to records"""
+    return [HolidayRecord.coerce(holiday) for holiday in holidays]
+
+
+def to_dicts(holidays: Iterable[Union[HolidayRecord, Dict]]) -> List[Dict]:
+    """Plain dicts for JSON boundaries (Celery results, caches)"""
+    return [
+        holiday.to_dict() if isinstance(holiday, HolidayRecord) else holiday
+        for holiday in holidays
+    ]
+
+
+def pack(holidays: Iterable[Union[HolidayRecord, Dict]]) -> Dict:
+    """
+    Compact JSON form of a batch for Celery messages
+
+    Rows are to_dict() output, so empty fields are dropped, and values every
+    row shares (source, country, categories...) are stored once.
+    """
+    rows = [HolidayRecord.coerce(holiday).to_dict() for holiday in holidays]
+    shared = dict(rows[0]) if rows else {}
+    for row in rows[1:]:
+        shared = {key: value for key, value in shared.items() if key in row and row[key] == value}
+    return {
+        'shared': shared,
+        'rows': [{key: value for key, value in row.items() if key not in shared} for row in rows],
+    }
+
+
+def unpack(payload: Union[Dict, List[Dict]]) -> List[HolidayRecord]:
+    """Records from pack() output (or a plain list of holiday dicts)"""
+    if isinstance(payload, list):
+        return to_records(payload)
+    shared = payload['shared']
+    return [HolidayRecord.from_dict({**shared, **row}) for row in payload['rows']]
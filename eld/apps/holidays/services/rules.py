@@ -0,0 +1,270 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import calendar
+import logging
+
+logger = logging.getLogger(__name__)
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+# Weekend shift policies for HolidayRule.observed
+NEAREST = 'nearest'        # Saturday -> Friday, Sunday -> Monday (US federal)
+SUBSTITUTE = 'substitute'  # next weekday not already a holiday (UK, AU, CA)
+
+
+@lru_cache(maxsize=None)
+def easter(year: int) -> date:
+    """Western (Gregorian) Easter Sunday, anonymous Gregorian algorithm"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@dataclass(frozen=True)
+class HolidayRule:
+    """
+    How to compute one recurring holiday's date in a given year.
+
+    Exactly one of these forms is used:
+      - fixed date: month + day
+      - nth weekday: month + weekday + nth, counted forward from `day`
+        (default the 1st) for nth > 0, or backward from `day` (default the
+        month's last day) for nth < 0, so nth=-1 is "last Monday of May"
+        and day=24, nth=-1 is "Monday on or before May 24"
+      - Easter-relative: easter_offset days from Easter Sunday
+
+    `observed` optionally moves a date that falls on a weekend (NEAREST or
+    SUBSTITUTE); `since`/`until` bound the years the holiday exists.
+    """
+    name: str
+    month: Optional[int] = None
+    day: Optional[int] = None
+    weekday: Optional[int] = None
+    nth: Optional[int] = None
+    easter_offset: Optional[int] = None
+    observed: Optional[str] = None
+    since: Optional[int] = None
+    until: Optional[int] = None
+    description: str = ''
+
+    def applies(self, year: int) -> bool:
+        return (self.since is None or year >= self.since) and (
+            self.until is None or year <= self.until
+        )
+
+    def date_for(self, year: int) -> date:
+        """The holiday's actual (unshifted) date in `year`"""
+        if self.easter_offset is not None:
+            return easter(year) + timedelta(days=self.easter_offset)
+
+        if self.weekday is None:
+            return date(year, self.month, self.day)
+
+        if self.nth > 0:
+            anchor = date(year, self.month, self.day or 1)
+            first = anchor + timedelta(days=(self.weekday - anchor.weekday()) % 7)
+            return first + timedelta(weeks=self.nth - 1)
+
+        anchor = date(year, self.month, self.day or calendar.monthrange(year, self.month)[1])
+        last = anchor - timedelta(days=(anchor.weekday() - self.weekday) % 7)
+        return last - timedelta(weeks=-self.nth - 1)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    A table of rules producing holiday dicts for one source.
+
+    Country tables set country_code and are public holidays; global tables
+    (UN observances, curated fun days) set is_global instead.
+    """
+    source: str
+    rules: Tuple[HolidayRule, ...]
+    categories: Tuple[str, ...] = ('public',)
+    country_code: str = ''
+    country_name: str = ''
+    is_global: bool = False
+
+    def dates(self, year: int) -> List[Tuple[HolidayRule, date]]:
+        """(rule, observed date) for every rule in effect in `year`"""
+        actual = [(rule, rule.date_for(year)) for rule in self.rules if rule.applies(year)]
+        taken = {day for _, day in actual if day.weekday() < SAT}
+
+        dates = []
+        for rule, day in actual:
+            if rule.observed and day.weekday() >= SAT:
+                shifted = observed_date(day, rule.observed, taken)
+                # Never move a holiday into a neighbouring year
+                if shifted.year == year:
+                    taken.add(shifted)
+                    day = shifted
+            dates.append((rule, day))
+        return dates
+
+    def holidays(self, year: int) -> List[Dict]:
+        holidays = []
+        for rule, day in self.dates(year):
+            holiday = {
+                'name': rule.name,
+                'date': day.isoformat(),
+            }
+            if rule.description:
+                holiday['description'] = rule.description
+            if self.country_code:
+                holiday['country_code'] = self.country_code
+                holiday['country_name'] = self.country_name
+                holiday['is_public_holiday'] = True
+            if self.is_global:
+                holiday['is_global'] = True
+            holiday['categories'] = list(self.categories)
+            holiday['source'] = self.source
+            holidays.append(holiday)
+        return holidays
+
+
+def observed_date(day: date, policy: str, taken: Iterable[date] = ()) -> date:
+    """Move a weekend date according to the observed-day policy"""
+    if policy == NEAREST:
+        return day - timedelta(days=1) if day.weekday() == SAT else day + timedelta(days=1)
+
+    if policy == SUBSTITUTE:
+        while day.weekday() >= SAT or day in taken:
+            day += timedelta(days=1)
+        return day
+
+    raise ValueError(f"Unknown observed policy: {policy}")
+
+
+def generate(rule_sets: Iterable[RuleSet], years: Iterable[int]) -> List[Dict]:
+    """Holiday dicts for every rule set over a range of years"""
+    rule_sets = list(rule_sets)
+    return [
+        holiday
+        for year in years
+        for rule_set in rule_sets
+        for holiday in rule_set.holidays(year)
+    ]
+
+
+def fixed(name: str, month: int, day: int, **kwargs) -> HolidayRule:
+    return HolidayRule(name, month=month, day=day, **kwargs)
+
+
+def nth_weekday(name: str, month: int, weekday: int, nth: int, **kwargs) -> HolidayRule:
+    return HolidayRule(name, month=month, weekday=weekday, nth=nth, **kwargs)
+
+
+def from_easter(name: str, offset: int, **kwargs) -> HolidayRule:
+    return HolidayRule(name, easter_offset=offset, **kwargs)
+
+
+UN_OBSERVANCES = RuleSet('un', categories=('international',), is_global=True, rules=(
+    fixed('International Women\'s Day', 3, 8, description='Celebrating women\'s achievements'),
+    fixed('World Health Day', 4, 7, description='WHO celebration'),
+    fixed('Earth Day', 4, 22, description='Environmental protection'),
+    fixed('International Workers\' Day', 5, 1, description='Labor day'),
+    fixed('World Environment Day', 6, 5, description='UN Environment Programme'),
+    fixed('International Peace Day', 9, 21, description='Peace and non-violence'),
+    fixed('World Food Day', 10, 16, description='FAO celebration'),
+    fixed('Human Rights Day', 12, 10, description='Universal Declaration'),
+))
+
+FUN_DAYS = RuleSet('curated', categories=('fun',), is_global=True, rules=(
+    fixed('Star Wars Day', 5, 4, description='May the 4th be with you!'),
+    fixed('Pi Day', 3, 14, description='Celebrating π (3.14)'),
+    fixed('International Cat Day', 8, 8, description='Celebrating our feline friends'),
+    fixed('International Coffee Day', 10, 1, description='For coffee lovers worldwide'),
+    fixed('World Emoji Day', 7, 17, description='📅 Celebrating emojis!'),
+    fixed('International Pizza Day', 2, 9, description='🍕 Pizza lovers unite!'),
+    fixed('World Chocolate Day', 7, 7, description='🍫 Sweet celebration'),
+    fixed('International Friendship Day', 7, 30, description='Celebrating friendships'),
+))
+
+# National public holidays (no regional or one-off days) for countries
+# whose calendars are fully rule-based
+COUNTRY_RULES: Dict[str, RuleSet] = {
+    rule_set.country_code: rule_set for rule_set in (
+        RuleSet('rules', country_code='US', country_name='United States', rules=(
+            fixed('New Year\'s Day', 1, 1, observed=NEAREST),
+            nth_weekday('Martin Luther King, Jr. Day', 1, MON, 3),
+            nth_weekday('Presidents Day', 2, MON, 3),
+            nth_weekday('Memorial Day', 5, MON, -1),
+            fixed('Juneteenth National Independence Day', 6, 19, observed=NEAREST, since=2021),
+            fixed('Independence Day', 7, 4, observed=NEAREST),
+            nth_weekday('Labor Day', 9, MON, 1),
+            nth_weekday('Columbus Day', 10, MON, 2),
+            fixed('Veterans Day', 11, 11, observed=NEAREST),
+            nth_weekday('Thanksgiving Day', 11, THU, 4),
+            fixed('Christmas Day', 12, 25, observed=NEAREST),
+        )),
+        RuleSet('rules', country_code='GB', country_name='United Kingdom', rules=(
+            fixed('New Year\'s Day', 1, 1, observed=SUBSTITUTE),
+            from_easter('Good Friday', -2),
+            nth_weekday('Early May Bank Holiday', 5, MON, 1),
+            nth_weekday('Spring Bank Holiday', 5, MON, -1),
+            fixed('Christmas Day', 12, 25, observed=SUBSTITUTE),
+            fixed('Boxing Day', 12, 26, observed=SUBSTITUTE),
+        )),
+        RuleSet('rules', country_code='CA', country_name='Canada', rules=(
+            fixed('New Year\'s Day', 1, 1, observed=SUBSTITUTE),
+            from_easter('Good Friday', -2),
+            HolidayRule('Victoria Day', month=5, day=24, weekday=MON, nth=-1),
+            fixed('Canada Day', 7, 1, observed=SUBSTITUTE),
+            nth_weekday('Labour Day', 9, MON, 1),
+            nth_weekday('Thanksgiving', 10, MON, 2),
+            fixed('Christmas Day', 12, 25, observed=SUBSTITUTE),
+            fixed('Boxing Day', 12, 26, observed=SUBSTITUTE),
+        )),
+        RuleSet('rules', country_code='AU', country_name='Australia', rules=(
+            fixed('New Year\'s Day', 1, 1, observed=SUBSTITUTE),
+            fixed('Australia Day', 1, 26, observed=SUBSTITUTE),
+            from_easter('Good Friday', -2),
+            from_easter('Easter Monday', 1),
+            fixed('Anzac Day', 4, 25),
+            fixed('Christmas Day', 12, 25, observed=SUBSTITUTE),
+            fixed('Boxing Day', 12, 26, observed=SUBSTITUTE),
+        )),
+        RuleSet('rules', country_code='DE', country_name='Germany', rules=(
+            fixed('New Year\'s Day', 1, 1),
+            from_easter('Good Friday', -2),
+            from_easter('Easter Monday', 1),
+            fixed('Labour Day', 5, 1),
+            from_easter('Ascension Day', 39),
+            from_easter('Whit Monday', 50),
+            fixed('German Unity Day', 10, 3),
+            fixed('Christmas Day', 12, 25),
+            fixed('St. Stephen\'s Day', 12, 26),
+        )),
+        RuleSet('rules', country_code='FR', country_name='France', rules=(
+            fixed('New Year\'s Day', 1, 1),
+            from_easter('Easter Monday', 1),
+            fixed('Labour Day', 5, 1),
+            fixed('Victory in Europe Day', 5, 8),
+            from_easter('Ascension Day', 39),
+            from_easter('Whit Monday', 50),
+            fixed('Bastille Day', 7, 14),
+            fixed('Assumption Day', 8, 15),
+            fixed('All Saints\' Day', 11, 1),
+            fixed('Armistice Day', 11, 11),
+            fixed('Christmas Day', 12, 25),
+        )),
+    )
+}
+
+
+def country_holidays(country_code: str, years: Iterable[int]) -> List[Dict]:
+    """Computed public holidays for one country; [] if it has no rule table"""
+    rule_set = COUNTRY_RULES.get(country_code)
+    if rule_set is None:
+        return []
+    return generate([rule_set], years)
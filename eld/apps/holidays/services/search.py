@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q, QuerySet
+
+from eld.apps.holidays.models import HolidayAlias
+
+
+class HolidaySearch:
+    """
+    Ranked holiday search.
+
+    On PostgreSQL a query matches holidays whose stored search_vector
+    (name, aliases and description, weighted A/B/C) contains it, or whose
+    name is word-similar to it by trigrams, so typos like "chrismas" still
+    find Christmas. Both conditions are served by GIN indexes. Results are
+    ranked by full-text rank plus name similarity.
+
+    Other databases (sqlite in development) fall back to case-insensitive
+    substring matching on name, aliases and description, unranked.
+    """
+
+    def __init__(self, config: str = None):
+        self.config = config or getattr(settings, 'HOLIDAY_SEARCH_CONFIG', 'english')
+
+    @property
+    def full_text(self) -> bool:
+        return connection.vendor == 'postgresql'
+
+    def filter(self, queryset: QuerySet, text: str, ranked: bool = True) -> QuerySet:
+        """
+        Holidays in `queryset` matching `text`
+
+        With `ranked`, results come best first (ties by date);
+        otherwise the queryset's own ordering is kept.
+        """
+        text = ' '.join(text.split())
+        if not text:
+            return queryset
+        if not self.full_text:
+            return self._filter_substring(queryset, text)
+
+        query = SearchQuery(text, search_type='websearch', config=self.config)
+        queryset = queryset.filter(
+            Q(search_vector=query) | Q(name__trigram_word_similar=text)
+        )
+        if ranked:
+            queryset = queryset.annotate(
+                rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(text, 'name')
+            ).order_by('-rank', 'date', 'name')
+        return queryset
+
+    @staticmethod
+    def _filter_substring(queryset: QuerySet, text: str) -> QuerySet:
+        aliases = HolidayAlias.objects.filter(holiday=OuterRef('pk'), name__icontains=text)
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text) | Exists(aliases)
+        )
+
+
+def search_holidays(queryset: QuerySet, text: str, ranked: bool = True) -> QuerySet:
+    """HolidaySearch().filter() with the configured text search config"""
+    return HolidaySearch().filter(queryset, text, ranked=ranked)
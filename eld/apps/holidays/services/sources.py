@@ -0,0 +1,383 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a source may run before its results are dropped for this refresh
+DEFAULT_SOURCE_TIMEOUT = 300
+
+
+@dataclass
+class Source:
+    """
+    A registered holiday source.
+    
+    fetch(fetcher, year) returns the whole year's holiday dicts. Sources that
+    work country by country can also provide countries(fetcher, year) and
+    fetch_country(fetcher, year, code), which lets the streaming pipeline
+    hand out each country as soon as it has arrived.
+    """
+    name: str
+    fetch: Optional[Callable] = None
+    timeout: Optional[float] = None
+    countries: Optional[Callable] = None
+    fetch_country: Optional[Callable] = None
+    
+    @property
+    def per_country(self) -> bool:
+        return self.countries is not None and self.fetch_country is not None
+    
+    def fetch_year(self, fetcher, year: int) -> List[Dict]:
+        if self.fetch is not None:
+            return self.fetch(fetcher, year)
+        return [
+            holiday
+            for code in self.countries(fetcher, year)
+            for holiday in self.fetch_country(fetcher, year, code)
+        ]
+
+
+class SourceRegistry:
+    """
+    Registry of holiday source plugins.
+    
+    The built-in HolidayFetcher.fetch_* methods register themselves here;
+    additional sources can be added with the same decorator:
+    
+        @registry.register('my_source', timeout=60)
+        def fetch_my_source(fetcher, year):
+            return [{'name': ..., 'date': ..., 'source': 'my_source'}]
+    
+    Country-by-country sources also register their country list and a
+    single-country fetch with register_countries() / register_country_fetch().
+    
+    run() executes every source in parallel, each with its own timeout, and
+    reports per-source latency, record count and error count.
+    iter_partitions() streams the same data partitioned by country.
+    """
+    
+    def __init__(self):
+        self._sources: Dict[str, Source] = {}
+    
+    def _entry(self, name: str) -> Source:
+        if name not in self._sources:
+            self._sources[name] = Source(name=name)
+        return self._sources[name]
+    
+    def register(self, name: str, timeout: Optional[float] = None):
+        """Decorator registering fetch(fetcher, year) under `name`"""
+        def decorator(fetch):
+            source = self._entry(name)
+            source.fetch = fetch
+            source.timeout = timeout
+            return fetch
+        return decorator
+    
+    def register_countries(self, name: str):
+        """Decorator registering countries(fetcher, year) -> country codes for `name`"""
+        def decorator(countries):
+            self._entry(name).countries = countries
+            return countries
+        return decorator
+    
+    def register_country_fetch(self, name: str):
+        """Decorator registering fetch_country(fetcher, year, code) for `name`"""
+        def decorator(fetch_country):
+            self._entry(name).fetch_country = fetch_country
+            return fetch_country
+        return decorator
+    
+    def unregister(self, name: str):
+        self._sources.pop(name, None)
+    
+    def get(self, name: str) -> Source:
+        return self._sources[name]
+    
+    def names(self) -> List[str]:
+        return list(self._sources)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
+    
+    def __iter__(self):
+        return iter(self._sources.values())
+    
+    def run(
+        self,
+        fetcher,
+        year: int,
+        names: Optional[Iterable[str]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Run sources in parallel and collect their holidays.
+        
+        Args:
+            fetcher: HolidayFetcher passed to every source
+            year: Year to fetch
+            names: Sources to run (default: all registered, in registration order)
+            timeouts: Per-source timeout overrides in seconds
+        
+        Returns:
+            (holidays, stats) where holidays are concatenated in source order
+            and stats maps source name to {latency, records, errors, timed_out}
+        """
+        sources = [self._sources[name] for name in (names or self._sources)]
+        timeouts = timeouts or {}
+        if not sources:
+            return [], {}
+        
+        started = {}
+        finished = {}
+        errors_before = dict(fetcher.errors)
+        
+        def timed(source: Source):
+            started[source.name] = time.monotonic()
+            try:
+                return source.fetch_year(fetcher, year)
+            finally:
+                finished[source.name] = time.monotonic()
+        
+        pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='source')
+        submitted_at = time.monotonic()
+        futures = [(source, pool.submit(timed, source)) for source in sources]
+        
+        holidays = []
+        stats = {}
+        
+        for source, future in futures:
+            timeout = timeouts.get(source.name, source.timeout or DEFAULT_SOURCE_TIMEOUT)
+            remaining = max(0, submitted_at + timeout - time.monotonic())
+            
+            records = []
+            failed = 0
+            timed_out = False
+            try:
+                records = future.result(timeout=remaining) or []
+            except FutureTimeoutError:
+                timed_out = True
+                failed = 1
+                logger.error(f"Source {source.name} timed out after {timeout}s for {year}")
+            except Exception as e:
+                failed = 1
+                logger.error(f"Source {source.name} failed for {year}: {e}")
+            
+            end = finished.get(source.name, time.monotonic())
+            stats[source.name] = {
+                'latency': round(end - started.get(source.name, submitted_at), 3),
+                'records': len(records),
+                'errors': failed + fetcher.errors.get(source.name, 0)
+                          - errors_before.get(source.name, 0),
+                'timed_out': timed_out,
+            }
+            holidays.extend(records)
+        
+        # Don't let a hung source hold up the refresh; its thread finishes in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+        return holidays, stats
+    
+    def iter_partitions(
+        self,
+        fetcher,
+        year: int,
+        names: Optional[Iterable[str]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        stats: Optional[Dict[str, Dict]] = None,
+        window: Optional[int] = None,
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Stream holidays as (partition_key, holidays) while sources are still running.
+        
+        Per-country sources are fetched country by country, each through a
+        pool sized to fetcher.concurrency; a country's partition (keyed by its
+        code) is yielded as soon as every source covering it has returned.
+        Whole-year sources yield one partition keyed by the source name.
+        
+        At most `window` country requests are outstanding at once, and
+        nothing new is requested while the consumer is busy with a partition,
+        so memory stays flat however many countries there are.
+        
+        Args:
+            fetcher: HolidayFetcher passed to every source
+            year: Year to fetch
+            names: Sources to run (default: all registered)
+            timeouts: Per-source timeout overrides in seconds. A source's
+                remaining countries are skipped once it runs out of time, and
+                the stream ends when every source has.
+            stats: Dict filled with per-source {latency, records, errors, timed_out}
+            window: Max outstanding country requests (default: 2x total concurrency)
+        """
+        sources = [self._sources[name] for name in (names or self._sources)]
+        timeouts = timeouts or {}
+        stats = {} if stats is None else stats
+        if not sources:
+            return
+        
+        country_sources = [source for source in sources if source.per_country]
+        year_sources = [source for source in sources if not source.per_country]
+        
+        errors_before = dict(fetcher.errors)
+        started = time.monotonic()
+        deadlines = {
+            source.name: started + timeouts.get(source.name, source.timeout or DEFAULT_SOURCE_TIMEOUT)
+            for source in sources
+        }
+        finished = {}
+        records = dict.fromkeys(deadlines, 0)
+        failures = dict.fromkeys(deadlines, 0)
+        busy = dict.fromkeys(deadlines, 0)  # calls submitted but not yet answered
+        timed_out = set()
+        results = queue.Queue()
+        
+        def call(kind, source, key, func, *args):
+            try:
+                results.put((kind, source, key, func(fetcher, year, *args), None))
+            except Exception as e:
+                results.put((kind, source, key, [], e))
+            finally:
+                finished[source.name] = time.monotonic()
+        
+        def submit(pool, kind, source, key, func, *args):
+            busy[source.name] += 1
+            pool.submit(call, kind, source, key, func, *args)
+        
+        # Whole-year sources and country listings run side by side
+        outer = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='source')
+        pools = {
+            source.name: ThreadPoolExecutor(
+                max_workers=max(1, fetcher.concurrency.get(source.name, 1)),
+                thread_name_prefix=f'fetch-{source.name}',
+            )
+            for source in country_sources
+        }
+        window = window or 2 * sum(
+            max(1, fetcher.concurrency.get(source.name, 1)) for source in country_sources
+        ) or 1
+        
+        listings = {}
+        pending = {}  # country code -> sources still to answer
+        buffers = {}  # country code -> holidays received so far
+        tasks = []  # (source, code) in schedule order, consumed from the end
+        in_flight = 0
+        outstanding = len(sources)  # whole-year fetches + country listings
+        
+        def schedule():
+            """Fill the window with country requests; returns codes skipped on timeout"""
+            nonlocal in_flight
+            skipped = []
+            while tasks and in_flight < window:
+                source, code = tasks.pop()
+                if time.monotonic() > deadlines[source.name]:
+                    if source.name not in timed_out:
+                        timed_out.add(source.name)
+                        logger.error(f"Source {source.name} timed out for {year}")
+                    skipped.append(code)
+                    continue
+                submit(pools[source.name], 'country', source, code, source.fetch_country, code)
+                in_flight += 1
+            return skipped
+        
+        try:
+            for source in year_sources:
+                submit(outer, 'year', source, source.name, source.fetch_year)
+            for source in country_sources:
+                submit(outer, 'countries', source, source.name, source.countries)
+            
+            while outstanding or in_flight or tasks:
+                answered = []
+                
+                remaining = max(deadlines.values()) - time.monotonic()
+                try:
+                    kind, source, key, items, error = results.get(timeout=max(0.0, remaining))
+                except queue.Empty:
+                    timed_out.update(name for name, calls in busy.items() if calls)
+                    timed_out.update(source.name for source, _ in tasks)
+                    logger.error(f"Giving up on sources for {year}: {sorted(timed_out)}")
+                    break
+                
+                if error is not None:
+                    failures[source.name] += 1
+                    logger.error(f"Source {source.name} failed for {year} ({key}): {error}")
+                busy[source.name] -= 1
+                
+                if kind == 'year':
+                    outstanding -= 1
+                    records[source.name] += len(items)
+                    if items:
+                        yield key, items
+                
+                elif kind == 'countries':
+                    outstanding -= 1
+                    listings[source.name] = list(items)
+                    if len(listings) == len(country_sources):
+                        tasks = self._order_tasks(country_sources, listings)
+                        for _, code in tasks:
+                            pending[code] = pending.get(code, 0) + 1
+                        tasks.reverse()  # popped from the end
+                
+                else:
+                    in_flight -= 1
+                    records[source.name] += len(items)
+                    buffers.setdefault(key, []).extend(items)
+                    answered.append(key)
+                
+                if len(listings) == len(country_sources):
+                    answered.extend(schedule())
+                
+                # Yield every country whose sources have all answered (or timed out)
+                for code in answered:
+                    pending[code] -= 1
+                    if pending[code] == 0:
+                        del pending[code]
+                        partition = buffers.pop(code, [])
+                        if partition:
+                            yield code, partition
+            
+            # After a timeout, keep what the sources that did answer returned
+            for code, partition in buffers.items():
+                if partition:
+                    yield code, partition
+        
+        finally:
+            outer.shutdown(wait=False, cancel_futures=True)
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            
+            now = time.monotonic()
+            for name in deadlines:
+                stats[name] = {
+                    'latency': round(finished.get(name, now) - started, 3),
+                    'records': records[name],
+                    'errors': failures[name] + int(name in timed_out)
+                              + fetcher.errors.get(name, 0) - errors_before.get(name, 0),
+                    'timed_out': name in timed_out,
+                }
+    
+    @staticmethod
+    def _order_tasks(country_sources, listings) -> List[Tuple[Source, str]]:
+        """
+        Every (source, country) request, grouped by country in listing order,
+        so each partition's requests are issued close together
+        """
+        listed = {name: set(codes) for name, codes in listings.items()}
+        ordered = []
+        seen = set()
+        for source in country_sources:
+            for code in listings[source.name]:
+                if code in seen:
+                    continue
+                seen.add(code)
+                ordered.extend(
+                    (other, code) for other in country_sources
+                    if code in listed[other.name]
+                )
+        return ordered
+
+
+# Default registry used by HolidayFetcher
+registry = SourceRegistry()
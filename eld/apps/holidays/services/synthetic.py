@@ -0,0 +1,120 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+import random
+import string
+
+# Prefix that marks each synthetic record's source with its record id
+SOURCE_PREFIX = 'syn:'
+
+
+def _vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    return sorted(words)
+
+
+def _variant(rng: random.Random, name: str) -> str:
+    """A plausible other source's spelling of `name`"""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return name.lower()
+    if kind == 1:
+        return name.replace("'s", '') if "'s" in name else name.replace(' Day', "'s Day")
+    if kind == 2 and len(name) > 4:
+        # Typo: swap two adjacent letters
+        i = rng.randrange(len(name) - 2)
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if kind == 3 and len(name) > 4:
+        # Typo: drop a letter
+        i = rng.randrange(len(name))
+        return name[:i] + name[i + 1:]
+    if kind == 4:
+        return name.replace('our', 'or') if 'our' in name else name + ' '
+    return f" {name}"
+
+
+def generate_holidays(
+    size: int,
+    sources: int = 3,
+    variant_rate: float = 0.4,
+    jitter_rate: float = 0.05,
+    jitter_days: int = 2,
+    year: int = 2026,
+    seed: int = 0,
+) -> List[Dict]:
+    """
+    Synthetic multi-source holiday dicts with known duplicates.
+
+    Each distinct holiday is reported by 1..`sources` sources. A copy gets a
+    spelling variant with probability `variant_rate` and, for a few movable
+    holidays, a date shifted by up to `jitter_days` with probability
+    `jitter_rate`. Every record carries 'truth' (its holiday's id) and a
+    unique source "syn:<index>", so a dedupe result's sources give back
+    exactly which inputs were merged.
+    """
+    rng = random.Random(seed)
+    words = _vocabulary(rng, max(200, size // 20))
+    suffixes = ['Day', 'Festival', 'Holiday', "Founder's Day", 'Remembrance Day', 'Eve']
+    start = date(year, 1, 1)
+
+    holidays = []
+    truth = 0
+    while len(holidays) < size:
+        name = ' '.join(w.capitalize() for w in rng.sample(words, rng.randint(1, 3)))
+        name = f"{name} {rng.choice(suffixes)}"
+        day = start + timedelta(days=rng.randrange(365))
+        movable = rng.random() < 0.2
+
+        for source in rng.sample(range(sources), rng.randint(1, sources)):
+            copy_name = _variant(rng, name) if rng.random() < variant_rate else name
+            copy_day = day
+            if movable and rng.random() < jitter_rate:
+                copy_day += timedelta(days=rng.randint(-jitter_days, jitter_days))
+            holidays.append({
+                'name': copy_name,
+                'date': copy_day.isoformat(),
+                'country_code': f'S{source}',
+                'categories': ['public'],
+                'is_public_holiday': True,
+                'truth': truth,
+            })
+            if len(holidays) == size:
+                break
+        truth += 1
+
+    rng.shuffle(holidays)
+    for index, holiday in enumerate(holidays):
+        holiday['source'] = f'{SOURCE_PREFIX}{index}'
+    return holidays
+
+
+def _pairs(n: int) -> int:
+    return n * (n - 1) // 2
+
+
+def pairwise_quality(inputs: List[Dict], clusters: Iterable[Iterable[str]]) -> Dict[str, float]:
+    """
+    Pairwise precision and recall of a dedupe result.
+
+    `clusters` is the merged sources of each output record. A pair of
+    inputs counts as predicted if both ended up in the same output, and as
+    true if both share a 'truth' id.
+    """
+    truth = [holiday['truth'] for holiday in inputs]
+    true_pairs = sum(_pairs(n) for n in Counter(truth).values())
+
+    predicted_pairs = 0
+    correct_pairs = 0
+    for sources in clusters:
+        members = [int(s[len(SOURCE_PREFIX):]) for s in sources if s.startswith(SOURCE_PREFIX)]
+        predicted_pairs += _pairs(len(members))
+        correct_pairs += sum(_pairs(n) for n in Counter(truth[m] for m in members).values())
+
+    return {
+        'precision': correct_pairs / predicted_pairs if predicted_pairs else 1.0,
+        'recall': correct_pairs / true_pairs if true_pairs else 1.0,
+        'true_pairs': true_pairs,
+        'predicted_pairs': predicted_pairs,
+    }
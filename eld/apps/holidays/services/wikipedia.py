@@ -0,0 +1,236 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import hashlib
+import logging
+import requests
+
+from eld.apps.holidays.services.holiday_fetcher import BackoffRetry, RETRY_STATUS_CODES
+from eld.apps.holidays.services.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Most titles one MediaWiki query accepts (without the apihighlimits right)
+MAX_TITLES_PER_REQUEST = 50
+
+# Characters MediaWiki never allows in a title; '|' would also split the batch
+INVALID_TITLE_CHARS = frozenset('#<>[]{}|')
+
+CACHE_PREFIX = 'wikipedia:url:'
+
+
+class WikipediaResolver:
+    """
+    Resolves holiday names to existing Wikipedia articles.
+
+    Names are checked up to 50 at a time with the MediaWiki query API
+    (action=query&titles=A|B|...), following title normalization and
+    redirects; missing pages and disambiguation pages resolve to ''.
+    Batches run concurrently, each request in a worker thread.
+
+    Results are cached in the Django cache: found URLs for `ttl` seconds and
+    misses for the shorter `negative_ttl`, so new articles are picked up
+    eventually. Batches that fail are not cached and are retried next time.
+
+    Point WIKIPEDIA_API_URL at a local stand-in to test without network.
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        cache=None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+    ):
+        self.api_url = api_url or getattr(settings, 'WIKIPEDIA_API_URL', 'https://en.wikipedia.org/w/api.php')
+        self.cache = cache if cache is not None else caches[getattr(settings, 'WIKIPEDIA_CACHE', 'default')]
+        self.batch_size = min(
+            batch_size or getattr(settings, 'WIKIPEDIA_BATCH_SIZE', MAX_TITLES_PER_REQUEST),
+            MAX_TITLES_PER_REQUEST,
+        )
+        self.concurrency = concurrency or getattr(settings, 'WIKIPEDIA_CONCURRENCY', 2)
+        self.ttl = ttl or getattr(settings, 'WIKIPEDIA_CACHE_TTL', 30 * 24 * 3600)
+        self.negative_ttl = negative_ttl or getattr(settings, 'WIKIPEDIA_NEGATIVE_CACHE_TTL', 3 * 24 * 3600)
+        self.timeout = getattr(settings, 'HOLIDAY_FETCH_TIMEOUT', 10)
+        self.rate_limiter = get_rate_limiter('wikipedia')
+        self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = (
+                f"{getattr(settings, 'SITE_NAME', 'eld')}/1.0 ({getattr(settings, 'SITE_URL', '')})"
+            )
+            retry = BackoffRetry(
+                limiter=self.rate_limiter,
+                total=getattr(settings, 'HOLIDAY_FETCH_RETRIES', 4),
+                backoff_factor=getattr(settings, 'HOLIDAY_FETCH_BACKOFF', 0.5),
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=frozenset(['GET']),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency, max_retries=retry)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
+
+    @staticmethod
+    def _cache_key(title: str) -> str:
+        return CACHE_PREFIX + hashlib.sha1(title.encode()).hexdigest()
+
+    @staticmethod
+    def title_for(name: str) -> str:
+        """The article title a holiday name is looked up as, or '' if it can't be one"""
+        title = ' '.join(name.replace('_', ' ').split())
+        if not title or len(title.encode()) > 255 or INVALID_TITLE_CHARS & set(title):
+            return ''
+        return title
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, str]:
+        """Blocking wrapper around aresolve() for sync callers (tasks, commands)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aresolve(names))
+        # Sync code called from a running loop (e.g. an async view): asyncio.run
+        # can't nest, so the lookup gets its own loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='wikipedia') as pool:
+            return pool.submit(asyncio.run, self.aresolve(list(names))).result()
+
+    async def aresolve(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Map each name to its article URL ('' if there is none)
+
+        Names whose batch failed are left out of the result.
+        """
+        titles = {}
+        for name in names:
+            titles.setdefault(name, self.title_for(name or ''))
+
+        wanted = sorted({title for title in titles.values() if title})
+        found = self._cache_get(wanted)
+        missing = [title for title in wanted if title not in found]
+
+        if missing:
+            batches = [
+                missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)
+            ]
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def run(batch):
+                async with semaphore:
+                    return await asyncio.to_thread(self._query_batch, batch)
+
+            resolved = {}
+            for result in await asyncio.gather(*(run(batch) for batch in batches)):
+                resolved.update(result)
+            self._cache_set(resolved)
+            found.update(resolved)
+            logger.info(
+                f"Resolved {len(missing)} Wikipedia titles in {len(batches)} requests "
+                f"({sum(1 for url in resolved.values() if url)} found, {len(wanted) - len(missing)} cached)"
+            )
+
+        return {
+            name: found[title] if title else ''
+            for name, title in titles.items()
+            if not title or title in found
+        }
+
+    def _query_batch(self, titles: List[str]) -> Dict[str, str]:
+        """URL (or '') for each title in one API request; {} if the request failed"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        try:
+            response = self.session.get(
+                self.api_url,
+                params={
+                    'action': 'query',
+                    'format': 'json',
+                    'formatversion': '2',
+                    'redirects': '1',
+                    'prop': 'info|pageprops',
+                    'inprop': 'url',
+                    'ppprop': 'disambiguation',
+                    'titles': '|'.join(titles),
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            query = response.json().get('query', {})
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Wikipedia lookup of {len(titles)} titles failed: {e}")
+            return {}
+
+        # requested title -> normalized title -> redirect target(s) -> page
+        renames = {
+            entry['from']: entry['to']
+            for key in ('normalized', 'redirects')
+            for entry in query.get(key, [])
+        }
+        pages = {page['title']: page for page in query.get('pages', [])}
+
+        urls = {}
+        for title in titles:
+            target = title
+            for _ in range(len(renames) + 1):
+                if target not in renames:
+                    break
+                target = renames[target]
+
+            page = pages.get(target)
+            if (
+                page is None
+                or page.get('missing')
+                or page.get('invalid')
+                or 'disambiguation' in page.get('pageprops', {})
+            ):
+                urls[title] = ''
+            else:
+                urls[title] = page.get('fullurl') or self._article_url(page['title'])
+        return urls
+
+    def _article_url(self, title: str) -> str:
+        base = self.api_url.rsplit('/w/api.php', 1)[0]
+        return f"{base}/wiki/{requests.utils.quote(title.replace(' ', '_'))}"
+
+    def _cache_get(self, titles: List[str]) -> Dict[str, str]:
+        if not titles:
+            return {}
+        keys = {self._cache_key(title): title for title in titles}
+        try:
+            cached = self.cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Wikipedia cache unavailable: {e}")
+            return {}
+        return {keys[key]: url for key, url in cached.items()}
+
+    def _cache_set(self, urls: Dict[str, str]):
+        found = {self._cache_key(title): url for title, url in urls.items() if url}
+        missing = {self._cache_key(title): url for title, url in urls.items() if not url}
+        try:
+            if found:
+                self.cache.set_many(found, timeout=self.ttl)
+            if missing:
+                self.cache.set_many(missing, timeout=self.negative_ttl)
+        except Exception as e:
+            logger.warning(f"Wikipedia cache unavailable: {e}")
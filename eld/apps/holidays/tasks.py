@@ -1,11 +1,23 @@
-from celery import shared_task
+from celery import shared_task, chord
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from django.utils import timezone
 from datetime import datetime
+from typing import List
 import logging
+import time
 
 from eld.apps.holidays.services.holiday_fetcher import HolidayFetcher
+from eld.apps.holidays.services.aliases import AliasIndex
 from eld.apps.holidays.services.deduplicator import HolidayDeduplicator
-from eld.apps.holidays.models import Holiday, Country, HolidayCategory
+from eld.apps.holidays.services.changeset import DiffHolidayWriter, RefreshWindow
+from eld.apps.holidays.services.day_index import DayIndex
+from eld.apps.holidays.services.fingerprints import FingerprintStore, partition_digests
+from eld.apps.holidays.services.partitions import HolidayPartitions
+from eld.apps.holidays.services.persistence import BulkHolidayWriter, CopyHolidayWriter, get_flag_emoji
+from eld.apps.holidays.services.records import HolidayRecord, pack, to_records, unpack
+from eld.apps.holidays.services.sources import registry
+from eld.apps.holidays.models import Holiday, Country, HolidayCategory, HolidayDayIndex, SourceFingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -14,81 +26,521 @@ def refresh_all_holidays():
     """
     Daily task to refresh holiday data from all sources
     Fetches current year + next 2 years
-    """
-    current_year = datetime.now().year
-    years = [current_year, current_year + 1, current_year + 2]
     
-    total_created = 0
-    total_updated = 0
+    Fans out as one chord per year: a fetch_holiday_shard task per
+    (source, country batch) followed by persist_holiday_shards, which
+    dedupes and saves the year. Failed shards are retried on their own.
+    """
+    years = get_refresh_years()
+    shards = plan_refresh_shards(years)
+    HolidayPartitions().ensure(years)
     
+    chord_ids = []
     for year in years:
-        created, updated = refresh_holidays_for_year(year)
-        total_created += created
-        total_updated += updated
+        header = [
+            fetch_holiday_shard.s(shard['year'], shard['source'], shard['countries'], shard['names'])
+            for shard in shards if shard['year'] == year
+        ]
+        result = chord(header)(persist_holiday_shards.s(year))
+        chord_ids.append(result.id)
+    
+    logger.info(f"Dispatched {len(shards)} holiday shards for {years}")
+    return {'years': years, 'shards': len(shards), 'chords': chord_ids}
+
+def plan_refresh_shards(years, batch_size: int = None):
+    """
+    Split a refresh into (year, source, country batch) shards
+    
+    Per-country sources are cut into batches of `batch_size` countries;
+    whole-year sources become a single shard with countries=None. The
+    country names the listing returned travel with each batch, so shards
+    don't have to list the countries again.
+    
+    Returns:
+        List of {'year', 'source', 'countries', 'names'} dicts (JSON-serializable)
+    """
+    batch_size = batch_size or getattr(settings, 'HOLIDAY_SHARD_SIZE', 10)
+    shards = []
+    
+    with HolidayFetcher() as fetcher:
+        for year in years:
+            for source in registry:
+                if not source.per_country:
+                    shards.append({'year': year, 'source': source.name, 'countries': None, 'names': {}})
+                    continue
+                
+                countries = list(source.countries(fetcher, year))
+                for start in range(0, len(countries), batch_size):
+                    batch = countries[start:start + batch_size]
+                    shards.append({
+                        'year': year,
+                        'source': source.name,
+                        'countries': batch,
+                        'names': {
+                            code: fetcher.country_names[code]
+                            for code in batch if fetcher.country_names.get(code)
+                        },
+                    })
+    
+    return shards
+
+def fetch_shard(year: int, source: str, countries=None, strict: bool = False, names=None):
+    """
+    Fetch one shard's holidays
+    
+    Args:
+        year: Year to fetch
+        source: Registered source name
+        countries: Country codes for per-country sources, None for the whole year
+        strict: Raise on request failures instead of skipping the country
+        names: Country names by code from the shard plan
+    
+    Returns:
+        Dict with the shard's year, source, countries, holidays (packed,
+        see records.pack) and stats
+    """
+    entry = registry.get(source)
+    started = time.monotonic()
+    
+    with HolidayFetcher(strict=strict) as fetcher:
+        if countries is None:
+            holidays = entry.fetch_year(fetcher, year)
+        else:
+            fetcher.country_names.update(names or {})
+            holidays = fetcher.fetch_countries(
+                source,
+                lambda year, code: entry.fetch_country(fetcher, year, code),
+                year,
+                countries,
+            )
+        errors = fetcher.errors.get(source, 0)
     
-    logger.info(f"Holiday refresh complete: {total_created} created, {total_updated} updated")
-    return {'created': total_created, 'updated': total_updated}
+    return {
+        'year': year,
+        'source': source,
+        'countries': countries,
+        'holidays': pack(holidays),
+        'stats': {
+            'latency': round(time.monotonic() - started, 3),
+            'records': len(holidays),
+            'errors': errors,
+            'timed_out': False,
+        },
+    }
 
-def refresh_holidays_for_year(year: int):
-    """Refresh holidays for a specific year"""
-    fetcher = HolidayFetcher()
+@shared_task(bind=True, max_retries=3)
+def fetch_holiday_shard(self, year: int, source: str, countries=None, names=None):
+    """
+    Fetch one (year, source, country batch) shard
+    
+    Request failures raise and retry just this shard with backoff; the last
+    attempt is lenient and keeps whichever countries did succeed. If even
+    that fails, an empty shard flagged as failed is returned, so the chord
+    still saves the year's other shards (nothing of this one is deleted).
+    """
+    strict = self.request.retries < self.max_retries
+    try:
+        return fetch_shard(year, source, countries, strict=strict, names=names)
+    except Exception as exc:
+        if strict:
+            logger.warning(f"Shard {source} {year} {countries} failed, retrying: {exc}")
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries * 30)
+        logger.error(f"Shard {source} {year} {countries} failed after {self.request.retries} retries: {exc}")
+        return failed_shard(year, source, countries, exc)
+
+def failed_shard(year: int, source: str, countries, exc: Exception):
+    """Empty shard result standing in for one whose fetch gave up"""
+    return {
+        'year': year,
+        'source': source,
+        'countries': countries,
+        'holidays': pack([]),
+        'stats': {'latency': 0.0, 'records': 0, 'errors': len(countries or ()) or 1, 'timed_out': False},
+        'failed': True,
+        'error': str(exc),
+    }
+
+@shared_task
+def persist_holiday_shards(shard_results, year: int, incremental: bool = True):
+    """Chord callback: dedupe and save a year's shards"""
+    return persist_shards(shard_results, year, incremental)
+
+@shared_task
+def refresh_day_index(years):
+    """Rebuild the day index of years edited outside a refresh (queued by day_index.mark_stale)"""
+    index = DayIndex()
+    return {year: index.refresh(year) for year in years}
+
+def persist_shards(shard_results, year: int, incremental: bool = True):
+    """
+    Dedupe and save fetched shards for one year
+    
+    Holidays are regrouped into the same partitions the streaming refresh
+    uses (country code, or source name for whole-year sources). If anything
+    changed, the year's day index is brought up to date afterwards.
+    
+    Returns:
+        Dict with year, created, updated and deleted counts, partitions
+        (total and skipped as unchanged) and per-source stats
+    """
+    return persist_shard_years({year: shard_results}, incremental)[0]
+
+def persist_shard_years(results_by_year, incremental: bool = True):
+    """
+    Dedupe and save fetched shards for several years, as persist_shards does
+    
+    When the changed partitions of all years add up to the deduplicator's
+    parallel threshold (outside daemonic Celery workers), they are
+    deduplicated up front across a process pool instead of one at a time.
+    Names are then canonicalized against the aliases known before the run;
+    aliases learned while saving still match records to existing rows.
+    
+    Args:
+        results_by_year: Year -> that year's shard results
+        incremental: Skip partitions whose upstream payload is unchanged
+    
+    Returns:
+        List of per-year reports (see persist_shards)
+    """
     deduplicator = HolidayDeduplicator()
+    runs = []
+    for year, shard_results in results_by_year.items():
+        partitions = {}
+        source_stats = {}
+        for shard in shard_results:
+            merge_source_stats(source_stats, {shard['source']: shard['stats']})
+            for holiday in unpack(shard['holidays']):
+                key = holiday.country_code or holiday.source
+                partitions.setdefault(key, []).append(holiday)
+        
+        fingerprints = FingerprintStore(year) if incremental else None
+        aliases = AliasIndex(year, window_days=deduplicator.DATE_FUZZY_RANGE_DAYS)
+        runs.append((year, len(shard_results), partitions, source_stats, fingerprints, aliases))
     
-    # Fetch from all sources
-    logger.info(f"Fetching holidays for {year}...")
-    raw_holidays = fetcher.fetch_all_holidays(year)
+    pending = [
+        (year, key, aliases, raw_holidays)
+        for year, _, partitions, _, fingerprints, aliases in runs
+        for key, raw_holidays in partitions.items()
+        if fingerprints is None or not fingerprints.unchanged(partition_digests(raw_holidays))
+    ]
+    deduplicated = {}
+    if deduplicator.uses_processes(sum(len(raw) for *_, raw in pending), len(pending)):
+        results = deduplicator.deduplicate_many([
+            [aliases.canonicalize(holiday) for holiday in raw_holidays]
+            for _, _, aliases, raw_holidays in pending
+        ])
+        for (year, key, _, _), holidays in zip(pending, results):
+            deduplicated[year, key] = holidays
+    
+    reports = []
+    for year, shard_count, partitions, source_stats, fingerprints, aliases in runs:
+        writer = get_writer(aliases)
+        created_count = 0
+        updated_count = 0
+        deleted_count = 0
+        skipped_count = 0
+        for key, raw_holidays in partitions.items():
+            created, updated, deleted, skipped = persist_partition(
+                deduplicator, raw_holidays, fingerprints, aliases, writer,
+                deduplicated=deduplicated.get((year, key)),
+            )
+            created_count += created
+            updated_count += updated
+            deleted_count += deleted
+            skipped_count += int(skipped)
+        
+        if created_count or updated_count or deleted_count:
+            DayIndex().refresh(year)
+        
+        logger.info(
+            f"Year {year}: {created_count} created, {updated_count} updated, {deleted_count} deleted "
+            f"from {shard_count} shards ({skipped_count} partitions unchanged)"
+        )
+        reports.append({
+            'year': year,
+            'created': created_count,
+            'updated': updated_count,
+            'deleted': deleted_count,
+            'partitions': len(partitions),
+            'skipped': skipped_count,
+            'sources': source_stats,
+        })
+    return reports
+
+def refresh_years_parallel(years, workers: int = None, incremental: bool = True):
+    """
+    Run the sharded refresh locally: shards in a thread pool, then the reduce step
+    
+    Same plan and reduce as the Celery fan-out, for management commands
+    that run without a worker.
+    """
+    shards = plan_refresh_shards(years)
+    workers = workers or getattr(settings, 'HOLIDAY_LOCAL_SHARD_WORKERS', 8)
+    
+    def fetch(shard):
+        try:
+            return fetch_shard(shard['year'], shard['source'], shard['countries'], names=shard['names'])
+        except Exception as exc:
+            logger.error(f"Shard {shard['source']} {shard['year']} {shard['countries']} failed: {exc}")
+            return failed_shard(shard['year'], shard['source'], shard['countries'], exc)
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shard') as pool:
+        results = list(pool.map(fetch, shards))
+    
+    reports = persist_shard_years(
+        {year: [result for result in results if result['year'] == year] for year in years},
+        incremental,
+    )
+    return summarize_reports(reports)
+
+def get_refresh_years():
+    """Years kept fresh by the nightly refresh: current + next 2"""
+    current_year = datetime.now().year
+    return [current_year, current_year + 1, current_year + 2]
+
+def refresh_years(years, fetcher: HolidayFetcher = None, incremental: bool = True):
+    """
+    Refresh several years, optionally sharing one fetcher between them
     
-    # Deduplicate
-    logger.info(f"Deduplicating {len(raw_holidays)} holidays...")
-    unique_holidays = deduplicator.deduplicate(raw_holidays)
+    Args:
+        years: Years to refresh
+        fetcher: Fetcher to use (e.g. in record/replay mode); a live one per
+            year is created when omitted
+        incremental: Skip partitions whose upstream payload is unchanged
     
-    # Save to database
-    logger.info(f"Saving {len(unique_holidays)} holidays to database...")
+    Returns:
+        Dict with total created, updated, deleted and skipped-partition
+        counts, and per-source stats summed over all years
+    """
+    reports = [
+        refresh_holidays_for_year(year, fetcher=fetcher, incremental=incremental)
+        for year in years
+    ]
+    return summarize_reports(reports)
+
+def summarize_reports(reports):
+    """Combine per-year refresh reports into run totals"""
+    summary = {'created': 0, 'updated': 0, 'deleted': 0, 'skipped': 0, 'sources': {}}
+    for report in reports:
+        summary['created'] += report['created']
+        summary['updated'] += report['updated']
+        summary['deleted'] += report['deleted']
+        summary['skipped'] += report['skipped']
+        merge_source_stats(summary['sources'], report['sources'])
+    
+    logger.info(
+        f"Holiday refresh complete: {summary['created']} created, {summary['updated']} updated, "
+        f"{summary['deleted']} deleted, "
+        f"{summary['skipped']} unchanged partitions skipped"
+    )
+    return summary
+
+def merge_source_stats(total: dict, stats: dict):
+    """Add one run's per-source stats into a running total (in place)"""
+    for name, source in stats.items():
+        summed = total.setdefault(
+            name, {'latency': 0.0, 'records': 0, 'errors': 0, 'timed_out': 0}
+        )
+        summed['latency'] = round(summed['latency'] + source['latency'], 3)
+        summed['records'] += source['records']
+        summed['errors'] += source['errors']
+        summed['timed_out'] += int(source['timed_out'])
+    return total
+
+def refresh_holidays_for_year(year: int, fetcher: HolidayFetcher = None, incremental: bool = True):
+    """
+    Refresh holidays for a specific year
+    
+    Streams the fetch: each country partition is deduplicated and saved as
+    soon as all its sources have answered, while later partitions are still
+    downloading, so memory stays flat as the number of countries grows.
+    
+    With incremental=True, partitions whose payload fingerprints match the
+    previous run skip dedupe and DB work entirely. If anything changed, the
+    year's day index is brought up to date afterwards.
+    
+    Returns:
+        Dict with year, created, updated and deleted counts, number of
+        partitions (total and skipped), and per-source latency/records/errors
+    """
+    deduplicator = HolidayDeduplicator()
+    fingerprints = FingerprintStore(year) if incremental else None
+    aliases = AliasIndex(year, window_days=deduplicator.DATE_FUZZY_RANGE_DAYS)
+    writer = get_writer(aliases)
     created_count = 0
     updated_count = 0
+    deleted_count = 0
+    partition_count = 0
+    skipped_count = 0
+    
+    logger.info(f"Fetching holidays for {year}...")
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HolidayFetcher()
+    
+    try:
+        for partition, raw_holidays in fetcher.iter_partitions(year):
+            partition_count += 1
+            logger.debug(f"Saving partition {partition} ({len(raw_holidays)} holidays)...")
+            created, updated, deleted, skipped = persist_partition(
+                deduplicator, raw_holidays, fingerprints, aliases, writer
+            )
+            created_count += created
+            updated_count += updated
+            deleted_count += deleted
+            skipped_count += int(skipped)
+    finally:
+        if own_fetcher:
+            fetcher.close()
+    
+    if created_count or updated_count or deleted_count:
+        DayIndex().refresh(year)
+    
+    logger.info(
+        f"Year {year}: {created_count} created, {updated_count} updated, {deleted_count} deleted "
+        f"across {partition_count} partitions ({skipped_count} unchanged)"
+    )
+    return {
+        'year': year,
+        'created': created_count,
+        'updated': updated_count,
+        'deleted': deleted_count,
+        'partitions': partition_count,
+        'skipped': skipped_count,
+        'sources': fetcher.source_stats,
+    }
+
+def persist_partition(
+    deduplicator: HolidayDeduplicator,
+    raw_holidays,
+    fingerprints: FingerprintStore = None,
+    aliases: AliasIndex = None,
+    writer: BulkHolidayWriter = None,
+    deduplicated: List[HolidayRecord] = None,
+):
+    """
+    Deduplicate one partition and save it
+    
+    Args:
+        deduplicator: Deduplicator to use
+        raw_holidays: The partition's holidays (records or dicts) from all its sources
+        fingerprints: When given, a partition whose every (source, country)
+            payload is unchanged since the last run is skipped
+        aliases: Known alternative names, used by both dedupe and save and
+            extended with the variants merged here
+        writer: Writer to save with (see get_writer); holidays are saved
+            one by one with save_holiday when omitted
+        deduplicated: The partition already deduplicated (see
+            persist_shard_years), used instead of deduplicating it here
+    
+    Returns:
+        (created, updated, deleted, skipped) counts; skipped is True if the
+        partition was unchanged and nothing was done
+    """
+    raw_holidays = to_records(raw_holidays)
+    digests = partition_digests(raw_holidays) if fingerprints is not None else None
+    if digests and fingerprints.unchanged(digests):
+        return 0, 0, 0, True
+    
+    if deduplicated is not None:
+        holidays = deduplicated
+    else:
+        holidays = deduplicator.deduplicate(raw_holidays, aliases=aliases)
+    if writer is not None:
+        created_count, updated_count, deleted_count = writer.save(
+            holidays, window=RefreshWindow.for_partition(raw_holidays)
+        )
+        failed = writer.failed
+    else:
+        created_count = 0
+        updated_count = 0
+        deleted_count = 0
+        failed = False
+        for holiday_data in holidays:
+            created, updated = save_holiday(holiday_data, aliases=aliases)
+            if created is None:
+                failed = True
+            if created:
+                created_count += 1
+            if updated:
+                updated_count += 1
+    
+    # A partition that failed to save must not be skipped as unchanged next time
+    if digests and not failed:
+        fingerprints.save(digests)
     
-    for holiday_data in unique_holidays:
-        created, updated = save_holiday(holiday_data)
-        if created:
-            created_count += 1
-        if updated:
-            updated_count += 1
+    return created_count, updated_count, deleted_count, False
+
+def get_writer(aliases: AliasIndex = None, mode: str = None):
+    """
+    Writer for a refresh, chosen by HOLIDAY_PERSIST_MODE
     
-    logger.info(f"Year {year}: {created_count} created, {updated_count} updated")
-    return created_count, updated_count
+    'diff' (default) writes each partition as a change set against what is
+    stored, 'copy' merges through a COPY-loaded staging table on PostgreSQL
+    (fast reseeds; bulk ORM elsewhere), 'bulk' merges with bulk ORM upserts
+    and 'row' returns None, saving one holiday at a time with save_holiday.
+    """
+    mode = mode or getattr(settings, 'HOLIDAY_PERSIST_MODE', 'diff')
+    writers = {
+        'diff': DiffHolidayWriter,
+        'copy': CopyHolidayWriter,
+        'bulk': BulkHolidayWriter,
+        'row': None,
+    }
+    if mode not in writers:
+        raise ValueError(f"Unknown persist mode {mode!r}, expected one of {tuple(writers)}")
+    return writers[mode](aliases) if writers[mode] else None
 
-def save_holiday(data: dict):
-    """Save or update a single holiday"""
+def save_holiday(data, aliases: AliasIndex = None):
+    """
+    Save or update a single holiday (a HolidayRecord or holiday dict)
+    
+    With an alias index, a name known to belong to an existing holiday
+    updates that row instead of inserting a near-duplicate, and the names
+    merged into the record are stored as new aliases.
+    
+    Returns:
+        (created, updated) flags, or (None, None) if saving failed
+    """
     try:
-        # Parse date
-        if isinstance(data['date'], str):
-            date = datetime.fromisoformat(data['date'].replace('Z', '+00:00')).date()
-        else:
-            date = data['date']
+        record = HolidayRecord.coerce(data)
+        date = record.date
+        if date is None:
+            # Bad data, not a failed write: retrying would not help
+            logger.error(f"Error saving holiday {record.name}: Invalid date {record.date_key!r}")
+            return False, False
+        
+        match = aliases.lookup(record) if aliases is not None else None
+        holiday = Holiday.objects.filter(pk=match.holiday_id).first() if match else None
+        created = False
         
         # Get or create holiday
-        holiday, created = Holiday.objects.get_or_create(
-            name=data['name'],
-            date=date,
-            year=date.year,
-            defaults={
-                'description': data.get('description', ''),
-                'is_public_holiday': data.get('is_public_holiday', False),
-                'is_global': data.get('is_global', False),
-                'sources': data.get('sources', [data.get('source', '')]),
-            }
-        )
+        if holiday is None:
+            holiday, created = Holiday.objects.get_or_create(
+                name=record.name,
+                date=date,
+                year=date.year,
+                defaults={
+                    'description': record.description,
+                    'is_public_holiday': record.is_public_holiday,
+                    'is_global': record.is_global,
+                    'sources': list(record.sources) or [record.source or ''],
+                }
+            )
+        
+        if aliases is not None:
+            aliases.learn(holiday, record.aliases + (record.name,))
         
         # Update if exists
         updated = False
         if not created:
-            if data.get('description') and not holiday.description:
-                holiday.description = data['description']
+            if record.description and not holiday.description:
+                holiday.description = record.description
                 updated = True
             
-            if data.get('source'):
-                if data['source'] not in holiday.sources:
-                    holiday.sources.append(data['source'])
+            for source in record.all_sources:
+                if source not in holiday.sources:
+                    holiday.sources.append(source)
                     updated = True
             
             if updated:
@@ -96,19 +548,19 @@ def save_holiday(data: dict):
                 holiday.save()
         
         # Add countries
-        if 'country_code' in data:
+        if record.country_code:
             country, _ = Country.objects.get_or_create(
-                code=data['country_code'],
+                code=record.country_code,
                 defaults={
-                    'name': data.get('country_name', data['country_code']),
-                    'flag_emoji': get_flag_emoji(data['country_code'])
+                    'name': record.country_name or record.country_code,
+                    'flag_emoji': get_flag_emoji(record.country_code)
                 }
             )
             holiday.countries.add(country)
         
         # Add categories
-        if 'categories' in data:
-            for cat_slug in data['categories']:
+        if record.categories:
+            for cat_slug in record.categories:
                 category, _ = HolidayCategory.objects.get_or_create(
                     slug=cat_slug,
                     defaults={
@@ -121,26 +573,73 @@ def save_holiday(data: dict):
         return created, updated
     
     except Exception as e:
-        logger.error(f"Error saving holiday {data.get('name')}: {e}")
-        return False, False
+        name = data.name if isinstance(data, HolidayRecord) else data.get('name')
+        logger.error(f"Error saving holiday {name}: {e}")
+        return None, None
 
 @shared_task
 def cleanup_old_data():
     """
     Clean up old holiday data
     Runs monthly on the 1st at 3 AM
+    
+    On PostgreSQL, whole years past retention go by dropping their Holiday
+    partition, and partitions for the coming years are created; whatever
+    is left (rows in the default partition, other databases) is deleted.
     """
     from datetime import datetime
     
-    # Delete holidays older than 2 years
-    cutoff_date = datetime.now().date().replace(year=datetime.now().year - 2, month=1, day=1)
+    # Delete holidays older than HOLIDAY_RETENTION_YEARS (default 2) years
+    this_year = datetime.now().year
+    retention = getattr(settings, 'HOLIDAY_RETENTION_YEARS', 2)
+    cutoff_date = datetime.now().date().replace(year=this_year - retention, month=1, day=1)
+    
+    partitions = HolidayPartitions()
+    dropped = partitions.drop_before(cutoff_date.year)
+    partitions.ensure(range(this_year, this_year + getattr(settings, 'HOLIDAY_PARTITIONS_AHEAD', 3) + 1))
     
-    deleted_count = Holiday.objects.filter(
+    deleted_count = sum(count for _, count in dropped) + Holiday.objects.filter(
         date__lt=cutoff_date
     ).delete()[0]
+    SourceFingerprint.objects.filter(year__lt=cutoff_date.year).delete()
+    HolidayDayIndex.objects.filter(date__lt=cutoff_date).delete()
+    
+    logger.info(f"Deleted {deleted_count} old holidays ({len(dropped)} partitions dropped)")
+    return {'deleted': deleted_count, 'partitions_dropped': [year for year, _ in dropped]}
+
+@shared_task
+def verify_wikipedia_links(years=None):
+    """
+    Point stored holidays at Wikipedia articles that actually exist
+    
+    Resolves every distinct holiday name of the refresh years through the
+    batched, cached MediaWiki lookup and clears links to missing pages.
+    Names whose lookup failed are left alone.
     
-    logger.info(f"Deleted {deleted_count} old holidays")
-    return {'deleted': deleted_count}
+    Args:
+        years: Years to check (defaults to the refresh years)
+    
+    Returns:
+        Dict with the number of names checked and holidays updated
+    """
+    from eld.apps.holidays.services.wikipedia import WikipediaResolver
+    
+    holidays = list(
+        Holiday.objects.filter(year__in=years or get_refresh_years()).only('id', 'name', 'wikipedia_url')
+    )
+    with WikipediaResolver() as resolver:
+        urls = resolver.resolve({holiday.name for holiday in holidays})
+    
+    changed = []
+    for holiday in holidays:
+        url = urls.get(holiday.name)
+        if url is not None and url != holiday.wikipedia_url:
+            holiday.wikipedia_url = url
+            changed.append(holiday)
+    Holiday.objects.bulk_update(changed, ['wikipedia_url'], batch_size=500)
+    
+    logger.info(f"Verified Wikipedia links for {len(urls)} names, updated {len(changed)} holidays")
+    return {'names': len(urls), 'updated': len(changed)}
 
 @shared_task
 def update_statistics():
@@ -173,10 +672,3 @@ def update_statistics():
     
     logger.info(f"Updated statistics: {stats['total_holidays']} holidays")
     return stats
-
-def get_flag_emoji(country_code: str) -> str:
-    """Convert country code to flag emoji"""
-    if len(country_code) != 2:
-        return '🌍'
-    
-    return ''.join(chr(127397 + ord(c)) for c in country_code.upper())
\ No newline at end of file
@@ -0,0 +1,22 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from eld.apps.holidays.models import Holiday
+from eld.apps.holidays.services.search import search_holidays
+from eld.apps.holidays.views import window_holidays
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Ranked search needs PostgreSQL')
+class HolidaySearchTestCase(TestCase):
+    def setUp(self):
+        Holiday.objects.create(name="Christmas Day", date=date(2025, 12, 25), description="Birth of Jesus")
+        Holiday.objects.create(name="New Year's Day", date=date(2025, 1, 1))
+
+    def test_search_year_window(self):
+        holidays = window_holidays(date(2025, 1, 1), date(2025, 12, 31))
+
+        self.assertEqual([h.name for h in search_holidays(holidays, "christmas")], ["Christmas Day"])
+        self.assertEqual([h.name for h in search_holidays(holidays, "chrismas")], ["Christmas Day"])
@@ -4,14 +4,15 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.cache import cache_page
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from django.core.cache import cache
-from django.db.models import Q
 import hashlib
 
 from eld.apps.holidays.models import Holiday, Country, HolidayCategory
 from eld.apps.calendars.models import UserHoliday, UserCalendar
 from eld.apps.holidays.decorators import cache_queryset
+from eld.apps.holidays.services.day_index import DayIndex
+from eld.apps.holidays.services.search import search_holidays
 
 def discovery_view(request):
     """Main holiday discovery page"""
@@ -25,30 +26,34 @@ def discovery_view(request):
     
     return render(request, 'holidays/discovery.html', context)
 
+def window_holidays(start_date, end_date, country='', category=''):
+    """
+    Holidays from start_date to end_date (inclusive) for the country/category filters
+    
+    With a filter, the window resolves to holiday ids with one range read
+    of the day index and the rows are fetched by primary key; without one
+    it is a plain date range. year__in lets PostgreSQL prune to the year
+    partitions the window spans.
+    """
+    holidays = Holiday.objects.filter(year__in=range(start_date.year, end_date.year + 1))
+    if country or category:
+        holidays = holidays.filter(pk__in=DayIndex().lookup(start_date, end_date, country, category))
+    else:
+        holidays = holidays.filter(date__gte=start_date, date__lte=end_date)
+    return holidays.prefetch_related('countries', 'categories').order_by('date')
+
 @cache_queryset(timeout=3600, key_prefix='holidays_filtered')
 def get_cached_holidays(start_date, end_date, filters):
     """Get holidays with caching"""
-    holidays = Holiday.objects.filter(
-        date__gte=start_date,
-        date__lte=end_date
-    ).prefetch_related('countries', 'categories').order_by('date')
+    holidays = window_holidays(
+        start_date, end_date, filters.get('country', ''), filters.get('category', '')
+    )
     
-    # Apply filters from dict
+    # A search ranks best matches first
     if filters.get('search'):
-        holidays = holidays.filter(
-            Q(name__icontains=filters['search']) | 
-            Q(description__icontains=filters['search'])
-        )
-    
-    if filters.get('country'):
-        holidays = holidays.filter(
-            Q(countries__code=filters['country']) | Q(is_global=True)
-        )
-    
-    if filters.get('category'):
-        holidays = holidays.filter(categories__slug=filters['category'])
+        holidays = search_holidays(holidays, filters['search'])
     
-    return holidays.distinct()
+    return holidays
 
 def week_view(request):
     """Next 7 days view with countdowns"""
@@ -100,10 +105,12 @@ def month_view(request):
     else:
         month_after = next_month.replace(month=next_month.month + 1, day=1)
     
-    holidays = Holiday.objects.filter(
-        date__gte=current_month_start,
-        date__lt=month_after
-    ).prefetch_related('countries', 'categories').order_by('date')
+    holidays = window_holidays(
+        current_month_start,
+        month_after - timedelta(days=1),
+        request.GET.get('country', ''),
+        request.GET.get('category', ''),
+    )
     
     holidays = apply_filters(request, holidays)
     
@@ -129,11 +136,15 @@ def year_view(request):
     """Full year expandable grid view"""
     year = int(request.GET.get('year', timezone.now().year))
     
-    holidays = Holiday.objects.filter(
-        year=year
-    ).prefetch_related('countries', 'categories').order_by('date')
+    holidays = window_holidays(
+        date(year, 1, 1),
+        date(year, 12, 31),
+        request.GET.get('country', ''),
+        request.GET.get('category', ''),
+    )
     
-    holidays = apply_filters(request, holidays)
+    # Keep date order for the month grid
+    holidays = apply_filters(request, holidays, ranked=False)
     
     # Group by month
     months = {}
@@ -160,29 +171,13 @@ def year_view(request):
     
     return render(request, 'holidays/year_view.html', context)
 
-def apply_filters(request, queryset):
-    """Apply search and filter parameters"""
-    # Search
+def apply_filters(request, queryset, ranked=True):
+    """Apply the search parameter (country/category come from the day index)"""
     search = request.GET.get('search', '').strip()
     if search:
-        queryset = queryset.filter(
-            Q(name__icontains=search) | 
-            Q(description__icontains=search)
-        )
-    
-    # Country filter
-    country = request.GET.get('country')
-    if country:
-        queryset = queryset.filter(
-            Q(countries__code=country) | Q(is_global=True)
-        )
-    
-    # Category filter
-    category = request.GET.get('category')
-    if category:
-        queryset = queryset.filter(categories__slug=category)
+        queryset = search_holidays(queryset, search, ranked=ranked)
     
-    return queryset.distinct()
+    return queryset
 
 @login_required
 @require_POST
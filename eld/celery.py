@@ -17,6 +17,12 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=2, minute=0),
     },
     
+    # Check Wikipedia links of refreshed holidays daily at 4 AM
+    'verify-wikipedia-links': {
+        'task': 'apps.holidays.tasks.verify_wikipedia_links',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    
     # Send reminder emails daily at 9 AM
     'send-holiday-reminders': {
         'task': 'apps.calendars.tasks.send_daily_reminders',
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     
     # Third party
     'allauth',
@@ -169,4 +170,73 @@ ABSTRACT_API_KEY = env('ABSTRACT_API_KEY', default='')
 
 # App Configuration
 SITE_URL = env('SITE_URL', default='http://localhost:8000')
-SITE_NAME = env('SITE_NAME', default='eld')
\ No newline at end of file
+SITE_NAME = env('SITE_NAME', default='eld')
+
+# Holiday fetcher: max concurrent requests per source
+HOLIDAY_FETCH_CONCURRENCY = {
+    'nager': env.int('NAGER_CONCURRENCY', default=8),
+    'calendarific': env.int('CALENDARIFIC_CONCURRENCY', default=4),
+    'abstract': env.int('ABSTRACT_CONCURRENCY', default=2),
+}
+
+HOLIDAY_FETCH_TIMEOUT = env.int('HOLIDAY_FETCH_TIMEOUT', default=10)  # seconds per request
+HOLIDAY_FETCH_RETRIES = env.int('HOLIDAY_FETCH_RETRIES', default=4)  # on 429/5xx and connection errors
+HOLIDAY_FETCH_BACKOFF = env.float('HOLIDAY_FETCH_BACKOFF', default=0.5)  # exponential backoff factor
+
+# On-disk conditional-request cache for upstream holiday APIs (empty dir disables)
+HOLIDAY_HTTP_CACHE_DIR = env('HOLIDAY_HTTP_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'holidays'))
+HOLIDAY_HTTP_CACHE_TTL = env.int('HOLIDAY_HTTP_CACHE_TTL', default=7 * 24 * 3600)  # seconds
+HOLIDAY_HTTP_CACHE_MAX_BYTES = env.int('HOLIDAY_HTTP_CACHE_MAX_BYTES', default=200 * 1024 * 1024)
+
+# Fetch mode: 'live', 'record' (capture responses to HOLIDAY_FETCH_FIXTURES) or 'replay'
+HOLIDAY_FETCH_MODE = env('HOLIDAY_FETCH_MODE', default='live')
+HOLIDAY_FETCH_FIXTURES = env('HOLIDAY_FETCH_FIXTURES', default='')  # .json.gz archive path
+
+# Per-source timeouts in seconds for a whole year's fetch (default 300)
+HOLIDAY_SOURCE_TIMEOUTS = {
+    'nager': env.int('NAGER_SOURCE_TIMEOUT', default=300),
+    'calendarific': env.int('CALENDARIFIC_SOURCE_TIMEOUT', default=120),
+    'abstract': env.int('ABSTRACT_SOURCE_TIMEOUT', default=120),
+}
+
+# Sharded refresh: countries per (year, source) shard, and local thread pool size
+HOLIDAY_SHARD_SIZE = env.int('HOLIDAY_SHARD_SIZE', default=10)
+HOLIDAY_LOCAL_SHARD_WORKERS = env.int('HOLIDAY_LOCAL_SHARD_WORKERS', default=8)
+
+# Per-source token buckets (requests/second, burst), shared across workers via Redis
+HOLIDAY_RATE_LIMITS = {
+    'nager': {'rate': env.float('NAGER_RATE_LIMIT', default=10), 'burst': 20},
+    'calendarific': {'rate': env.float('CALENDARIFIC_RATE_LIMIT', default=2), 'burst': 5},
+    'abstract': {'rate': env.float('ABSTRACT_RATE_LIMIT', default=1), 'burst': 1},
+}
+
+# Countries whose public holidays come only from the local rules source (skipped in Nager;
+# unset = every country with a rule table, see services/rules.py)
+HOLIDAY_COMPUTED_COUNTRIES = env.list('HOLIDAY_COMPUTED_COUNTRIES', default=None)
+
+# Deduplicate in a process pool from this many records (one input, or all changed
+# partitions of a local multi-year refresh; never inside daemonic Celery workers)
+HOLIDAY_DEDUPE_PARALLEL_THRESHOLD = env.int('HOLIDAY_DEDUPE_PARALLEL_THRESHOLD', default=20000)
+HOLIDAY_DEDUPE_WORKERS = env.int('HOLIDAY_DEDUPE_WORKERS', default=0)  # 0 = one per CPU
+# Keyword rules for holiday categories, as a JSON list (unset = built-in rules, see services/classifier.py)
+HOLIDAY_CATEGORY_RULES = env.json('HOLIDAY_CATEGORY_RULES', default=None)
+
+# Wikipedia link lookups (MediaWiki query API; point at a local stand-in for tests)
+WIKIPEDIA_API_URL = env('WIKIPEDIA_API_URL', default='https://en.wikipedia.org/w/api.php')
+WIKIPEDIA_BATCH_SIZE = env.int('WIKIPEDIA_BATCH_SIZE', default=50)  # titles per request (max 50)
+WIKIPEDIA_CONCURRENCY = env.int('WIKIPEDIA_CONCURRENCY', default=2)
+WIKIPEDIA_CACHE_TTL = env.int('WIKIPEDIA_CACHE_TTL', default=30 * 24 * 3600)  # found articles
+WIKIPEDIA_NEGATIVE_CACHE_TTL = env.int('WIKIPEDIA_NEGATIVE_CACHE_TTL', default=3 * 24 * 3600)  # misses
+
+# How refreshes save holidays: 'diff' (change set per partition), 'copy' (PostgreSQL COPY
+# staging merge, for reseeds), 'bulk' (chunked ORM upserts) or 'row' (one save_holiday each)
+HOLIDAY_PERSIST_MODE = env('HOLIDAY_PERSIST_MODE', default='diff')
+HOLIDAY_PERSIST_CHUNK_SIZE = env.int('HOLIDAY_PERSIST_CHUNK_SIZE', default=1000)
+
+# Text search configuration for the holiday search_vector (changing it needs a re-index)
+HOLIDAY_SEARCH_CONFIG = env('HOLIDAY_SEARCH_CONFIG', default='english')
+
+# Holiday table partitions (PostgreSQL): years kept by cleanup_old_data, and
+# future years given a partition ahead of time (see manage_partitions)
+HOLIDAY_RETENTION_YEARS = env.int('HOLIDAY_RETENTION_YEARS', default=2)
+HOLIDAY_PARTITIONS_AHEAD = env.int('HOLIDAY_PARTITIONS_AHEAD', default=3)